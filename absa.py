@@ -0,0 +1,203 @@
+import argparse
+import csv
+import hashlib
+import os
+import time
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(__file__)
+INPUT_PATH = os.path.join(BASE_DIR, "data_clean", "all_reviews_en.csv")
+OUTPUT_PATH = os.path.join(BASE_DIR, "dataset", "absa_results.csv")
+
+CHECKPOINT = "multilingual"
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_CHUNK_ROWS = 500
+# Nilai per sentimen aspek untuk absa_sentiment_score (jumlah atas semua aspek di review)
+SENTIMENT_VALUES = {"positive": 1, "neutral": 0, "negative": -1}
+RESULT_FIELDS = ["row", "text_key", "absa_auto_aspects", "absa_auto_sentiments", "absa_sentiment_score",
+                 "absa_perplexity"]
+
+
+def load_extractor(checkpoint=CHECKPOINT, cal_perplexity=False, auto_device=True):
+    """ATEPC.AspectExtractor PyABSA. cal_perplexity=False: tanpa pass perplexity LM per kalimat (tidak dipakai hilir)"""
+    from pyabsa import AspectTermExtraction as ATEPC
+
+    return ATEPC.AspectExtractor(checkpoint, auto_device=auto_device, cal_perplexity=cal_perplexity)
+
+
+def text_key(text):
+    """Sidik teks 64-bit; saat resume, baris hanya dianggap selesai jika teksnya tidak berubah"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=8).hexdigest()
+
+
+def sentiment_score(sentiments):
+    """Positive = +1, Neutral = 0, Negative = -1, dijumlahkan untuk semua aspek"""
+    return sum(SENTIMENT_VALUES.get(str(s).strip().lower(), 0) for s in sentiments)
+
+
+def _result_row(item):
+    """Ambil aspek/sentimen dari hasil predict PyABSA (kunci 'aspect' atau 'aspects', seperti _absa_auto)"""
+    item = item if isinstance(item, dict) else {}
+    aspects = list(item.get("aspect", []) or item.get("aspects", []) or [])
+    sentiments = list(item.get("sentiment", []) or item.get("sentiments", []) or [])
+    perplexity = item.get("perplexity")
+    return {
+        "absa_auto_aspects": ", ".join(map(str, aspects)),
+        "absa_auto_sentiments": ", ".join(map(str, sentiments)),
+        "absa_sentiment_score": sentiment_score(sentiments),
+        "absa_perplexity": "" if perplexity is None else perplexity,
+    }
+
+
+def _predict(extractor, texts, batch_size):
+    return extractor.predict(texts, print_result=False, save_result=False, ignore_error=True,
+                             pred_sentiment=True, eval_batch_size=batch_size)
+
+
+def extract_batch(extractor, texts, batch_size=DEFAULT_BATCH_SIZE):
+    """Satu panggilan predict untuk seluruh list teks; teks kosong tidak dikirim ke model"""
+    rows = [_result_row(None)] * len(texts)
+    index = [i for i, text in enumerate(texts) if text]
+    if not index:
+        return rows
+    results = _predict(extractor, [texts[i] for i in index], batch_size)
+    results = results if isinstance(results, list) else [results]
+    if len(results) != len(index):
+        # Jumlah hasil tidak cocok (kalimat error dilewati PyABSA): ulangi chunk ini per baris
+        results = []
+        for i in index:
+            result = _predict(extractor, [texts[i]], batch_size)
+            results.append(result[0] if isinstance(result, list) and result else result)
+    for i, item in zip(index, results):
+        rows[i] = _result_row(item)
+    return rows
+
+
+class ResultAppender:
+    """Tulis hasil ABSA ke CSV per chunk begitu selesai.
+
+    Setiap baris membawa posisi (row) dan text_key review-nya. Jika path
+    sudah ada dan resume=True, baris yang teksnya sama dianggap selesai
+    (done) sehingga run yang mati di tengah jalan tinggal melanjutkan;
+    baris rusak di akhir file dilewati.
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self.done = {}
+        if resume and os.path.exists(path):
+            self.done = load_results(path)
+        elif os.path.exists(path):
+            os.remove(path)
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        fresh = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, "a", newline="", encoding="utf-8-sig" if fresh else "utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=RESULT_FIELDS, lineterminator="\n")
+        if fresh:
+            self.writer.writeheader()
+
+    def write_chunk(self, rows):
+        self.writer.writerows(rows)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def load_results(path):
+    """dict row → baris hasil dari CSV ResultAppender (baris terakhir yang menang)"""
+    done = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        try:
+            for row in reader:
+                if row.get("text_key") and (row.get("row") or "").isdigit() and row.get("absa_sentiment_score"):
+                    done[int(row["row"])] = row
+        except csv.Error:
+            pass
+    return done
+
+
+def run_absa(texts, extractor, output_path=OUTPUT_PATH, chunk_rows=DEFAULT_CHUNK_ROWS,
+             batch_size=DEFAULT_BATCH_SIZE, resume=False):
+    """Ekstraksi ABSA untuk seluruh korpus per chunk, di-stream ke output_path.
+
+    Tiap chunk (chunk_rows review yang belum selesai) dikirim ke extractor
+    sebagai satu list dengan eval_batch_size=batch_size, lalu langsung
+    ditulis dan di-fsync. Return DataFrame hasil (kolom RESULT_FIELDS tanpa
+    row/text_key) berurutan sesuai texts.
+    """
+    texts = [text.strip() if isinstance(text, str) else "" for text in texts]
+    keys = [text_key(text) for text in texts]
+    appender = ResultAppender(output_path, resume=resume)
+    results = {i: row for i, row in appender.done.items() if i < len(texts) and row["text_key"] == keys[i]}
+    pending = [i for i in range(len(texts)) if i not in results]
+    if results:
+        print(f"⟳ Resume: {len(results)} review sudah selesai, {len(pending)} tersisa")
+    started = time.perf_counter()
+    try:
+        for start in range(0, len(pending), chunk_rows):
+            chunk = pending[start:start + chunk_rows]
+            rows = extract_batch(extractor, [texts[i] for i in chunk], batch_size=batch_size)
+            rows = [{"row": i, "text_key": keys[i], **row} for i, row in zip(chunk, rows)]
+            appender.write_chunk(rows)
+            results.update((row["row"], row) for row in rows)
+            done = start + len(chunk)
+            print(f"  ✓ {done}/{len(pending)} review ({done / (time.perf_counter() - started):.1f} review/s)")
+    finally:
+        appender.close()
+    out = pd.DataFrame([results[i] for i in range(len(texts))], columns=RESULT_FIELDS)
+    out["absa_sentiment_score"] = pd.to_numeric(out["absa_sentiment_score"]).astype(int)
+    out["absa_perplexity"] = pd.to_numeric(out["absa_perplexity"], errors="coerce")
+    out[["absa_auto_aspects", "absa_auto_sentiments"]] = out[["absa_auto_aspects", "absa_auto_sentiments"]].fillna("")
+    return out.drop(columns=["row", "text_key"])
+
+
+def add_absa(df, column="review_en", extractor=None, perplexity=False, **kwargs):
+    """Tambahkan kolom absa_auto_aspects, absa_auto_sentiments, absa_sentiment_score (dan absa_perplexity) ke df"""
+    if column not in df.columns:
+        raise ValueError(f"Kolom '{column}' tidak ditemukan pada CSV input")
+    extractor = load_extractor(cal_perplexity=perplexity) if extractor is None else extractor
+    results = run_absa(df[column].tolist(), extractor, **kwargs)
+    for name in results.columns:
+        if name != "absa_perplexity" or perplexity:
+            df[name] = results[name].to_numpy()
+    return df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ekstraksi aspek + sentimen (PyABSA ATEPC) per batch")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--column", default="review_en")
+    parser.add_argument("--output", default=OUTPUT_PATH,
+                        help="CSV hasil per chunk (kolom row menunjuk baris input); juga titik resume")
+    parser.add_argument("--checkpoint", default=CHECKPOINT)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="eval_batch_size PyABSA")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Review per chunk yang ditulis")
+    parser.add_argument("--perplexity", action="store_true", help="Hitung juga perplexity (lebih lambat)")
+    parser.add_argument("--resume", action="store_true", help="Lanjutkan dari --output run sebelumnya")
+    parser.add_argument("--limit", type=int, default=None, help="Hanya N baris pertama")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.input)
+    if args.limit is not None:
+        df = df.head(args.limit).copy()
+    if args.column not in df.columns:
+        raise ValueError(f"Kolom '{args.column}' tidak ditemukan pada CSV input")
+    extractor = load_extractor(args.checkpoint, cal_perplexity=args.perplexity)
+    started = time.perf_counter()
+    results = run_absa(df[args.column].tolist(), extractor, output_path=args.output, chunk_rows=args.chunk_rows,
+                       batch_size=args.batch_size, resume=args.resume)
+    seconds = time.perf_counter() - started
+    with_aspects = int((results["absa_auto_aspects"] != "").sum())
+    print(f"✓ {len(results)} review ({with_aspects} dengan aspek) dalam {seconds:.2f}s → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
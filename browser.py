@@ -0,0 +1,130 @@
+import argparse
+import json
+import time
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from metrics import instrument_driver
+
+# Pola URL yang diblokir profil lean lewat CDP Network.setBlockedURLs:
+# gambar/foto review, video, font, dan tile peta. Teks review, rating, dan
+# nama tempat tetap dimuat karena berasal dari HTML/JSON.
+LEAN_BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.ico", "*.svg",
+    "*.mp4", "*.webm", "*.m3u8",
+    "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*",
+    "*googleusercontent.com*",
+    "*/maps/vt*", "*/kh/v=*", "*khms*.google.com*", "*streetviewpixels*",
+]
+
+LEAN_WINDOW_SIZE = "1280,900"
+
+
+def create_driver(headless=False, lean=False, track_bytes=False):
+    """Buat Chrome driver dengan opsi anti-deteksi.
+
+    lean=True memblokir gambar, media, font, dan tile peta di level
+    jaringan (CDP), mematikan GPU/extension, dan memakai jendela kecil
+    berukuran tetap. track_bytes=True mengaktifkan performance log agar
+    transfer_bytes() bisa menghitung byte yang diunduh.
+
+    Driver yang dikembalikan sudah diinstrumentasi (metrics.instrument_driver)
+    dan menyimpan lama startup di driver.startup_seconds.
+    """
+    started = time.perf_counter()
+    options = Options()
+    options.add_argument("--lang=id")
+    options.add_argument("--accept-language=id-ID,id")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option('useAutomationExtension', False)
+    if headless:
+        options.add_argument("--headless=new")
+    if lean:
+        options.add_argument("--disable-gpu")
+        options.add_argument("--disable-extensions")
+        options.add_argument(f"--window-size={LEAN_WINDOW_SIZE}")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+    if track_bytes:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    driver = webdriver.Chrome(options=options)
+    if not lean:
+        driver.maximize_window()
+    if lean or track_bytes:
+        driver.execute_cdp_cmd("Network.enable", {})
+    if lean:
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+    try:
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    except Exception:
+        pass
+    driver.startup_seconds = time.perf_counter() - started
+    return instrument_driver(driver)
+
+
+def transfer_bytes(driver):
+    """Total byte terunduh sejak pemanggilan sebelumnya (None jika tidak dilacak).
+
+    Membaca dan mengosongkan performance log; jumlahkan encodedDataLength
+    dari setiap event Network.loadingFinished.
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return None
+    total = 0
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        if message.get("method") == "Network.loadingFinished":
+            total += int(message.get("params", {}).get("encodedDataLength", 0))
+    return total
+
+
+def compare_profiles(url, max_reviews=100, headless=False, runs=1):
+    """Scrape satu tempat dengan profil full lalu lean; cetak byte dan detik per profil"""
+    from scrapping import GoogleMapsReviewScraper
+
+    rows = []
+    for lean in (False, True):
+        for run in range(1, runs + 1):
+            driver = create_driver(headless=headless, lean=lean, track_bytes=True)
+            startup = driver.startup_seconds
+            try:
+                scraper = GoogleMapsReviewScraper(url=url, max_reviews=max_reviews, driver=driver)
+                reviews = scraper.scrape_reviews()
+                summary = scraper.timing_summary()
+            finally:
+                driver.quit()
+            rows.append({
+                "profile": "lean" if lean else "full",
+                "run": run,
+                "startup_seconds": round(startup, 2),
+                "place_seconds": summary.get("place_seconds"),
+                "transfer_kb": summary.get("transfer_kb"),
+                "reviews": len(reviews),
+            })
+
+    print("\n📊 Perbandingan profil browser:")
+    print(f"  {'profil':<6} {'run':>3} {'startup':>9} {'tempat':>9} {'transfer':>12} {'review':>7}")
+    for r in rows:
+        kb = f"{r['transfer_kb']:.0f} KB" if r["transfer_kb"] is not None else "-"
+        place = f"{r['place_seconds']:.1f}s" if r["place_seconds"] is not None else "-"
+        print(f"  {r['profile']:<6} {r['run']:>3} {r['startup_seconds']:>8.1f}s "
+              f"{place:>9} {kb:>12} {r['reviews']:>7}")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ukur byte dan waktu per tempat: profil full vs lean")
+    parser.add_argument("--url", type=str, required=True)
+    parser.add_argument("--max-reviews", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--headless", action="store_true")
+    args = parser.parse_args()
+    compare_profiles(args.url, max_reviews=args.max_reviews, headless=args.headless, runs=args.runs)
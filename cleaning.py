@@ -0,0 +1,276 @@
+import argparse
+import json
+import os
+import re
+import string
+import time
+from multiprocessing import Pool
+
+import numpy as np
+import pandas as pd
+
+from slang import SlangNormalizer
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data_clean")
+INPUT_PATH = os.path.join(DATA_DIR, "all_reviews_merged.csv")
+OUTPUT_PATH = os.path.join(DATA_DIR, "all_reviews_normalized.csv")
+SLANG_PATH = os.path.join(DATA_DIR, "slangwords.json")
+
+DEFAULT_BATCH_SIZE = 5_000
+
+# Mention dan hashtag tidak saling tumpang-tindih, jadi satu alternasi sama
+# dengan dua re.sub berurutan di notebook
+MENTION_HASHTAG_RE = re.compile(r"[@#][A-Za-z0-9]+")
+URL_RE = re.compile(r"http\S+")
+# [^\w\s] lalu [^\x00-\x7F]+ untuk karakter non-ASCII dalam satu regex: simbol
+# non-ASCII (emoji, "…") jadi satu spasi masing-masing, sedangkan run huruf/
+# spasi non-ASCII (boleh diselingi angka ASCII yang di notebook sudah dihapus
+# lebih dulu) jadi satu spasi
+_NON_ASCII_WORD = r"(?:[^\W\x00-\x7F]|[^\S\x00-\x7F])"
+NON_ASCII_RE = re.compile(_NON_ASCII_WORD + r"(?:[0-9]*" + _NON_ASCII_WORD + r")*|[^\w\s\x00-\x7F]")
+
+# Pemisah antar review saat satu batch diproses sebagai satu buffer byte;
+# setelah NON_ASCII_RE semua teks ASCII, jadi byte 0xFF tidak mungkin muncul
+_SEP = "\xff"
+
+
+def _ascii_table():
+    r"""Tabel bytes.translate: [^\w\s] dan newline jadi spasi, A-Z jadi a-z (casefolding)"""
+    table = bytearray(range(256))
+    for code in range(128):
+        ch = chr(code)
+        if ch == "\n" or not (ch.isalnum() or ch == "_" or ch.isspace()):
+            table[code] = ord(" ")
+        elif ch.isupper():
+            table[code] = ord(ch.lower())
+    return bytes(table)
+
+
+ASCII_TABLE = _ascii_table()
+# Angka (langkah [0-9]+) dan "_" (satu-satunya string.punctuation yang lolos [^\w\s])
+ASCII_DELETE = (string.digits + "_").encode("ascii")
+_SEP_BYTE = ord(_SEP)
+
+
+SLANG_MODES = ("token", "compiled")
+
+
+def load_slangwords(path=SLANG_PATH, mode="token"):
+    """mode "token": dict per kata seperti notebook; "compiled": SlangNormalizer (juga kunci multi-kata)"""
+    if mode == "compiled":
+        return SlangNormalizer.from_json(path)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _prepare(text):
+    """Langkah yang bergantung urutan, per review dan hanya jika perlu; hasilnya selalu ASCII"""
+    if not isinstance(text, str):
+        return ""
+    if "@" in text or "#" in text:
+        text = MENTION_HASHTAG_RE.sub(" ", text)
+    if "http" in text:
+        text = URL_RE.sub("", text)
+    if not text.isascii():
+        text = NON_ASCII_RE.sub(" ", text)
+    return text
+
+
+def normalize_batch(texts, slangwords):
+    r"""cleaningText → casefoldingText → normalize_repeated_chars → fix_slangwords untuk satu batch.
+
+    Setelah _prepare, seluruh batch digabung menjadi satu buffer byte:
+    satu bytes.translate menggantikan penghapusan angka, [^\w\s], newline,
+    string.punctuation, dan lower(); huruf berulang (>2) dipangkas dengan
+    mask numpy, bukan regex backreference; slang dipetakan untuk semua
+    token sekaligus. strip(' ') tidak perlu karena split() di tahap slang.
+    Dengan slangwords dict hasilnya identik dengan fungsi di cleaning.ipynb
+    (lihat --verify); dengan SlangNormalizer seluruh buffer diganti dalam
+    satu re.sub sehingga kunci multi-kata ("worth it") ikut dinormalisasi.
+    """
+    if not len(texts):
+        return []
+    buf = _SEP.join([_prepare(text) for text in texts]).encode("latin-1")
+    buf = np.frombuffer(buf.translate(ASCII_TABLE, ASCII_DELETE), dtype=np.uint8)
+    if len(buf) > 2:
+        # (.)\1{2,} → \1\1: buang karakter ketiga dst. dari setiap run; pemisah tidak pernah dipangkas
+        run = (buf[2:] == buf[1:-1]) & (buf[1:-1] == buf[:-2]) & (buf[2:] != _SEP_BYTE)
+        if run.any():
+            buf = buf[np.concatenate(([True, True], ~run))]
+    # Pemisah diberi spasi: "\xff" termasuk \w, jadi tanpa spasi batas kata regex slang hilang
+    joined = buf.tobytes().decode("latin-1").replace(_SEP, " " + _SEP + " ")
+    if isinstance(slangwords, SlangNormalizer):
+        fixed = " ".join(slangwords.normalize_lower(joined).split())
+    else:
+        tokens = joined.split()
+        # Teks sudah lowercase, jadi word.lower() di notebook tidak perlu lagi
+        fixed = " ".join(map(slangwords.get, tokens, tokens))
+    return [part.strip(" ") for part in fixed.split(_SEP)]
+
+
+def normalize_text(text, slangwords):
+    """normalize_batch untuk satu review"""
+    return normalize_batch([text], slangwords)[0]
+
+
+def _iter_batches(texts, batch_size):
+    """Potong list, Series pandas (object/string/Arrow), atau array pyarrow menjadi list Python"""
+    n = len(texts)
+    for start in range(0, n, batch_size):
+        if hasattr(texts, "to_pylist"):
+            yield texts.slice(start, batch_size).to_pylist()
+        elif isinstance(texts, pd.Series):
+            yield texts.iloc[start:start + batch_size].tolist()
+        else:
+            yield list(texts[start:start + batch_size])
+
+
+_worker_slangwords = None
+
+
+def _init_worker(slangwords):
+    global _worker_slangwords
+    _worker_slangwords = slangwords
+
+
+def _normalize_batch(batch):
+    return normalize_batch(batch, _worker_slangwords)
+
+
+def normalize_texts(texts, slangwords=None, batch_size=DEFAULT_BATCH_SIZE, workers=1):
+    """Normalisasi banyak teks per batch; workers > 1 memakai multiprocessing.Pool. Return list"""
+    slangwords = load_slangwords() if slangwords is None else slangwords
+    batches = _iter_batches(texts, batch_size)
+    if workers <= 1 or len(texts) <= batch_size:
+        return [text for batch in batches for text in normalize_batch(batch, slangwords)]
+    out = []
+    with Pool(workers, initializer=_init_worker, initargs=(slangwords,)) as pool:
+        for result in pool.imap(_normalize_batch, batches):
+            out.extend(result)
+    return out
+
+
+def normalize_series(series, slangwords=None, batch_size=DEFAULT_BATCH_SIZE, workers=1):
+    """normalize_texts untuk Series pandas; index dan dtype string (termasuk string[pyarrow]) dipertahankan"""
+    values = normalize_texts(series, slangwords=slangwords, batch_size=batch_size, workers=workers)
+    dtype = series.dtype if isinstance(series.dtype, pd.StringDtype) else object
+    return pd.Series(values, index=series.index, dtype=dtype, name=series.name)
+
+
+# Salinan fungsi cleaning.ipynb apa adanya, hanya untuk --verify dan --benchmark
+
+def notebook_cleaningText(text):
+    text = re.sub(r'@[A-Za-z0-9]+', ' ', text)
+    text = re.sub(r'#[A-Za-z0-9]+', ' ', text)
+    text = re.sub(r"http\S+", '', text)
+    text = re.sub(r'[0-9]+', '', text)
+    text = re.sub(r'[^\w\s]', ' ', text)
+    text = re.sub(r'[^\x00-\x7F]+', ' ', text)
+    text = text.replace('\n', ' ')
+    text = text.translate(str.maketrans('', '', string.punctuation))
+    text = text.strip(' ')
+    return text
+
+
+def notebook_casefoldingText(text):
+    return (text or '').lower()
+
+
+def notebook_normalize_repeated_chars(text):
+    return re.sub(r'(.)\1{2,}', r'\1\1', (text or ''))
+
+
+def notebook_fix_slangwords(text, slangwords):
+    if not isinstance(text, str):
+        return ""
+    words = text.split()
+    fixed_words = []
+    for word in words:
+        if word.lower() in slangwords:
+            fixed_words.append(slangwords[word.lower()])
+        else:
+            fixed_words.append(word)
+    return ' '.join(fixed_words)
+
+
+def notebook_normalize_series(series, slangwords):
+    """Jalur notebook: empat df.apply berurutan"""
+    out = series.apply(notebook_cleaningText)
+    out = out.apply(notebook_casefoldingText)
+    out = out.apply(notebook_normalize_repeated_chars)
+    return out.apply(lambda text: notebook_fix_slangwords(text, slangwords))
+
+
+def verify(input_path=INPUT_PATH, slang_path=SLANG_PATH, workers=1):
+    """Golden check: output modul harus identik dengan jalur notebook untuk setiap baris"""
+    df = pd.read_csv(input_path)
+    slangwords = load_slangwords(slang_path)
+    expected = notebook_normalize_series(df["review"], slangwords)
+    actual = normalize_series(df["review"], slangwords, workers=workers)
+    diff = expected.ne(actual)
+    print(f"⟳ {len(df)} review dari {input_path}")
+    if diff.any():
+        for i in diff[diff].index[:5]:
+            print(f"  ✗ baris {i}: {df['review'].iloc[i]!r}\n    notebook: {expected[i]!r}\n    modul:    {actual[i]!r}")
+        print(f"✗ {int(diff.sum())} baris berbeda")
+        return False
+    print("✓ Identik dengan cleaning.ipynb")
+    return True
+
+
+def benchmark(input_path=INPUT_PATH, slang_path=SLANG_PATH, repeat=1, workers=(1, 4)):
+    """Baris per detik: jalur notebook (df.apply per tahap) vs modul serial/paralel dan slang compiled"""
+    df = pd.read_csv(input_path)
+    texts = pd.concat([df["review"]] * repeat, ignore_index=True)
+    slangwords = load_slangwords(slang_path)
+    print(f"⟳ {len(texts)} review")
+    started = time.perf_counter()
+    notebook_normalize_series(texts, slangwords)
+    base = time.perf_counter() - started
+    print(f"  {'notebook (apply)':<20} {base:>8.2f}s {len(texts) / base:>10.0f} baris/s")
+    for n in workers:
+        started = time.perf_counter()
+        normalize_series(texts, slangwords, workers=n)
+        seconds = time.perf_counter() - started
+        print(f"  {f'modul ({n} proses)':<20} {seconds:>8.2f}s {len(texts) / seconds:>10.0f} baris/s"
+              f"  ({base / seconds:.1f}x)")
+    compiled = load_slangwords(slang_path, mode="compiled")
+    started = time.perf_counter()
+    normalize_series(texts, compiled)
+    seconds = time.perf_counter() - started
+    print(f"  {'modul (compiled)':<20} {seconds:>8.2f}s {len(texts) / seconds:>10.0f} baris/s"
+          f"  ({base / seconds:.1f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normalisasi teks review (cleaning, casefolding, slang)")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--slang", default=SLANG_PATH)
+    parser.add_argument("--slang-mode", choices=SLANG_MODES, default="token",
+                        help="token: per kata seperti notebook (default); compiled: regex trie, termasuk kunci multi-kata")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah proses (default 1)")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--verify", action="store_true", help="Bandingkan hasil dengan fungsi cleaning.ipynb")
+    parser.add_argument("--benchmark", type=int, metavar="REPEAT", default=None,
+                        help="Ukur baris/detik pada input yang diulang REPEAT kali")
+    args = parser.parse_args(argv)
+
+    if args.verify:
+        raise SystemExit(0 if verify(args.input, args.slang, workers=args.workers) else 1)
+    if args.benchmark:
+        benchmark(args.input, args.slang, repeat=args.benchmark, workers=sorted({1, max(1, args.workers)}))
+        return
+
+    df = pd.read_csv(args.input)
+    started = time.perf_counter()
+    df["text_normalized"] = normalize_series(df["review"], load_slangwords(args.slang, mode=args.slang_mode),
+                                             batch_size=args.batch_size, workers=args.workers)
+    seconds = time.perf_counter() - started
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    df.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"✓ {len(df)} review dinormalisasi dalam {seconds:.2f}s → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import argparse
+import hashlib
+import os
+import pickle
+import re
+import time
+from functools import lru_cache
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data_clean")
+VOCAB_PATH = os.path.join(DATA_DIR, "vocab.txt")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+# Naikkan jika aturan deteksi berubah agar tabel lama tidak dipakai
+TABLE_VERSION = 1
+
+# Threshold lebih tinggi untuk mengurangi false positive kata Indonesia
+ZIPF_THRESHOLD = 3.0
+COMMON_ID = frozenset({"ya", "yg", "ygnya", "yang", "itu", "ini", "dan", "di", "ke", "kok", "lah", "sih", "mau", "tapi"})
+# Token di luar vocab yang diingat; cukup untuk nama tempat/typo dalam satu korpus
+DEFAULT_LRU_SIZE = 65_536
+
+_LETTER_RE = re.compile(r"[A-Za-z]")
+_EDGE_RE = re.compile(r"^[^A-Za-z]+|[^A-Za-z]+$")
+
+
+def is_probably_english_token(token, threshold=ZIPF_THRESHOLD):
+    """Aturan notebook: token (tanpa non-huruf di tepi, >= 2 huruf, bukan kata umum Indonesia) dengan
+    wordfreq.zipf_frequency(token, 'en') >= threshold dianggap Inggris"""
+    from wordfreq import zipf_frequency
+
+    if not _LETTER_RE.search(token):
+        return False
+    cleaned = _EDGE_RE.sub("", token).lower()
+    if len(cleaned) < 2 or cleaned in COMMON_ID:
+        return False
+    return zipf_frequency(cleaned, "en") >= threshold
+
+
+class EnglishDetector:
+    """Keputusan "token Inggris?" sekali per tipe token, bukan sekali per kemunculan.
+
+    Keputusan hanya bergantung pada token.lower(), jadi tabel dict
+    token → bool untuk seluruh vocab dihitung sekali (from_vocab, di-cache
+    di disk per sha1 vocab dan threshold) dan runtime cukup satu lookup
+    dict. Token di luar vocab dihitung lewat wordfreq dan diingat di LRU
+    berukuran lru_size.
+    """
+
+    def __init__(self, table=None, threshold=ZIPF_THRESHOLD, lru_size=DEFAULT_LRU_SIZE):
+        self.table = dict(table or {})
+        self.threshold = threshold
+        self._unseen = lru_cache(maxsize=lru_size)(self._decide)
+
+    @classmethod
+    def from_vocab(cls, path=VOCAB_PATH, threshold=ZIPF_THRESHOLD, lru_size=DEFAULT_LRU_SIZE, cache_dir=CACHE_DIR):
+        """Bangun tabel dari vocab.txt (satu token per baris); cache_dir=None: tanpa cache"""
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        cache_path = (os.path.join(cache_dir, f"english-v{TABLE_VERSION}-{threshold:g}-{digest}.pkl")
+                      if cache_dir else None)
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    return cls(pickle.load(f), threshold=threshold, lru_size=lru_size)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+        tokens = {line.strip().lower() for line in raw.decode("utf-8").splitlines() if line.strip()}
+        table = {token: is_probably_english_token(token, threshold) for token in sorted(tokens)}
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = cache_path + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(table, f)
+            os.replace(tmp, cache_path)
+        return cls(table, threshold=threshold, lru_size=lru_size)
+
+    def _decide(self, key):
+        return is_probably_english_token(key, self.threshold)
+
+    def is_english(self, token):
+        key = token.lower()
+        decision = self.table.get(key)
+        return self._unseen(key) if decision is None else decision
+
+    def detect(self, tokens):
+        """Batch: list bool untuk satu aliran token; tiap tipe token diputuskan sekali"""
+        decisions = {}
+        for token in tokens:
+            if token not in decisions:
+                decisions[token] = self.is_english(token)
+        return [decisions[token] for token in tokens]
+
+    def cache_info(self):
+        return self._unseen.cache_info()
+
+
+_default = None
+
+
+def default_detector():
+    """EnglishDetector dari data_clean/vocab.txt, dibuat sekali per proses"""
+    global _default
+    if _default is None:
+        _default = EnglishDetector.from_vocab()
+    return _default
+
+
+def benchmark(vocab_path=VOCAB_PATH, input_path=os.path.join(DATA_DIR, "all_reviews_cleaned.csv"), column="text_clean"):
+    """Token/detik: aturan notebook per kemunculan vs EnglishDetector.detect, dan cek keputusannya sama"""
+    import tempfile
+
+    import pandas as pd
+
+    from translate import split_preserve_delimiters
+
+    texts = pd.read_csv(input_path, encoding="utf-8-sig")[column].fillna("").astype(str).tolist()
+    tokens = [part for text in texts for part in split_preserve_delimiters(text)]
+    print(f"⟳ {len(texts)} review, {len(tokens)} token, {len(set(tokens))} tipe")
+
+    cache_dir = tempfile.mkdtemp(prefix="english_table_")
+    for label in ("build", "cache"):
+        started = time.perf_counter()
+        detector = EnglishDetector.from_vocab(vocab_path, cache_dir=cache_dir)
+        print(f"  tabel vocab ({label}) {time.perf_counter() - started:>8.3f}s, {len(detector.table)} token")
+
+    started = time.perf_counter()
+    expected = [is_probably_english_token(token) for token in tokens]
+    base = time.perf_counter() - started
+    print(f"  {'notebook (per token)':<22} {base:>8.2f}s {len(tokens) / base:>12.0f} token/s")
+    started = time.perf_counter()
+    actual = detector.detect(tokens)
+    seconds = time.perf_counter() - started
+    print(f"  {'EnglishDetector.detect':<22} {seconds:>8.2f}s {len(tokens) / seconds:>12.0f} token/s"
+          f"  ({base / seconds:.0f}x)")
+    info = detector.cache_info()
+    print(f"  LRU: {info.currsize} token di luar vocab, {info.hits} hit")
+    if expected != actual:
+        print(f"✗ {sum(a != b for a, b in zip(expected, actual))} keputusan berbeda")
+        return False
+    print("✓ Keputusan identik")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Deteksi token bahasa Inggris dengan tabel vocab + LRU")
+    parser.add_argument("--vocab", default=VOCAB_PATH)
+    parser.add_argument("--threshold", type=float, default=ZIPF_THRESHOLD)
+    parser.add_argument("--token", nargs="+", help="Cetak keputusan untuk token-token ini")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        raise SystemExit(0 if benchmark(args.vocab) else 1)
+    started = time.perf_counter()
+    detector = EnglishDetector.from_vocab(args.vocab, threshold=args.threshold)
+    seconds = time.perf_counter() - started
+    if args.token:
+        for token, decision in zip(args.token, detector.detect(args.token)):
+            print(f"  {token:<20} {'en' if decision else '-'}")
+        return
+    english = sum(detector.table.values())
+    print(f"✓ Tabel {len(detector.table)} token vocab ({english} Inggris) siap dalam {seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+import argparse
+import inspect
+import os
+import resource
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKENDS = ("torch", "onnx")
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+ONNX_OPSET = 17
+MODEL_INPUTS = ("input_ids", "attention_mask", "token_type_ids")
+
+# Model multi-aspek (README: indobert-base-p2, 5 aspek × 3 kelas): logits (n, 15) per aspek berurutan
+ASPECTS = ("food_quality", "price", "service", "ambiance", "portion")
+POLARITIES = ("positive", "negative", "neutral")
+
+
+def softmax(logits):
+    logits = logits - logits.max(axis=-1, keepdims=True)
+    exp = np.exp(logits)
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+class TorchBackend:
+    """AutoModelForSequenceClassification fp32 di PyTorch; threads = torch.set_num_threads (intra-op)"""
+
+    name = "torch"
+
+    def __init__(self, model, threads=None, device=None):
+        import torch
+        from transformers import AutoModelForSequenceClassification
+
+        if threads:
+            torch.set_num_threads(threads)
+        self.device = torch.device(device or "cpu")
+        self.model = AutoModelForSequenceClassification.from_pretrained(model).to(self.device).eval()
+        self.config = self.model.config
+        params = inspect.signature(self.model.forward).parameters
+        self.input_names = [name for name in MODEL_INPUTS if name in params]
+
+    def logits(self, batch):
+        """batch: dict array numpy hasil tokenizer (padding dinamis). Return logits float32 (n, num_labels)"""
+        import torch
+
+        feed = {k: torch.from_numpy(np.asarray(v, dtype=np.int64)).to(self.device)
+                for k, v in batch.items() if k in self.input_names}
+        with torch.inference_mode():
+            return self.model(**feed).logits.float().cpu().numpy()
+
+
+class OnnxBackend:
+    """Model hasil export_onnx dijalankan dengan ONNX Runtime (CPUExecutionProvider).
+
+    model = folder export (model.onnx, model.int8.onnx, config.json,
+    tokenizer); quantized=False memakai graph fp32.
+    """
+
+    name = "onnx"
+
+    def __init__(self, model, threads=None, quantized=True):
+        import onnxruntime as ort
+        from transformers import AutoConfig
+
+        path = os.path.join(model, INT8_FILE if quantized else FP32_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"{path} tidak ada; jalankan dulu: "
+                                    f"python inference.py --model <model> --export --onnx-dir {model}")
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.config = AutoConfig.from_pretrained(model)
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+    def logits(self, batch):
+        feed = {k: np.asarray(v, dtype=np.int64) for k, v in batch.items() if k in self.input_names}
+        return self.session.run(["logits"], feed)[0]
+
+
+def load_backend(model, backend="torch", threads=None, quantized=True, device=None):
+    """Pilih backend: "torch" (model HF/folder checkpoint) atau "onnx" (folder hasil export_onnx)"""
+    if backend == "torch":
+        return TorchBackend(model, threads=threads, device=device)
+    if backend == "onnx":
+        return OnnxBackend(model, threads=threads, quantized=quantized)
+    raise ValueError(f"backend harus salah satu dari {BACKENDS}, bukan {backend!r}")
+
+
+def export_onnx(model, output_dir, quantize=True, opset=ONNX_OPSET):
+    """Export model klasifikasi HF ke ONNX (batch/sequence dinamis) + kuantisasi dinamis int8 untuk CPU.
+
+    Tokenizer dan config ikut disimpan di output_dir sehingga folder itu
+    bisa langsung dipakai OnnxBackend/SentimentModel(backend="onnx").
+    Return path graph yang dihasilkan.
+    """
+    import torch
+    from transformers import AutoTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    tokenizer = AutoTokenizer.from_pretrained(model)
+    hf = TorchBackend(model)
+    sample = tokenizer(["contoh review", "enak"], padding=True, return_tensors="pt")
+    names = [name for name in hf.input_names if name in sample]
+    fp32_path = os.path.join(output_dir, FP32_FILE)
+    options = {"dynamo": False} if "dynamo" in inspect.signature(torch.onnx.export).parameters else {}
+    torch.onnx.export(
+        hf.model, (), fp32_path, kwargs={name: sample[name] for name in names},
+        input_names=names, output_names=["logits"], opset_version=opset,
+        dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in names}, "logits": {0: "batch"}},
+        **options,
+    )
+    tokenizer.save_pretrained(output_dir)
+    hf.config.save_pretrained(output_dir)
+    paths = [fp32_path]
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        # Hanya bobot MatMul/Gemm yang di-int8; aktivasi dikuantisasi saat runtime
+        paths.append(os.path.join(output_dir, INT8_FILE))
+        quantize_dynamic(fp32_path, paths[-1], weight_type=QuantType.QInt8)
+    return paths
+
+
+def predict_logits(tokenizer, backend, texts, batch_size=32, max_length=512):
+    """Logits per teks (urutan input), batch diurutkan menurut jumlah token dengan padding dinamis"""
+    texts = [text.strip() if isinstance(text, str) else "" for text in texts]
+    ids = tokenizer(texts, truncation=True, max_length=max_length, return_attention_mask=False,
+                    return_token_type_ids=False)["input_ids"]
+    order = np.argsort([len(row) for row in ids], kind="stable")
+    out = np.zeros((len(texts), backend.config.num_labels), dtype=np.float32)
+    for start in range(0, len(order), batch_size):
+        rows = order[start:start + batch_size]
+        batch = dict(tokenizer.pad({"input_ids": [ids[i] for i in rows]}, return_tensors="np"))
+        if "token_type_ids" in backend.input_names:
+            # Satu segmen: semua 0, sama dengan default model HF
+            batch["token_type_ids"] = np.zeros_like(batch["input_ids"])
+        out[rows] = backend.logits(batch)
+    return out
+
+
+def label_groups(config):
+    """Jumlah kelompok softmax: len(ASPECTS) untuk model multi-aspek (5 × 3 label), selain itu 1"""
+    return len(ASPECTS) if config.num_labels == len(ASPECTS) * len(POLARITIES) else 1
+
+
+def group_probs(logits, groups):
+    """Probabilitas per kelompok: (n, groups, num_labels // groups)"""
+    return softmax(logits.reshape(len(logits), groups, -1))
+
+
+class AspectClassifier:
+    """Inferensi model multi-aspek (README "Fine-tune BERT") dengan backend torch atau onnx.
+
+    predict mengembalikan DataFrame sentence + satu kolom polaritas per
+    aspek, format sama dengan data_training/labeled_reviews.csv.
+    """
+
+    def __init__(self, model, backend="torch", threads=None, quantized=True):
+        from transformers import AutoTokenizer
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model)
+        self.backend = load_backend(model, backend, threads=threads, quantized=quantized)
+
+    def predict(self, texts, batch_size=32, max_length=512):
+        logits = predict_logits(self.tokenizer, self.backend, texts, batch_size=batch_size, max_length=max_length)
+        top = group_probs(logits, len(ASPECTS)).argmax(axis=-1)
+        out = pd.DataFrame({"sentence": list(texts)})
+        for j, aspect in enumerate(ASPECTS):
+            out[aspect] = np.asarray(POLARITIES)[top[:, j]]
+        return out
+
+
+def parity(model, onnx_dir, texts, batch_size=32, max_length=512):
+    """Bandingkan PyTorch fp32 dengan ONNX fp32 dan int8: label sama (%) dan selisih probabilitas maksimum.
+
+    int8 dilewati (tidak ada di report) jika onnx_dir diekspor dengan --no-quantize.
+    """
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model)
+    reference = load_backend(model, "torch")
+    groups = label_groups(reference.config)
+    expected = group_probs(predict_logits(tokenizer, reference, texts, batch_size, max_length), groups)
+    print(f"⟳ Parity {len(texts)} teks, {groups} kelompok label, referensi PyTorch fp32")
+    report = {}
+    for quantized in (False, True):
+        if quantized and not _has_int8(onnx_dir):
+            continue
+        backend = load_backend(onnx_dir, "onnx", quantized=quantized)
+        actual = group_probs(predict_logits(tokenizer, backend, texts, batch_size, max_length), groups)
+        agree = float((expected.argmax(-1) == actual.argmax(-1)).mean())
+        diff = float(np.abs(expected - actual).max()) if len(texts) else 0.0
+        label = "onnx int8" if quantized else "onnx fp32"
+        report[label] = {"agreement": agree, "max_prob_diff": diff}
+        print(f"  {label:<10} label sama {agree * 100:6.2f}%  selisih prob maks {diff:.2e}")
+    return report
+
+
+def _has_int8(onnx_dir):
+    """False (dengan peringatan) jika graph int8 tidak ada, mis. export --no-quantize"""
+    if os.path.exists(os.path.join(onnx_dir, INT8_FILE)):
+        return True
+    print(f"⚠ {INT8_FILE} tidak ada di {onnx_dir}; onnx int8 dilewati")
+    return False
+
+
+def _memory_mb():
+    """(RSS saat ini, puncak RSS) proses ini dalam MB dari /proc/self/status.
+
+    VmHWM direset saat exec, berbeda dengan ru_maxrss yang diwarisi dari
+    proses induk; fallback ru_maxrss untuk OS tanpa /proc.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["VmRSS"].split()[0]) / 1024, int(fields["VmHWM"].split()[0]) / 1024
+    except (OSError, KeyError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        return peak, peak
+
+
+def _measure(args):
+    """Dijalankan di proses baru agar RSS tiap backend tidak tercampur"""
+    model, backend_name, quantized, texts, batch_size, threads, max_length = args
+    from transformers import AutoTokenizer
+
+    base_rss = _memory_mb()[0]
+    started = time.perf_counter()
+    tokenizer = AutoTokenizer.from_pretrained(model)
+    backend = load_backend(model, backend_name, threads=threads, quantized=quantized)
+    load_seconds = time.perf_counter() - started
+    predict_logits(tokenizer, backend, texts[:batch_size], batch_size, max_length)
+    latencies = []
+    for text in texts[:200]:
+        started = time.perf_counter()
+        predict_logits(tokenizer, backend, [text], 1, max_length)
+        latencies.append(time.perf_counter() - started)
+    started = time.perf_counter()
+    predict_logits(tokenizer, backend, texts, batch_size, max_length)
+    seconds = time.perf_counter() - started
+    rss, peak = _memory_mb()
+    return {
+        "load_s": load_seconds,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "throughput": len(texts) / seconds,
+        "rss_mb": rss - base_rss,
+        "peak_rss_mb": peak,
+    }
+
+
+def benchmark(model, onnx_dir, texts, batch_size=32, threads=None, max_length=512):
+    """Latency (batch 1, p50/p95), throughput (batch_size), dan RSS di CPU untuk torch fp32 / onnx fp32 / onnx int8"""
+    import multiprocessing
+
+    runs = [("torch fp32", model, "torch", False), ("onnx fp32", onnx_dir, "onnx", False)]
+    if _has_int8(onnx_dir):
+        runs.append(("onnx int8", onnx_dir, "onnx", True))
+    print(f"⟳ {len(texts)} teks, batch {batch_size}, threads {threads or 'default'}")
+    print(f"  {'backend':<11} {'load':>7} {'p50':>8} {'p95':>8} {'teks/s':>9} {'+RSS':>8} {'puncak':>8}")
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for label, path, backend_name, quantized in runs:
+        with ctx.Pool(1) as pool:
+            stats = pool.apply(_measure, ((path, backend_name, quantized, texts, batch_size, threads, max_length),))
+        results[label] = stats
+        print(f"  {label:<11} {stats['load_s']:>6.2f}s {stats['p50_ms']:>6.1f}ms {stats['p95_ms']:>6.1f}ms"
+              f" {stats['throughput']:>9.1f} {stats['rss_mb']:>6.0f}MB {stats['peak_rss_mb']:>6.0f}MB")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backend inferensi CPU: export ONNX + int8, parity, benchmark")
+    parser.add_argument("--model", default="distilbert-base-uncased-finetuned-sst-2-english",
+                        help="Model HF atau folder checkpoint (fp32, referensi)")
+    parser.add_argument("--onnx-dir", default=None, help="Folder hasil export (default models/<nama model>-onnx)")
+    parser.add_argument("--export", action="store_true", help="Export --model ke ONNX + int8 di --onnx-dir")
+    parser.add_argument("--no-quantize", action="store_true", help="Export tanpa graph int8")
+    parser.add_argument("--parity", action="store_true", help="Bandingkan label/probabilitas dengan fp32")
+    parser.add_argument("--benchmark", action="store_true", help="Latency/throughput/RSS tiap backend")
+    parser.add_argument("--input", default=os.path.join(os.path.dirname(__file__), "data_clean", "all_reviews_merged.csv"))
+    parser.add_argument("--column", default="review")
+    parser.add_argument("--limit", type=int, default=1000, help="Jumlah teks untuk --parity/--benchmark")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--max-length", type=int, default=512)
+    args = parser.parse_args(argv)
+
+    onnx_dir = args.onnx_dir or os.path.join("models", os.path.basename(args.model.rstrip("/")) + "-onnx")
+    if args.export:
+        started = time.perf_counter()
+        paths = export_onnx(args.model, onnx_dir, quantize=not args.no_quantize)
+        for path in paths:
+            print(f"  ✓ {path} ({os.path.getsize(path) / 2**20:.1f} MB)")
+        print(f"✓ Export selesai dalam {time.perf_counter() - started:.1f}s")
+    if args.parity or args.benchmark:
+        texts = pd.read_csv(args.input)[args.column].fillna("").astype(str).head(args.limit).tolist()
+        if args.parity:
+            report = parity(args.model, onnx_dir, texts, args.batch_size, args.max_length)
+            if "onnx int8" in report and report["onnx int8"]["agreement"] < 0.99:
+                print("⚠ Label int8 berbeda > 1% dari fp32; cek ulang sebelum dipakai")
+        if args.benchmark:
+            benchmark(args.model, onnx_dir, texts, args.batch_size, args.threads, args.max_length)
+
+
+if __name__ == "__main__":
+    main()
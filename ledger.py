@@ -0,0 +1,135 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobLedger:
+    """Ledger SQLite untuk status scraping per link.
+
+    Disimpan di dataset/<output-dir>/jobs.sqlite sehingga run yang mati di
+    tengah jalan bisa dilanjutkan dengan --resume: link berstatus done
+    dilewati, sisanya (pending/running/failed) dijalankan ulang.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                link TEXT PRIMARY KEY,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                review_count INTEGER NOT NULL DEFAULT 0,
+                last_review_key TEXT,
+                output_file TEXT,
+                error TEXT,
+                updated_at TEXT
+            )
+            """
+        )
+        self.conn.commit()
+
+    def _execute(self, sql, params=()):
+        with self.lock:
+            cur = self.conn.execute(sql, params)
+            self.conn.commit()
+            return cur.fetchall()
+
+    def add_links(self, links):
+        """Daftarkan link baru sebagai pending; link yang sudah ada tidak diubah"""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO jobs (link, status, updated_at) VALUES (?, ?, ?)",
+                [(link, PENDING, now) for link in links],
+            )
+            self.conn.commit()
+
+    def reset(self, links):
+        """Run baru (tanpa --resume): semua link kembali ke pending"""
+        now = datetime.now().isoformat(timespec="seconds")
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE jobs SET status = ?, attempts = 0, review_count = 0, last_review_key = NULL, "
+                "output_file = NULL, error = NULL, updated_at = ? WHERE link = ?",
+                [(PENDING, now, link) for link in links],
+            )
+            self.conn.commit()
+
+    def links_to_run(self, links):
+        """Link dari daftar input yang belum done, urutan input dipertahankan"""
+        done = {row[0] for row in self._execute("SELECT link FROM jobs WHERE status = ?", (DONE,))}
+        return [link for link in links if link not in done]
+
+    def get(self, link):
+        rows = self._execute(
+            "SELECT status, attempts, review_count, last_review_key, output_file, error FROM jobs WHERE link = ?",
+            (link,),
+        )
+        if not rows:
+            return None
+        status, attempts, review_count, last_key, output_file, error = rows[0]
+        return {
+            "link": link,
+            "status": status,
+            "attempts": attempts,
+            "review_count": review_count,
+            "last_review_key": json.loads(last_key) if last_key else None,
+            "output_file": output_file,
+            "error": error,
+        }
+
+    def mark_running(self, link):
+        self._execute(
+            "UPDATE jobs SET status = ?, attempts = attempts + 1, error = NULL, updated_at = ? WHERE link = ?",
+            (RUNNING, datetime.now().isoformat(timespec="seconds"), link),
+        )
+
+    def update_progress(self, link, review_count, last_review_key=None, output_file=None):
+        """Catat jumlah review dan key review terakhir (username, review[:100])"""
+        self._execute(
+            "UPDATE jobs SET review_count = ?, last_review_key = COALESCE(?, last_review_key), "
+            "output_file = COALESCE(?, output_file), updated_at = ? WHERE link = ?",
+            (
+                review_count,
+                json.dumps(list(last_review_key), ensure_ascii=False) if last_review_key else None,
+                output_file,
+                datetime.now().isoformat(timespec="seconds"),
+                link,
+            ),
+        )
+
+    def mark_done(self, link, review_count):
+        self._execute(
+            "UPDATE jobs SET status = ?, review_count = ?, updated_at = ? WHERE link = ?",
+            (DONE, review_count, datetime.now().isoformat(timespec="seconds"), link),
+        )
+
+    def mark_failed(self, link, error):
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE link = ?",
+            (FAILED, str(error)[:500], datetime.now().isoformat(timespec="seconds"), link),
+        )
+
+    def summary(self):
+        """Jumlah link per status"""
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for status, n in self._execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+            counts[status] = n
+        return counts
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
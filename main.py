@@ -1,6 +1,78 @@
 import argparse
-from scrap_link import GoogleMapsSearchScraper
-from scrapping import scrape_batch_from_links
+import os
+
+from ledger import JobLedger
+from metrics import MetricsWriter, print_metrics_summary
+from storage import OUTPUT_FORMATS, require_pyarrow
+from scrap_link import GoogleMapsSearchScraper, PlacesCsvWriter
+from scrapping import ReviewWorkerPool, print_batch_summary, review_scraper_options, scrape_batch_from_links
+
+
+def run_pipeline(args, place_scraper, places_csv, base_dir, ledger_path, metrics_writer=None, resume=False):
+    """Pencarian tempat dan scraping review berjalan bersamaan lewat antrean.
+
+    Setiap link yang ditemukan scraper pencarian langsung masuk ke
+    ReviewWorkerPool; detail tempat ditulis baris per baris ke
+    <places.csv>.partial begitu selesai, lalu places.csv ditulis (dedup)
+    di akhir seperti biasa, jadi places.csv tidak pernah berisi daftar
+    parsial dari run yang mati. Pencarian selalu dijalankan ulang;
+    resume=True melewati link yang sudah done di ledger dan tidak
+    mereset status link lain.
+    """
+    ledger = JobLedger(ledger_path)
+    pool = ReviewWorkerPool(
+        workers=args.workers or 1,
+        output_dir=base_dir,
+        rate_limit=args.rate_limit,
+        headless=args.headless,
+        ledger=ledger,
+        stream=args.stream,
+        max_retries=args.max_retries,
+        lean=args.lean,
+        track_bytes=args.measure_bytes,
+        metrics_writer=metrics_writer,
+        output_format=args.format,
+        **review_scraper_options(
+            max_reviews=args.max_review_per_tempat,
+            wait_mode=args.wait_mode,
+            extract_mode=args.extract_mode,
+            incremental=args.incremental,
+            output_dir=base_dir,
+        ),
+    ).start()
+    partial_csv = places_csv + ".partial"
+    writer = PlacesCsvWriter(partial_csv)
+    submitted = set()
+    skipped = set()
+
+    def on_link(item):
+        link = item.get("link")
+        if not link or link in submitted:
+            return
+        submitted.add(link)
+        ledger.add_links([link])
+        if not resume:
+            ledger.reset([link])
+        elif not ledger.links_to_run([link]):
+            skipped.add(link)
+            return
+        pool.submit(link)
+
+    try:
+        place_scraper.scrape(on_place=writer.write, on_link=on_link)
+    finally:
+        # Worker menyelesaikan sisa antrean lalu berhenti
+        pool.close()
+        results = pool.join()
+    place_scraper.save_to_csv(filename=places_csv)
+    os.remove(partial_csv)
+    place_scraper.save_columnar(places_csv, args.format)
+    if resume:
+        print(f"⟳ Resume: {len(skipped)} link sudah selesai, {len(submitted) - len(skipped)} dijalankan")
+    print_batch_summary(results, len(submitted) - len(skipped), ledger)
+    ledger.close()
+    return results
+
 
 def main():
     parser = argparse.ArgumentParser()
@@ -11,31 +83,91 @@ def main():
     parser.add_argument("--delay", type=float, default=2.0)
     parser.add_argument("--places-output", type=str, default=None)
     parser.add_argument("--output-dir", type=str, required=True, help="Nama folder output di bawah folder dataset/")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah browser paralel untuk scraping review (pool mode)")
+    parser.add_argument("--rate-limit", type=float, default=None, help="Maksimum tempat per menit untuk tiap worker pool")
+    parser.add_argument("--wait-mode", choices=["fixed", "adaptive"], default="fixed",
+                        help="fixed = sleep tetap, adaptive = tunggu perubahan DOM dengan backoff")
+    parser.add_argument("--extract-mode", choices=["bulk", "element"], default="bulk",
+                        help="bulk = satu execute_script untuk semua review, element = jalur lama per elemen")
+    parser.add_argument("--stream", action="store_true",
+                        help="Ekstrak review setiap langkah scroll dan buang node lama dari DOM")
+    parser.add_argument("--resume", action="store_true",
+                        help="Lanjutkan run sebelumnya di output-dir: lewati tempat yang sudah selesai "
+                             "(bersama --stream, review parsial tersimpan setiap langkah scroll; "
+                             "bersama --pipeline, pencarian diulang dan link yang sudah done dilewati)")
+    parser.add_argument("--max-retries", type=int, default=2,
+                        help="Jumlah percobaan ulang (dengan backoff) untuk tempat yang gagal")
+    parser.add_argument("--detail-workers", type=int, default=1,
+                        help="Jumlah browser paralel untuk ambil detail tempat (buka link langsung)")
+    parser.add_argument("--lean", action="store_true",
+                        help="Profil browser ringan: blokir gambar/font/tile peta via CDP, tanpa GPU/extension")
+    parser.add_argument("--measure-bytes", action="store_true",
+                        help="Catat byte yang diunduh per tempat (performance log Chrome)")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Jalankan pencarian tempat dan scraping review bersamaan (pool worker review)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Refresh: urutkan review terbaru dan berhenti di review yang sudah ada di CSV lama")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv",
+                        help="parquet/arrow: tambahkan salinan kolumnar bertipe di samping setiap CSV")
     args = parser.parse_args()
+    if args.format != "csv":
+        require_pyarrow()
 
     # Siapkan folder output di bawah dataset
-    import os
     base_dir = os.path.join("dataset", args.output_dir)
     os.makedirs(base_dir, exist_ok=True)
+    # Metrik per tempat (JSON lines) di samping CSV output
+    metrics_writer = MetricsWriter(os.path.join(base_dir, "metrics.jsonl"))
 
     place_scraper = GoogleMapsSearchScraper(
         query=args.query,
         max_places=args.max_tempat,
         headless=args.headless,
+        lean=args.lean,
+        detail_workers=args.detail_workers,
+        metrics_writer=metrics_writer,
     )
-    places = place_scraper.scrape()
-    if not places:
-        return
     # Simpan daftar tempat ke folder output; jika user memberi places-output, hormati path itu
     places_csv = args.places_output if args.places_output else os.path.join(base_dir, "places.csv")
-    places_csv = place_scraper.save_to_csv(filename=places_csv)
+    ledger_path = os.path.join(base_dir, "jobs.sqlite")
+    if args.pipeline:
+        # Pencarian diulang juga saat resume: ledger yang melewati link yang sudah done
+        run_pipeline(args, place_scraper, places_csv, base_dir, ledger_path, metrics_writer, resume=args.resume)
+        print_metrics_summary(metrics_writer.records)
+        return
+    if args.resume and os.path.exists(places_csv):
+        # Lewati pencarian tempat; daftar link diambil dari run sebelumnya
+        print(f"⟳ Resume: memakai daftar tempat {places_csv}")
+    else:
+        places = place_scraper.scrape()
+        if not places:
+            print_metrics_summary(metrics_writer.records)
+            return
+        places_csv = place_scraper.save_to_csv(filename=places_csv)
+        place_scraper.save_columnar(places_csv, args.format)
 
     scrape_batch_from_links(
         csv_file=places_csv,
         max_reviews=args.max_review_per_tempat,
         delay_between=args.delay,
         output_dir=base_dir,
+        workers=args.workers,
+        rate_limit=args.rate_limit,
+        headless=args.headless,
+        wait_mode=args.wait_mode,
+        extract_mode=args.extract_mode,
+        stream=args.stream,
+        ledger_path=ledger_path,
+        resume=args.resume,
+        max_retries=args.max_retries,
+        incremental=args.incremental,
+        lean=args.lean,
+        track_bytes=args.measure_bytes,
+        metrics_output=metrics_writer,
+        output_format=args.format,
     )
+    print_metrics_summary(metrics_writer.records)
+    print(f"📄 Metrik per tempat: {metrics_writer.path}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,343 @@
+import argparse
+import os
+import re
+import time
+from multiprocessing import Pool
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(__file__)
+INPUT_PATH = os.path.join(BASE_DIR, "data_clean", "all_reviews_merged.csv")
+OUTPUT_PATH = os.path.join(BASE_DIR, "data_training", "labeled_reviews.csv")
+
+ASPECTS = ("food_quality", "price", "service", "ambiance", "portion")
+LABELS = ("positive", "negative", "neutral")
+DEFAULT_BATCH_SIZE = 2_000
+
+# Keyword per aspek dan polaritas (lowercase). Frasa multi-kata boleh; frasa terpanjang menang
+# ("tempat enak" → ambiance, bukan food_quality; "ramah kantong" → price, bukan service)
+aspect_keywords = {
+    "food_quality": {
+        "positive": ["enak", "lezat", "mantap", "mantab", "mantul", "nikmat", "gurih", "empuk", "sedap", "maknyus",
+                     "endul", "juara", "segar", "fresh", "renyah", "krispi", "crispy", "lembut", "juicy",
+                     "recommended", "rekomended", "rekomen", "recommend", "delicious", "tasty"],
+        "negative": ["hambar", "tawar", "tidak enak", "kurang enak", "lembek", "alot", "keasinan", "asin", "basi",
+                     "amis", "gosong", "mengecewakan", "biasa aja", "biasa saja", "rasa biasa", "b aja"],
+    },
+    "price": {
+        "positive": ["murah", "terjangkau", "worth it", "worth", "sepadan", "masuk kantong", "ramah kantong",
+                     "ramah di kantong", "harga bersahabat", "ekonomis", "hemat", "murce", "murmer", "murah meriah",
+                     "affordable", "value for money"],
+        "negative": ["mahal", "kemahalan", "overprice", "overpriced", "pricey", "harga tidak sesuai",
+                     "tidak sebanding", "harga naik"],
+    },
+    "service": {
+        "positive": ["ramah", "sopan", "cepat", "sigap", "tanggap", "membantu", "responsif", "gercep", "helpful",
+                     "friendly", "pelayanan baik", "pelayanan bagus", "pelayanan memuaskan", "pelayanan oke",
+                     "pelayan baik", "pegawai baik", "karyawan baik", "staff baik", "penyajian cepat"],
+        "negative": ["lambat", "lelet", "lemot", "ketus", "jutek", "judes", "cuek", "kasar", "tidak ramah",
+                     "kurang ramah", "lama banget", "lama sekali", "terlalu lama", "nunggu lama", "menunggu lama",
+                     "antri lama", "antre lama", "pelayanan lama", "pelayanan buruk", "pelayanan jelek", "slow",
+                     "salah pesanan", "lupa pesanan"],
+    },
+    "ambiance": {
+        "positive": ["nyaman", "bersih", "rapi", "cozy", "sejuk", "adem", "ber-ac", "ber ac", "ac", "luas", "asri",
+                     "tenang", "homey", "instagramable", "aesthetic", "estetik", "tempat enak", "tempat bagus",
+                     "suasana enak", "suasana bagus", "view bagus", "pemandangan bagus", "parkir luas"],
+        "negative": ["kotor", "jorok", "kumuh", "sempit", "gerah", "pengap", "sumpek", "bau", "berisik", "bising",
+                     "tempat panas", "ruangan panas", "tidak nyaman", "kurang nyaman", "lalat", "kecoa", "becek",
+                     "susah parkir", "parkir sempit"],
+    },
+    "portion": {
+        "positive": ["porsi banyak", "porsi besar", "porsi jumbo", "porsi melimpah", "porsi pas", "porsi cukup",
+                     "porsi kuli", "porsi mantap", "jumbo", "mengenyangkan", "kenyang"],
+        "negative": ["porsi sedikit", "porsi dikit", "porsi kecil", "porsi kurang", "porsi mini", "porsi mengecil",
+                     "mengecil"],
+    },
+}
+# Kata negasi: keyword dalam NEGATION_WINDOW kata sesudahnya (tanpa tanda baca di antaranya) dibalik
+# polaritasnya ("tidak terlalu mahal" → price positive, "tidak ada ac" → ambiance negative)
+NEGATORS = ("tidak", "tak", "gak", "ga", "gk", "nggak", "enggak", "ngga", "tdk", "bukan", "kurang", "belum")
+NEGATION_WINDOW = 3
+
+# Kata penghubung yang memutus window negasi seperti tanda baca ("tidak pedas tapi enak")
+CLAUSE_WORDS = ("tapi", "tetapi", "namun", "sedangkan")
+
+_TOKEN_RE = re.compile(r"[^\W_]+(?:-[^\W_]+)*|[.,!?;:\n]")
+_REPEAT_RE = re.compile(r"(\w)\1+")
+_SIGN = {"positive": 1, "negative": -1}
+_NEGATOR = ("", 0)
+_CLAUSE = "|"
+
+
+def _squeeze(word):
+    """Huruf berulang dipadatkan: "enakkk" → "enak", "recommended" → "recomended" (keyword dipadatkan sama)"""
+    return _REPEAT_RE.sub(r"\1", word)
+
+
+class _Vocab(dict):
+    """Memo token → kata keyword ter-_squeeze (tanpa akhiran -nya), _CLAUSE, atau None; dihitung sekali per token"""
+
+    def __init__(self, words):
+        super().__init__()
+        self.words = words
+
+    def __missing__(self, token):
+        if not token[0].isalnum() or token in CLAUSE_WORDS:
+            value = _CLAUSE
+        else:
+            value = _squeeze(token)
+            if value not in self.words:
+                stem = _squeeze(token[:-3]) if token.endswith("nya") else None
+                value = stem if stem in self.words else None
+        self[token] = value
+        return value
+
+
+class AspectLabeler:
+    """Labeler keyword ABSA: keyword semua aspek/polaritas dan kata negasi dikompilasi ke satu automaton kata.
+
+    Setiap review ditokenisasi sekali; tiap token dipetakan (memo, satu
+    lookup dict) ke kata keyword atau None, lalu satu pass kiri-ke-kanan
+    mencocokkan frasa dari indeks kata-pertama (frasa terpanjang menang),
+    alih-alih mencari setiap keyword satu per satu. Tiap keyword menambah
+    +1 (positive) atau -1 (negative) ke aspeknya; kata negasi dalam window
+    kata sebelumnya (tanpa tanda baca/CLAUSE_WORDS di antaranya) membalik
+    tanda dan habis dipakai. Label aspek: positive (> 0), negative (< 0),
+    neutral.
+    """
+
+    def __init__(self, keywords=None, negators=NEGATORS, window=NEGATION_WINDOW):
+        keywords = aspect_keywords if keywords is None else keywords
+        self.window = window
+        self.aspects = tuple(keywords)
+        entries = [(key, (i, _SIGN[polarity]))
+                   for i, polarities in enumerate(keywords.values())
+                   for polarity, keys in polarities.items()
+                   for key in keys]
+        entries += [(word, _NEGATOR) for word in negators]
+        # Kata pertama → [(frasa, (indeks aspek, tanda)), ...] dengan frasa terpanjang lebih dulu;
+        # keyword duplikat: entri pertama yang menang
+        self.phrases = {}
+        seen = set()
+        for key, entry in entries:
+            words = tuple(_squeeze(word) for word in key.lower().split())
+            if words and words not in seen:
+                seen.add(words)
+                self.phrases.setdefault(words[0], []).append((words, entry))
+        for candidates in self.phrases.values():
+            candidates.sort(key=lambda item: -len(item[0]))
+        self.vocab = _Vocab(frozenset(word for words in seen for word in words))
+
+    def __getstate__(self):
+        # Memo token tidak ikut dikirim ke worker multiprocessing
+        return {**self.__dict__, "vocab": _Vocab(self.vocab.words)}
+
+    def _scan(self, text):
+        """(posisi token, frasa, indeks aspek, +1/-1 setelah negasi) per kemunculan keyword"""
+        tokens = [token for token in _TOKEN_RE.findall(text.lower()) if token != "nya"] if isinstance(text, str) else []
+        canon = list(map(self.vocab.__getitem__, tokens))
+        phrases = self.phrases
+        negation = None
+        skip_to = 0
+        for i, word in enumerate(canon):
+            if word is None or i < skip_to:
+                continue
+            if word is _CLAUSE:
+                negation = None
+                continue
+            for words, (aspect, sign) in phrases.get(word, ()):
+                if len(words) == 1 or tuple(canon[i:i + len(words)]) == words:
+                    break
+            else:
+                continue
+            skip_to = i + len(words)
+            if not sign:
+                negation = skip_to
+                continue
+            if negation is not None:
+                if i - negation < self.window:
+                    sign = -sign
+                negation = None
+            yield i, " ".join(tokens[i:skip_to]), aspect, sign
+
+    def matches(self, text):
+        """(keyword, aspek, +1/-1 setelah negasi) per kemunculan keyword, berurutan"""
+        return [(keyword, self.aspects[aspect], sign) for _, keyword, aspect, sign in self._scan(text)]
+
+    def label(self, text):
+        """Tuple label per aspek (urutan self.aspects)"""
+        scores = [0] * len(self.aspects)
+        for _, _, aspect, sign in self._scan(text):
+            scores[aspect] += sign
+        return tuple("positive" if s > 0 else "negative" if s < 0 else "neutral" for s in scores)
+
+    def label_many(self, texts):
+        return [self.label(text) for text in texts]
+
+
+_worker_labeler = None
+
+
+def _init_worker(labeler):
+    global _worker_labeler
+    _worker_labeler = labeler
+
+
+def _label_batch(batch):
+    return _worker_labeler.label_many(batch)
+
+
+def label_texts(texts, labeler=None, workers=1, batch_size=DEFAULT_BATCH_SIZE):
+    """Label semua teks; workers > 1 memakai multiprocessing.Pool per batch. Return list tuple label"""
+    labeler = AspectLabeler() if labeler is None else labeler
+    texts = list(texts)
+    if workers <= 1 or len(texts) <= batch_size:
+        return labeler.label_many(texts)
+    batches = (texts[start:start + batch_size] for start in range(0, len(texts), batch_size))
+    out = []
+    with Pool(workers, initializer=_init_worker, initargs=(labeler,)) as pool:
+        for result in pool.imap(_label_batch, batches):
+            out.extend(result)
+    return out
+
+
+def label_frame(df, column="review", labeler=None, workers=1):
+    """DataFrame format training: sentence, username, food_quality, price, service, ambiance, portion"""
+    if column not in df.columns:
+        raise ValueError(f"Kolom '{column}' tidak ditemukan pada CSV input")
+    sentences = df[column].fillna("").astype(str).str.strip()
+    sentences = sentences[sentences != ""]
+    labeler = AspectLabeler() if labeler is None else labeler
+    labels = label_texts(sentences.tolist(), labeler, workers=workers)
+    out = pd.DataFrame(labels, columns=list(labeler.aspects), index=sentences.index)
+    out.insert(0, "username", df.loc[sentences.index, "username"] if "username" in df.columns else "Unknown")
+    out.insert(0, "sentence", sentences)
+    return out.reset_index(drop=True)
+
+
+def create_training_data(input_file=INPUT_PATH, output_file=OUTPUT_PATH, sample_size=None, column="review",
+                         workers=1, random_state=42):
+    """Auto-label CSV review (sample_size=None: semua baris) dan simpan ke output_file. Return DataFrame"""
+    df = pd.read_csv(input_file, encoding="utf-8-sig")
+    if sample_size is not None and sample_size < len(df):
+        df = df.sample(sample_size, random_state=random_state)
+    labeled = label_frame(df, column, workers=workers)
+    os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+    labeled.to_csv(output_file, index=False, encoding="utf-8-sig")
+    return labeled
+
+
+def review_labels(path=OUTPUT_PATH, save_every=10):
+    """Review manual interaktif: Enter = tetap, p/n/neu = ubah, q = simpan dan keluar; auto-save tiap save_every"""
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    keys = {"p": "positive", "n": "negative", "neu": "neutral"}
+    reviewed = 0
+    try:
+        for i, row in df.iterrows():
+            print(f"\n[{i + 1}/{len(df)}] {row['sentence']}")
+            for aspect in ASPECTS:
+                answer = input(f"  {aspect:<13} {row[aspect]:<9} > ").strip().lower()
+                if answer == "q":
+                    return df
+                if answer in keys:
+                    df.at[i, aspect] = keys[answer]
+            reviewed += 1
+            if reviewed % save_every == 0:
+                df.to_csv(path, index=False, encoding="utf-8-sig")
+                print(f"  ✓ Tersimpan ({reviewed} review)")
+    finally:
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    return df
+
+
+def naive_label(text, keywords=None):
+    """Jalur naif: cek substring tiap keyword satu per satu, O(review × keyword), tanpa negasi; untuk --benchmark"""
+    keywords = aspect_keywords if keywords is None else keywords
+    text = (text or "").lower()
+    labels = []
+    for polarities in keywords.values():
+        positive = any(key in text for key in polarities["positive"])
+        negative = any(key in text for key in polarities["negative"])
+        labels.append("positive" if positive and not negative else "negative" if negative and not positive
+                      else "neutral")
+    return tuple(labels)
+
+
+def benchmark(input_path=INPUT_PATH, column="review", repeat=1, workers=(1, 4)):
+    """Review/detik: substring per keyword vs automaton kata satu pass (1 dan N proses) pada korpus merged"""
+    texts = pd.read_csv(input_path, encoding="utf-8-sig")[column].fillna("").astype(str).tolist() * repeat
+    n_keys = sum(len(keys) for polarities in aspect_keywords.values() for keys in polarities.values())
+    print(f"⟳ {len(texts)} review, {n_keys} keyword + {len(NEGATORS)} negasi")
+    started = time.perf_counter()
+    labeler = AspectLabeler()
+    print(f"  {'kompilasi':<24} {time.perf_counter() - started:>8.3f}s "
+          f"({sum(map(len, labeler.phrases.values()))} frasa, {len(labeler.vocab.words)} kata)")
+
+    started = time.perf_counter()
+    expected = [naive_label(text) for text in texts]
+    base = time.perf_counter() - started
+    print(f"  {'substring per keyword':<24} {base:>8.2f}s {len(texts) / base:>10.0f} review/s")
+    for n in workers:
+        started = time.perf_counter()
+        actual = label_texts(texts, labeler, workers=n)
+        seconds = time.perf_counter() - started
+        print(f"  {f'automaton ({n} proses)':<24} {seconds:>8.2f}s {len(texts) / seconds:>10.0f} review/s"
+              f"  ({base / seconds:.1f}x)")
+    # Kamus keyword 10x lebih besar (kata sintetis yang tidak muncul): substring naik linear, automaton tetap
+    padded = {aspect: {polarity: keys + [f"{key}zq{n}" for n in range(9) for key in keys]
+                       for polarity, keys in polarities.items()}
+              for aspect, polarities in aspect_keywords.items()}
+    started = time.perf_counter()
+    [naive_label(text, padded) for text in texts]
+    base = time.perf_counter() - started
+    started = time.perf_counter()
+    AspectLabeler(padded).label_many(texts)
+    seconds = time.perf_counter() - started
+    print(f"  {'keyword x10: substring':<24} {base:>8.2f}s {len(texts) / base:>10.0f} review/s")
+    print(f"  {'keyword x10: automaton':<24} {seconds:>8.2f}s {len(texts) / seconds:>10.0f} review/s"
+          f"  ({base / seconds:.1f}x)")
+    for i, aspect in enumerate(labeler.aspects):
+        same = sum(a[i] == b[i] for a, b in zip(expected, actual))
+        counts = pd.Series([row[i] for row in actual]).value_counts()
+        print(f"  {aspect:<13} " + "  ".join(f"{label} {counts.get(label, 0):>6}" for label in LABELS)
+              + f"  sama dengan substring {same / max(len(texts), 1):.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Auto-label ABSA 5 aspek berbasis keyword (satu pass per review)")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--column", default="review", help="Kolom teks (all_reviews_cleaned.csv: text_clean)")
+    parser.add_argument("--sample", type=int, default=None, help="Hanya N review acak (default: semua)")
+    parser.add_argument("--workers", type=int, default=1, help="Jumlah proses (default 1)")
+    parser.add_argument("--review", action="store_true", help="Review manual label di --output secara interaktif")
+    parser.add_argument("--text", help="Cetak keyword yang cocok dan label untuk satu teks")
+    parser.add_argument("--benchmark", type=int, metavar="REPEAT", default=None,
+                        help="Bandingkan dengan substring per keyword pada input yang diulang REPEAT kali")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.input, args.column, repeat=args.benchmark, workers=sorted({1, max(1, args.workers)}))
+        return
+    if args.review:
+        review_labels(args.output)
+        return
+    if args.text is not None:
+        labeler = AspectLabeler()
+        for keyword, aspect, sign in labeler.matches(args.text):
+            print(f"  {keyword!r:<22} {aspect:<13} {'+' if sign > 0 else '-'}")
+        print(dict(zip(labeler.aspects, labeler.label(args.text))))
+        return
+
+    started = time.perf_counter()
+    labeled = create_training_data(args.input, args.output, args.sample, column=args.column, workers=args.workers)
+    seconds = time.perf_counter() - started
+    print(f"✓ {len(labeled)} review dilabeli dalam {seconds:.2f}s → {args.output}")
+    for aspect in ASPECTS:
+        counts = labeled[aspect].value_counts()
+        print(f"  {aspect:<13} " + "  ".join(f"{label} {counts.get(label, 0):>6}" for label in LABELS))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,73 +1,600 @@
-import os
+import argparse
 import glob
+import hashlib
+import json
+import os
+import random
+import shutil
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
 import pandas as pd
 
+from neardup import NearDupIndex
+from storage import (
+    COLUMNAR_EXTENSIONS, OUTPUT_FORMATS, format_path, frame_columns, iter_frame_batches, pyarrow_available,
+    read_frame, require_pyarrow, typed_reviews, write_frame, write_frames,
+)
+
 DATASET_DIR = os.path.join(os.path.dirname(__file__), "dataset")
 OUTPUT_PATH = os.path.join(os.path.dirname(__file__), "data_clean", "all_reviews_merged.csv")
 
+REVIEW_CANDIDATES = [
+    "review",
+    "ulasan",
+    "text",
+    "comment",
+    "content",
+]
+PLACE_CANDIDATES = [
+    "nama_tempat",
+    "place",
+    "place_name",
+    "placename",
+    "nama",
+    "location",
+    "lokasi",
+]
+MERGED_COLUMNS = ["nama_tempat", "review"]
+
+# Mode streaming: perkiraan kasar byte per baris chunk (dua string Python,
+# salinan hasil strip, hash, buffer to_csv) untuk menurunkan chunksize dari
+# batas memori
+DEFAULT_MAX_MEMORY_MB = 512
+ROW_BYTES_ESTIMATE = 2048
+MIN_CHUNK_ROWS = 1_000
+
 
-def read_review_file(path: str) -> pd.DataFrame:
+def pick_columns(columns):
+    """Nama kolom asli (place, review) dari header; None jika tidak ditemukan"""
+    lowered = {}
+    for c in columns:
+        lowered.setdefault(str(c).lower().strip(), c)
+    review_col = next((lowered[c] for c in REVIEW_CANDIDATES if c in lowered), None)
+    place_col = next((lowered[c] for c in PLACE_CANDIDATES if c in lowered), None)
+    return place_col, review_col
+
+
+def read_review_file_full(path: str) -> pd.DataFrame:
+    """Jalur lama: parser python, semua kolom dibaca lalu dua kolom dipilih"""
     try:
         df = pd.read_csv(path, engine="python", on_bad_lines="skip")
     except TypeError:
         df = pd.read_csv(path, engine="python")
     cols_map = {c: c.lower().strip() for c in df.columns}
     df.columns = list(cols_map.values())
-    review_candidates = [
-        "review",
-        "ulasan",
-        "text",
-        "comment",
-        "content",
-    ]
-    place_candidates = [
-        "nama_tempat",
-        "place",
-        "place_name",
-        "placename",
-        "nama",
-        "location",
-        "lokasi",
-    ]
-    review_col = next((c for c in review_candidates if c in df.columns), None)
-    place_col = next((c for c in place_candidates if c in df.columns), None)
+    review_col = next((c for c in REVIEW_CANDIDATES if c in df.columns), None)
+    place_col = next((c for c in PLACE_CANDIDATES if c in df.columns), None)
     if review_col is None or place_col is None:
-        return pd.DataFrame(columns=["nama_tempat", "review"])
+        return pd.DataFrame(columns=MERGED_COLUMNS)
     out = df[[place_col, review_col]].rename(columns={place_col: "nama_tempat", review_col: "review"})
     return out
 
 
-def merge_reviews(dataset_dir: str) -> pd.DataFrame:
-    pattern = os.path.join(dataset_dir, "**", "*.csv")
-    paths = [p for p in glob.glob(pattern, recursive=True) if os.path.basename(p).lower() != "places.csv"]
-    frames = []
-    for p in paths:
-        try:
-            part = read_review_file(p)
-        except Exception:
-            continue
-        if not part.empty:
-            frames.append(part)
+def read_review_file(path: str, engine: str = "c") -> pd.DataFrame:
+    """Baca hanya kolom nama_tempat dan review dari satu CSV.
+
+    Header dibaca sekali (nrows=0) untuk menentukan kolom, lalu isi file
+    diparse dengan engine C/pyarrow dan usecols. Jika parser cepat gagal
+    (mis. quoting rusak), file dibaca ulang lewat jalur lama.
+    """
+    if path.lower().endswith(COLUMNAR_EXTENSIONS):
+        # Parquet/Arrow: skema dibaca dari metadata, hanya dua kolom yang di-decode
+        place_col, review_col = pick_columns(frame_columns(path))
+        if review_col is None or place_col is None:
+            return pd.DataFrame(columns=MERGED_COLUMNS)
+        df = read_frame(path, columns=[place_col, review_col])
+        return df[[place_col, review_col]].rename(columns={place_col: "nama_tempat", review_col: "review"})
+    if engine == "python":
+        return read_review_file_full(path)
+    try:
+        header = pd.read_csv(path, nrows=0).columns
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError):
+        return read_review_file_full(path)
+    place_col, review_col = pick_columns(header)
+    if review_col is None or place_col is None:
+        return pd.DataFrame(columns=MERGED_COLUMNS)
+    options = {"usecols": [place_col, review_col], "engine": engine, "on_bad_lines": "skip"}
+    if engine == "c":
+        # Inferensi tipe per kolom utuh, sama seperti parser python
+        options["low_memory"] = False
+    try:
+        df = pd.read_csv(path, **options)
+    except (pd.errors.ParserError, ValueError, UnicodeDecodeError):
+        return read_review_file_full(path)
+    return df[[place_col, review_col]].rename(columns={place_col: "nama_tempat", review_col: "review"})
+
+
+def _read_or_empty(path, engine="c"):
+    try:
+        return read_review_file(path, engine=engine)
+    except Exception:
+        return None
+
+
+def review_input_paths(dataset_dir: str):
+    """File review di dataset_dir (kecuali places).
+
+    Jika pyarrow tersedia dan ada salinan .parquet/.arrow dengan nama yang
+    sama, salinan itu yang dibaca menggantikan CSV-nya (urutan tetap).
+    """
+    extensions = (".csv",) + (COLUMNAR_EXTENSIONS if pyarrow_available() else ())
+    chosen = {}
+    for ext in extensions:
+        for p in glob.glob(os.path.join(dataset_dir, "**", "*" + ext), recursive=True):
+            stem = os.path.splitext(p)[0]
+            if os.path.basename(stem).lower() != "places":
+                chosen[stem] = p
+    return list(chosen.values())
+
+
+def read_review_files(paths, workers=None, engine="c"):
+    """Baca banyak file (paralel di process pool jika workers > 1); urutan path dipertahankan"""
+    reader = partial(_read_or_empty, engine=engine)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) < 2:
+        parts = [reader(p) for p in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            parts = list(pool.map(reader, paths, chunksize=max(1, len(paths) // (workers * 4))))
+    return [part for part in parts if part is not None and not part.empty]
+
+
+def dedupe_reviews(frames) -> pd.DataFrame:
+    """Gabungkan, rapikan spasi, buang baris kosong dan duplikat (nama_tempat, review)"""
     if not frames:
-        return pd.DataFrame(columns=["nama_tempat", "review"])
-    all_df = pd.concat(frames, ignore_index=True)
-    for col in ["nama_tempat", "review"]:
+        return pd.DataFrame(columns=MERGED_COLUMNS)
+    return clean_reviews(pd.concat(frames, ignore_index=True))
+
+
+def clean_reviews(all_df: pd.DataFrame) -> pd.DataFrame:
+    """Rapikan spasi, buang baris kosong dan duplikat (nama_tempat, review) dalam satu frame"""
+    for col in MERGED_COLUMNS:
         if col in all_df.columns:
             all_df[col] = all_df[col].astype(str).str.strip()
     all_df = all_df.replace({"": pd.NA, "nan": pd.NA})
-    all_df = all_df.dropna(subset=["nama_tempat", "review"])
-    all_df = all_df.drop_duplicates(subset=["nama_tempat", "review"]).reset_index(drop=True)
+    all_df = all_df.dropna(subset=MERGED_COLUMNS)
+    all_df = all_df.drop_duplicates(subset=MERGED_COLUMNS).reset_index(drop=True)
     return all_df
 
 
-def main():
-    os.makedirs(os.path.dirname(OUTPUT_PATH), exist_ok=True)
-    merged = merge_reviews(DATASET_DIR)
-    # Pastikan hanya dua kolom yang ditulis
-    cols = [c for c in ["nama_tempat", "review"] if c in merged.columns]
-    merged[cols].to_csv(OUTPUT_PATH, index=False)
+def iter_review_chunks(path: str, chunk_rows: int, engine: str = "c"):
+    """Baca nama_tempat dan review dari satu file per chunk berisi <= chunk_rows baris.
+
+    Sama seperti read_review_file, tetapi tidak pernah memuat file utuh
+    kecuali file CSV yang quoting-nya rusak (dibaca ulang lewat jalur lama;
+    baris yang sudah terkirim tersaring oleh set hash pemanggil).
+    """
+    if path.lower().endswith(COLUMNAR_EXTENSIONS):
+        place_col, review_col = pick_columns(frame_columns(path))
+        if review_col is None or place_col is None:
+            return
+        for df in iter_frame_batches(path, columns=[place_col, review_col], batch_rows=chunk_rows):
+            yield df[[place_col, review_col]].rename(columns={place_col: "nama_tempat", review_col: "review"})
+        return
+    if engine != "python":
+        try:
+            header = pd.read_csv(path, nrows=0).columns
+            place_col, review_col = pick_columns(header)
+            if review_col is None or place_col is None:
+                return
+            options = {"usecols": [place_col, review_col], "engine": engine, "on_bad_lines": "skip"}
+            with pd.read_csv(path, chunksize=chunk_rows, **options) as reader:
+                for df in reader:
+                    yield df[[place_col, review_col]].rename(columns={place_col: "nama_tempat", review_col: "review"})
+            return
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, ValueError, UnicodeDecodeError):
+            pass
+    df = read_review_file_full(path)
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+class HashKeySet:
+    """Set hash 64-bit (nama_tempat, review) sebagai array uint64 terurut: 8 byte per review unik"""
+
+    def __init__(self, keys=None):
+        self.keys = np.empty(0, dtype=np.uint64) if keys is None else np.asarray(keys, dtype=np.uint64)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def nbytes(self):
+        return self.keys.nbytes
+
+    def missing(self, hashes: np.ndarray) -> np.ndarray:
+        """Mask hash yang belum ada di set (duplikat dalam hashes: hanya yang pertama)"""
+        _, first = np.unique(hashes, return_index=True)
+        mask = np.zeros(len(hashes), dtype=bool)
+        mask[first] = True
+        if len(self.keys):
+            idx = np.minimum(np.searchsorted(self.keys, hashes), len(self.keys) - 1)
+            mask &= self.keys[idx] != hashes
+        return mask
+
+    def add(self, hashes: np.ndarray):
+        """Tambahkan hash yang dijamin belum ada (hasil missing)"""
+        if len(hashes):
+            # Dua run terurut: timsort (kind="stable") menggabungkannya dalam waktu linear. Diurutkan
+            # in-place supaya puncaknya dua salinan set (lama + gabungan), sesuai anggaran chunk_rows_for
+            merged = np.concatenate([self.keys, np.sort(hashes)])
+            merged.sort(kind="stable")
+            self.keys = merged
+
+    def add_new(self, hashes: np.ndarray) -> np.ndarray:
+        """Tambahkan hash yang belum ada; return mask baris baru"""
+        mask = self.missing(hashes)
+        self.add(hashes[mask])
+        return mask
+
+
+def chunk_rows_for(max_memory_mb, key_bytes=0):
+    """Jumlah baris per chunk agar chunk + set hash (x2 saat digabung) muat di max_memory_mb"""
+    budget = max_memory_mb * 1024 * 1024 - 2 * key_bytes
+    return max(MIN_CHUNK_ROWS, int(budget // ROW_BYTES_ESTIMATE))
+
+
+def stream_merge(paths, output_path, keys=None, max_memory_mb=DEFAULT_MAX_MEMORY_MB, engine="c",
+                 near_dup=None):
+    """Merge streaming dengan memori terbatas; return (HashKeySet, baris baru, near-duplicate dibuang).
+
+    File dibaca per chunk, setiap chunk dirapikan lalu dicek ke set hash
+    (bukan ke DataFrame gabungan), dan baris baru langsung ditulis ke
+    output_path. keys=None menulis ulang output dari awal, selain itu
+    baris baru di-append. Seperti merge_reviews, kemunculan pertama yang
+    disimpan dan urutan file dipertahankan. near_dup (NearDupIndex) juga
+    membuang review yang hampir sama dengan review yang sudah disimpan.
+    """
+    key_set = HashKeySet(keys)
+    new_rows = near_dups = 0
+    mode = "w" if keys is None else "a"
+    with open(output_path, mode, newline="", encoding="utf-8") as out:
+        if keys is None:
+            pd.DataFrame(columns=MERGED_COLUMNS).to_csv(out, index=False)
+        for path in paths:
+            chunk_rows = chunk_rows_for(max_memory_mb, key_set.nbytes)
+            try:
+                chunks = iter_review_chunks(path, chunk_rows, engine=engine)
+                for chunk in chunks:
+                    chunk = clean_reviews(chunk.reset_index(drop=True))
+                    if chunk.empty:
+                        continue
+                    hashes = review_key_hashes(chunk)
+                    mask = key_set.missing(hashes)
+                    if near_dup is not None and mask.any():
+                        near_dups += int(mask.sum())
+                        mask[mask] = near_dup.filter(chunk.loc[mask, "review"], labels=chunk.loc[mask, "nama_tempat"])
+                        near_dups -= int(mask.sum())
+                    key_set.add(hashes[mask])
+                    if mask.any():
+                        chunk.loc[mask, MERGED_COLUMNS].to_csv(out, header=False, index=False)
+                        new_rows += int(mask.sum())
+            except Exception as e:
+                print(f"⚠ Lewati {path}: {e}")
+    return key_set, new_rows, near_dups
+
+
+def merge_reviews(dataset_dir: str, workers=None, engine: str = "c") -> pd.DataFrame:
+    """Gabungkan semua CSV review di dataset_dir.
+
+    engine="python" dengan workers=1 sama persis dengan jalur lama (serial,
+    semua kolom); default membaca dua kolom saja dengan parser C secara paralel.
+    """
+    paths = review_input_paths(dataset_dir)
+    return dedupe_reviews(read_review_files(paths, workers=workers, engine=engine))
+
+
+def review_key_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Hash 64-bit per baris dari (nama_tempat, review) yang sudah dirapikan"""
+    if df.empty:
+        return np.empty(0, dtype=np.uint64)
+    return pd.util.hash_pandas_object(df[MERGED_COLUMNS], index=False).to_numpy(dtype=np.uint64)
+
+
+def manifest_paths(output_path):
+    """(manifest JSON, set hash key .npy) di samping file output"""
+    base, _ = os.path.splitext(output_path)
+    return base + ".manifest.json", base + ".keys.npy"
+
+
+def file_signature(path, previous=None):
+    """size, mtime, dan sha1 isi file; sha1 hanya dihitung ulang jika size/mtime berubah"""
+    stat = os.stat(path)
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime_ns") == stat.st_mtime_ns:
+        return previous
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha1": digest.hexdigest()}
+
+
+def load_manifest(output_path):
+    """Manifest + hash key run sebelumnya; None jika tidak ada atau tidak cocok dengan output"""
+    manifest_path, keys_path = manifest_paths(output_path)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        keys = np.load(keys_path)
+    except (OSError, ValueError):
+        return None, None
+    # Output diubah/terpotong di luar merge.py (atau run sebelumnya mati di tengah): rebuild
+    if not os.path.exists(output_path) or os.path.getsize(output_path) != manifest.get("output_size"):
+        return None, None
+    return manifest, keys
+
+
+def save_manifest(output_path, files, keys, near_dup=False):
+    manifest_path, keys_path = manifest_paths(output_path)
+    manifest = {
+        "output_size": os.path.getsize(output_path),
+        "rows": int(len(keys)),
+        # True jika index near-duplicate di samping output ikut diperbarui run ini
+        "near_dup": bool(near_dup),
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "files": files,
+    }
+    # Tulis ke file sementara lalu os.replace agar manifest tidak pernah setengah jadi
+    with open(keys_path + ".tmp", "wb") as f:
+        np.save(f, keys)
+    os.replace(keys_path + ".tmp", keys_path)
+    with open(manifest_path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(manifest_path + ".tmp", manifest_path)
+
+
+def near_dup_path(output_path):
+    """Index MinHash/LSH near-duplicate di samping file output"""
+    return os.path.splitext(output_path)[0] + ".minhash.npz"
+
+
+def open_near_dup_index(output_path, manifest, threshold):
+    """Index near-duplicate run sebelumnya; dibangun ulang dari output jika hilang atau tidak terbarui"""
+    path = near_dup_path(output_path)
+    if manifest is not None and manifest.get("near_dup") and os.path.exists(path):
+        return NearDupIndex.load(path, threshold=threshold)
+    index = NearDupIndex(threshold=threshold)
+    if manifest is not None:
+        with pd.read_csv(output_path, dtype=str, keep_default_na=False, chunksize=100_000) as reader:
+            for chunk in reader:
+                index.add(chunk["review"], labels=chunk["nama_tempat"])
+    return index
+
+
+def merge_incremental(dataset_dir: str, output_path: str, workers=None, engine: str = "c",
+                      full_rebuild: bool = False, stream: bool = False,
+                      max_memory_mb: float = DEFAULT_MAX_MEMORY_MB, near_dup=None):
+    """Merge yang hanya memproses CSV baru atau berubah sejak run sebelumnya.
+
+    Manifest mencatat path (relatif ke dataset_dir), size, mtime, dan sha1
+    per file; hash (nama_tempat, review) yang sudah ada disimpan di .keys.npy.
+    Baris unik baru di-append ke output. File yang berubah diparse ulang
+    utuh (baris lamanya tersaring lewat hash). Baris dari file yang dihapus
+    tetap ada di output sampai --full-rebuild. stream=True memakai
+    stream_merge (serial, per chunk, dibatasi max_memory_mb) alih-alih
+    menggabungkan semua file dalam memori. near_dup (threshold Jaccard)
+    juga membuang review yang hampir sama (MinHash/LSH, lihat neardup.py);
+    index-nya disimpan di samping output. Return dict ringkasan.
+    """
+    paths = review_input_paths(dataset_dir)
+    manifest, keys = (None, None) if full_rebuild else load_manifest(output_path)
+    known = manifest["files"] if manifest else {}
+
+    files, changed = {}, []
+    for p in paths:
+        rel = os.path.relpath(p, dataset_dir)
+        signature = file_signature(p, known.get(rel))
+        files[rel] = signature
+        if manifest is None or known.get(rel, {}).get("sha1") != signature["sha1"]:
+            changed.append(p)
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    index = open_near_dup_index(output_path, manifest, near_dup) if near_dup else None
+    if stream:
+        key_set, new_rows, near_dups = stream_merge(changed, output_path, keys=keys, max_memory_mb=max_memory_mb,
+                                                    engine=engine, near_dup=index)
+        keys = key_set.keys
+    else:
+        fresh = dedupe_reviews(read_review_files(changed, workers=workers, engine=engine))
+        hashes = review_key_hashes(fresh)
+        mask = np.ones(len(fresh), dtype=bool) if manifest is None else ~np.isin(hashes, keys)
+        near_dups = 0
+        if index is not None and mask.any():
+            kept = index.filter(fresh.loc[mask, "review"], labels=fresh.loc[mask, "nama_tempat"])
+            near_dups = int((~kept).sum())
+            mask[mask] = kept
+        new_rows = int(mask.sum())
+        if manifest is None:
+            fresh.loc[mask, MERGED_COLUMNS].to_csv(output_path, index=False)
+            keys = np.unique(hashes[mask])
+        else:
+            if new_rows:
+                fresh.loc[mask, MERGED_COLUMNS].to_csv(output_path, mode="a", header=False, index=False)
+            keys = np.union1d(keys, hashes[mask])
+    if index is not None:
+        index.save(near_dup_path(output_path))
+    save_manifest(output_path, files, keys, near_dup=index is not None)
+    return {
+        "mode": ("full" if manifest is None else "incremental") + (" (stream)" if stream else ""),
+        "files": len(paths),
+        "parsed": len(changed),
+        "new_rows": new_rows,
+        "near_dups": near_dups,
+        "total_rows": int(len(keys)),
+    }
+
+
+def export_merged(output_path, fmt, chunk_rows=None):
+    """Salinan kolumnar bertipe dari output merge (nama_tempat dictionary-encoded); None untuk csv.
+
+    chunk_rows membaca dan menulis output per chunk (mode streaming).
+    """
+    if fmt == "csv" or not os.path.exists(output_path):
+        return None
+    if chunk_rows:
+        with pd.read_csv(output_path, dtype=str, keep_default_na=False, chunksize=chunk_rows) as reader:
+            return write_frames((typed_reviews(df) for df in reader), format_path(output_path, fmt))
+    df = pd.read_csv(output_path, dtype=str, keep_default_na=False)
+    return write_frame(typed_reviews(df), format_path(output_path, fmt))
+
+
+def write_synthetic_dataset(root, rows=1_000_000, files=200, seed=42):
+    """Pohon dataset sintetis mirip output scraper (BOM, review multi-baris, duplikat, skema lain)"""
+    rng = random.Random(seed)
+    words = ("enak mantap murah mahal pelayanan ramah lambat bersih porsi besar kecil sambal "
+             "pedas ayam geprek bakso kuah parkir luas tempat nyaman antri lama recommended").split()
+    places = [f"Tempat {i}" for i in range(max(1, files // 4))]
+    per_file = max(1, rows // files)
+    previous = []
+    for i in range(files):
+        folder = os.path.join(root, f"run_{i % 10}")
+        os.makedirs(folder, exist_ok=True)
+        place = places[i % len(places)]
+        reviews = []
+        for _ in range(per_file):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(3, 40)))
+            if rng.random() < 0.05:
+                text = text.replace(" ", "\n", 1)
+            if rng.random() < 0.1:
+                text = f" {text}, \"asli\" "
+            reviews.append(text)
+        df = pd.DataFrame({
+            "nama_tempat": place,
+            "username": [f"user{rng.randint(0, 99999)}" for _ in range(per_file)],
+            "rating": [rng.randint(1, 5) for _ in range(per_file)],
+            "review": reviews,
+        })
+        if i % 25 == 7:
+            df = df.rename(columns={"nama_tempat": "Place", "review": "Ulasan"})
+        if i % 10 == 3 and previous:
+            # Sebagian file adalah scrape ulang: setengah isinya duplikat file sebelumnya
+            half = min(per_file, len(previous[1])) // 2
+            df.loc[: half - 1, "nama_tempat"] = previous[0]
+            df.loc[: half - 1, "review"] = previous[1][:half]
+        previous = (place, reviews)
+        df.to_csv(os.path.join(folder, f"reviews_{i}.csv"), index=False, encoding="utf-8-sig")
+    pd.DataFrame({"name": places}).to_csv(os.path.join(root, "run_0", "places.csv"), index=False)
+
+
+def benchmark(rows=1_000_000, files=200, workers=None, engines=("c", "pyarrow"),
+              max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+    """Bandingkan jalur lama dan baru pada dataset sintetis; hasil harus identik.
+
+    Mode streaming juga diukur puncak memorinya (tracemalloc) terhadap
+    max_memory_mb, dibandingkan dengan merge dalam memori. Return False jika
+    puncak streaming melewati max_memory_mb atau hasilnya berbeda.
+    """
+    root = tempfile.mkdtemp(prefix="merge_bench_")
+    try:
+        started = time.perf_counter()
+        write_synthetic_dataset(root, rows=rows, files=files)
+        print(f"⟳ Dataset sintetis: {rows} baris, {files} file ({time.perf_counter() - started:.1f}s)")
+
+        started = time.perf_counter()
+        baseline = merge_reviews(root, workers=1, engine="python")
+        legacy_seconds = time.perf_counter() - started
+        print(f"  {'jalur':<22} {'detik':>8} {'baris':>9} {'identik':>8}")
+        print(f"  {'lama (python, serial)':<22} {legacy_seconds:>8.2f} {len(baseline):>9} {'-':>8}")
+        for engine in engines:
+            started = time.perf_counter()
+            try:
+                merged = merge_reviews(root, workers=workers, engine=engine)
+            except ImportError as e:
+                print(f"  {engine:<22} dilewati ({e})")
+                continue
+            seconds = time.perf_counter() - started
+            same = merged.equals(baseline)
+            print(f"  {engine + ' (paralel)':<22} {seconds:>8.2f} {len(merged):>9} {str(same):>8}"
+                  f"  ({legacy_seconds / seconds:.1f}x)")
+        return benchmark_memory(root, baseline, max_memory_mb)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def stream_peak_memory(paths, output_path, max_memory_mb=DEFAULT_MAX_MEMORY_MB):
+    """Jalankan stream_merge di bawah tracemalloc. Return (puncak byte, HashKeySet)"""
+    tracemalloc.start()
+    try:
+        key_set, _, _ = stream_merge(paths, output_path, max_memory_mb=max_memory_mb)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak, key_set
+
+
+def benchmark_memory(root, baseline, max_memory_mb):
+    """Puncak memori merge dalam memori vs streaming. Return True jika streaming <= max_memory_mb dan identik"""
+    paths = review_input_paths(root)
+    output_path = os.path.join(root, "stream_out.csv")
+
+    tracemalloc.start()
+    in_memory = merge_reviews(root, workers=1)
+    _, in_memory_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del in_memory
+
+    # Waktu diukur tanpa tracemalloc (overhead-nya besar), puncak memori di run kedua
+    started = time.perf_counter()
+    stream_merge(paths, output_path, max_memory_mb=max_memory_mb)
+    seconds = time.perf_counter() - started
+    stream_peak, key_set = stream_peak_memory(paths, output_path, max_memory_mb)
+
+    streamed = pd.read_csv(output_path, dtype=str, keep_default_na=False)
+    same = streamed.equals(baseline.astype(str).reset_index(drop=True))
+    mb = 1024 * 1024
+    within = stream_peak <= max_memory_mb * mb
+    print(f"  {'stream (serial)':<22} {seconds:>8.2f} {len(key_set):>9} {str(same):>8}")
+    print(f"  puncak memori: dalam memori {in_memory_peak / mb:.0f} MB, stream {stream_peak / mb:.0f} MB "
+          f"(batas {max_memory_mb} MB: {'OK' if within else 'LEWAT'})")
+    if not within:
+        print(f"✗ Puncak memori streaming melewati --max-memory-mb {max_memory_mb}")
+    return within and same
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gabungkan semua CSV review di dataset/ menjadi satu file")
+    parser.add_argument("--dataset-dir", default=DATASET_DIR)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses parser (default: jumlah CPU)")
+    parser.add_argument("--engine", choices=["c", "pyarrow", "python"], default="c",
+                        help="Parser CSV; python = jalur lama (semua kolom)")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Abaikan manifest: baca ulang semua file dan tulis ulang output")
+    parser.add_argument("--stream", action="store_true",
+                        help="Merge per chunk dengan set hash 64-bit, untuk dataset lebih besar dari RAM")
+    parser.add_argument("--max-memory-mb", type=float, default=DEFAULT_MAX_MEMORY_MB,
+                        help="Batas memori mode --stream (menentukan ukuran chunk)")
+    parser.add_argument("--near-dup", type=float, metavar="JACCARD", default=None,
+                        help="Buang juga review yang hampir sama (MinHash/LSH), mis. 0.8")
+    parser.add_argument("--format", choices=OUTPUT_FORMATS, default="csv",
+                        help="parquet/arrow: tulis juga salinan kolumnar bertipe di samping output CSV")
+    parser.add_argument("--benchmark", type=int, metavar="ROWS", default=None,
+                        help="Bandingkan jalur lama vs baru pada dataset sintetis berukuran ROWS baris")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        ok = benchmark(rows=args.benchmark, workers=args.workers, max_memory_mb=args.max_memory_mb)
+        raise SystemExit(0 if ok else 1)
+    if args.format != "csv":
+        require_pyarrow()
+
+    stats = merge_incremental(
+        args.dataset_dir, args.output, workers=args.workers, engine=args.engine, full_rebuild=args.full_rebuild,
+        stream=args.stream, max_memory_mb=args.max_memory_mb, near_dup=args.near_dup,
+    )
+    print(f"✓ Merge {stats['mode']}: {stats['parsed']}/{stats['files']} file diparse, "
+          f"{stats['new_rows']} baris baru ({stats['near_dups']} near-duplicate dibuang), "
+          f"total {stats['total_rows']} → {args.output}")
+    chunk_rows = chunk_rows_for(args.max_memory_mb) if args.stream else None
+    columnar = export_merged(args.output, args.format, chunk_rows=chunk_rows)
+    if columnar:
+        print(f"✓ Salinan {args.format}: {columnar}")
 
 
 if __name__ == "__main__":
     main()
-
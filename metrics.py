@@ -0,0 +1,210 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PlaceMetrics:
+    """Metrik terstruktur untuk satu tempat (atau satu fase pencarian).
+
+    Mencatat waktu per fase, jumlah dan latensi panggilan WebDriver (lewat
+    instrument_driver), detik sleep, counter bebas (mis. scroll_iterations),
+    dan selector fallback mana yang kena untuk tiap grup selector.
+    """
+
+    def __init__(self, kind, **fields):
+        self.kind = kind
+        self.fields = dict(fields)
+        self.phases = {}
+        self.counters = {}
+        self.fallbacks = {}
+        self.webdriver_calls = 0
+        self.webdriver_seconds = 0.0
+        self.webdriver_max = 0.0
+        self.commands = {}
+        self.sleep_seconds = 0.0
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def record_call(self, command, seconds):
+        with self.lock:
+            self.webdriver_calls += 1
+            self.webdriver_seconds += seconds
+            self.webdriver_max = max(self.webdriver_max, seconds)
+            self.commands[command] = self.commands.get(command, 0) + 1
+
+    def add_sleep(self, seconds):
+        self.sleep_seconds += seconds
+
+    def sleep(self, seconds):
+        """time.sleep yang ikut tercatat"""
+        time.sleep(seconds)
+        self.add_sleep(seconds)
+
+    def incr(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    @contextmanager
+    def phase(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - started
+
+    def hit(self, group, variant):
+        """Catat selector yang berhasil di grup fallback; variant None = semua gagal"""
+        key = "miss" if variant is None else str(variant)
+        bucket = self.fallbacks.setdefault(group, {})
+        bucket[key] = bucket.get(key, 0) + 1
+
+    def to_dict(self):
+        calls = self.webdriver_calls
+        record = {
+            "kind": self.kind,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "elapsed_seconds": round(time.time() - self.started, 3),
+        }
+        record.update(self.fields)
+        record.update({
+            "phases": {k: round(v, 3) for k, v in self.phases.items()},
+            "counters": dict(self.counters),
+            "sleep_seconds": round(self.sleep_seconds, 3),
+            "webdriver": {
+                "calls": calls,
+                "seconds": round(self.webdriver_seconds, 3),
+                "avg_ms": round(self.webdriver_seconds / calls * 1000, 2) if calls else 0.0,
+                "max_ms": round(self.webdriver_max * 1000, 2),
+                "by_command": dict(sorted(self.commands.items(), key=lambda kv: -kv[1])),
+            },
+            "fallbacks": {group: dict(bucket) for group, bucket in self.fallbacks.items()},
+        })
+        return record
+
+
+def instrument_driver(driver):
+    """Bungkus driver.execute agar setiap perintah WebDriver tercatat.
+
+    Semua panggilan (termasuk dari WebElement) lewat WebDriver.execute,
+    jadi cukup satu titik. Metrik dikirim ke driver.metrics (PlaceMetrics
+    tempat yang sedang diproses) jika di-set; None berarti tidak dicatat.
+    """
+    if getattr(driver, "metrics_instrumented", False):
+        return driver
+    original = driver.execute
+
+    def execute(driver_command, params=None):
+        started = time.perf_counter()
+        try:
+            return original(driver_command, params)
+        finally:
+            sink = getattr(driver, "metrics", None)
+            if sink is not None:
+                sink.record_call(driver_command, time.perf_counter() - started)
+
+    driver.execute = execute
+    driver.metrics = None
+    driver.metrics_instrumented = True
+    return driver
+
+
+def attach_metrics(driver, metrics):
+    """Arahkan panggilan driver ke metrics milik tempat yang sedang diproses.
+
+    Lama startup browser (driver.startup_seconds dari create_driver) hanya
+    dicatat di tempat pertama yang memakai driver tersebut.
+    """
+    if driver is None:
+        return
+    driver.metrics = metrics
+    startup = getattr(driver, "startup_seconds", None)
+    if startup is not None:
+        metrics.set(driver_startup_seconds=round(startup, 3))
+        driver.startup_seconds = None
+
+
+class MetricsWriter:
+    """Tulis metrik sebagai JSON lines (satu record per tempat), aman dipakai banyak thread"""
+
+    def __init__(self, path):
+        self.path = path
+        self.records = []
+        self.lock = threading.Lock()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+
+    def write(self, record):
+        if isinstance(record, PlaceMetrics):
+            record = record.to_dict()
+        with self.lock:
+            self.records.append(record)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def load_metrics(path):
+    """Baca metrics.jsonl; baris rusak dilewati"""
+    records = []
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return records
+
+
+def _avg(values):
+    values = [v for v in values if v is not None]
+    return sum(values) / len(values) if values else None
+
+
+def print_metrics_summary(records):
+    """Tabel ringkasan per jenis record + hit rate selector fallback"""
+    if not records:
+        return
+    by_kind = {}
+    for r in records:
+        by_kind.setdefault(r.get("kind", "?"), []).append(r)
+
+    def fmt(value, unit="s", digits=1):
+        return "-" if value is None else f"{value:.{digits}f}{unit}"
+
+    print("\n📊 Ringkasan metrik per fase:")
+    print(f"  {'jenis':<13} {'n':>4} {'durasi':>8} {'startup':>8} {'load':>7} {'scroll':>7} "
+          f"{'sleep':>8} {'wd call':>8} {'wd avg':>8} {'cont/s':>7}")
+    for kind, rows in by_kind.items():
+        print(
+            f"  {kind:<13} {len(rows):>4} "
+            f"{fmt(_avg([r.get('elapsed_seconds') for r in rows])):>8} "
+            f"{fmt(_avg([r.get('driver_startup_seconds') for r in rows])):>8} "
+            f"{fmt(_avg([r.get('phases', {}).get('page_load') for r in rows])):>7} "
+            f"{fmt(_avg([r.get('counters', {}).get('scroll_iterations') for r in rows]), '', 0):>7} "
+            f"{fmt(sum(r.get('sleep_seconds', 0) for r in rows)):>8} "
+            f"{fmt(_avg([r.get('webdriver', {}).get('calls') for r in rows]), '', 0):>8} "
+            f"{fmt(_avg([r.get('webdriver', {}).get('avg_ms') for r in rows]), 'ms'):>8} "
+            f"{fmt(_avg([r.get('containers_per_second') for r in rows]), '', 1):>7}"
+        )
+
+    totals = {}
+    for r in records:
+        for group, bucket in (r.get("fallbacks") or {}).items():
+            agg = totals.setdefault(group, {})
+            for variant, n in bucket.items():
+                agg[variant] = agg.get(variant, 0) + n
+    if totals:
+        print("\n  Hit rate selector fallback:")
+        for group, bucket in sorted(totals.items()):
+            total = sum(bucket.values())
+            parts = ", ".join(
+                f"{variant}={n / total:.0%}" for variant, n in sorted(bucket.items(), key=lambda kv: -kv[1])
+            )
+            print(f"  • {group}: {parts} (n={total})")
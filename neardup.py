@@ -0,0 +1,405 @@
+import argparse
+import os
+import random
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# Review dianggap near-duplicate jika estimasi Jaccard shingle-nya >= threshold
+DEFAULT_THRESHOLD = 0.8
+DEFAULT_NUM_PERM = 128
+SHINGLE_SIZE = 5
+# Review pendek ("enak", "mantap banget") wajar muncul di banyak tempat; tidak dicek
+MIN_CHARS = 30
+
+ELLIPSIS_RE = r"(?:…|\.{3,})\s*$"
+NON_WORD_RE = r"[\W_]+"
+_BAND_PRIME = np.uint64(0x100000001B3)
+SHINGLE_BLOCK = 1 << 16
+
+
+def normalize_texts(texts) -> pd.Series:
+    """Lowercase, buang elipsis di akhir (review terpotong), tanda baca/spasi jadi satu spasi"""
+    s = pd.Series(texts, dtype=object).fillna("").astype(str).str.lower()
+    s = s.str.replace(ELLIPSIS_RE, "", regex=True)
+    return s.str.replace(NON_WORD_RE, " ", regex=True).str.strip()
+
+
+@lru_cache(maxsize=None)
+def lsh_params(threshold, num_perm, fp_weight=0.1, fn_weight=0.9):
+    """(bands, rows) yang meminimalkan luas false positive + false negative kurva-S LSH.
+
+    False positive hanya menambah kandidat yang diverifikasi ulang, jadi
+    bobot default lebih berat ke false negative (recall).
+    """
+    s = np.linspace(0.0, 1.0, 201)
+    below, above = s <= threshold, s >= threshold
+    best = None
+    for bands in range(1, num_perm + 1):
+        for rows in range(1, num_perm // bands + 1):
+            p = 1.0 - (1.0 - s ** rows) ** bands
+            fp = p[below].mean() * threshold
+            fn = (1.0 - p[above]).mean() * (1.0 - threshold)
+            error = fp_weight * fp + fn_weight * fn
+            if best is None or error < best[0]:
+                best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class NearDupIndex:
+    """Index MinHash + LSH untuk mencari review yang hampir sama.
+
+    Signature dihitung dari shingle karakter teks yang sudah dinormalisasi,
+    lalu dibagi menjadi band; tiap band disimpan sebagai array key terurut
+    sehingga pencarian kandidat cukup searchsorted, bukan perbandingan
+    O(n²). Kandidat diverifikasi dengan estimasi Jaccard dari signature.
+    Index bisa disimpan (save/load) dan ditambah secara incremental.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, shingle_size=SHINGLE_SIZE,
+                 min_chars=MIN_CHARS, seed=1):
+        self.threshold = float(threshold)
+        self.num_perm = int(num_perm)
+        self.shingle_size = int(shingle_size)
+        self.min_chars = max(int(min_chars), self.shingle_size)
+        self.seed = int(seed)
+        self.bands, self.rows = lsh_params(self.threshold, self.num_perm)
+        rng = np.random.default_rng(self.seed)
+        # Hash multiply-shift: ((a * x + b) mod 2^64) >> 32, a ganjil
+        self.a = rng.integers(0, np.iinfo(np.uint64).max, self.num_perm, dtype=np.uint64, endpoint=True) | 1
+        self.b = rng.integers(0, np.iinfo(np.uint64).max, self.num_perm, dtype=np.uint64, endpoint=True)
+        self.signatures_ = np.empty((0, self.num_perm), dtype=np.uint32)
+        self.labels = np.empty(0, dtype=object)
+        self.sorted_keys = np.empty((self.bands, 0), dtype=np.uint64)
+        self.sorted_ids = np.empty((self.bands, 0), dtype=np.int64)
+
+    def __len__(self):
+        return len(self.signatures_)
+
+    def signatures(self, texts):
+        """(signature uint32 [n, num_perm], mask teks yang cukup panjang untuk dicek)"""
+        norm = normalize_texts(texts)
+        valid = (norm.str.len() >= self.min_chars).to_numpy()
+        sig = np.zeros((len(norm), self.num_perm), dtype=np.uint32)
+        docs = norm[valid].tolist()
+        if not docs:
+            return sig, valid
+        x, starts = self._shingle_hashes(docs)
+        out = np.empty((len(docs), self.num_perm), dtype=np.uint32)
+        # Per blok dokumen agar array hash per permutasi tetap muat di cache
+        block_starts = [0]
+        for d in range(1, len(docs)):
+            if starts[d] - starts[block_starts[-1]] >= SHINGLE_BLOCK:
+                block_starts.append(d)
+        block_starts.append(len(docs))
+        with np.errstate(over="ignore"):
+            for first, last in zip(block_starts[:-1], block_starts[1:]):
+                lo = starts[first]
+                hi = starts[last] if last < len(docs) else len(x)
+                xs, offsets = x[lo:hi], starts[first:last] - lo
+                for p in range(self.num_perm):
+                    hv = (self.a[p] * xs + self.b[p]) >> np.uint64(32)
+                    out[first:last, p] = np.minimum.reduceat(hv, offsets)
+        sig[valid] = out
+        return sig, valid
+
+    def _shingle_hashes(self, docs):
+        """Hash 64-bit setiap shingle karakter semua dokumen + offset awal per dokumen.
+
+        Shingle di-hash secara vektor (rolling polinomial atas code point,
+        lalu dicampur splitmix64), sehingga stabil antar proses dan tidak
+        ada string shingle yang dibuat di Python.
+        """
+        k = self.shingle_size
+        lengths = np.fromiter((len(d) for d in docs), dtype=np.int64, count=len(docs))
+        code_points = np.frombuffer("".join(docs).encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+        counts = lengths - k + 1
+        starts = np.zeros(len(docs), dtype=np.int64)
+        np.cumsum(counts[:-1], out=starts[1:])
+        doc_offsets = np.zeros(len(docs), dtype=np.int64)
+        np.cumsum(lengths[:-1], out=doc_offsets[1:])
+        positions = np.arange(counts.sum(), dtype=np.int64) + np.repeat(doc_offsets - starts, counts)
+        h = np.zeros(len(positions), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for j in range(k):
+                h = h * _BAND_PRIME + code_points[positions + j]
+            h ^= h >> np.uint64(30)
+            h *= np.uint64(0xBF58476D1CE4E5B9)
+            h ^= h >> np.uint64(27)
+            h *= np.uint64(0x94D049BB133111EB)
+            h ^= h >> np.uint64(31)
+        return h, starts
+
+    def _band_keys(self, sig):
+        keys = np.zeros((len(sig), self.bands), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for band in range(self.bands):
+                cols = sig[:, band * self.rows:(band + 1) * self.rows].astype(np.uint64)
+                key = np.zeros(len(sig), dtype=np.uint64)
+                for c in range(cols.shape[1]):
+                    key = key * _BAND_PRIME + cols[:, c]
+                keys[:, band] = key
+        return keys
+
+    def _similar(self, sig_a, sig_b):
+        return (sig_a == sig_b).mean(axis=-1) >= self.threshold
+
+    def _match_index(self, sig, keys, rows):
+        """Id index terbaik (-1 jika tidak ada) untuk sig[rows]"""
+        found = np.full(len(sig), -1, dtype=np.int64)
+        if not len(self) or not len(rows):
+            return found
+        candidates = {}
+        for band in range(self.bands):
+            lo = np.searchsorted(self.sorted_keys[band], keys[rows, band], side="left")
+            hi = np.searchsorted(self.sorted_keys[band], keys[rows, band], side="right")
+            for i in np.nonzero(hi > lo)[0]:
+                candidates.setdefault(rows[i], []).append(self.sorted_ids[band, lo[i]:hi[i]])
+        for q, parts in candidates.items():
+            ids = np.unique(np.concatenate(parts))
+            scores = (self.signatures_[ids] == sig[q]).mean(axis=1)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                found[q] = ids[best]
+        return found
+
+    def _match_batch(self, sig, keys, rows):
+        """Mask baris yang mirip dengan baris yang dipertahankan lebih awal di batch yang sama.
+
+        Baris yang berbagi bucket LSH diproses berurutan dan hanya
+        dibandingkan dengan baris yang sudah dipertahankan di bucket-nya,
+        bukan dengan semua pasangan anggota bucket: ribuan teks identik
+        (spam copy-paste, review yang sama di banyak cabang) cukup satu
+        perbandingan per baris.
+        """
+        dup = np.zeros(len(sig), dtype=bool)
+        buckets = {}
+        for band in range(self.bands):
+            band_keys = keys[rows, band]
+            order = np.argsort(band_keys, kind="stable")
+            boundaries = np.flatnonzero(np.diff(band_keys[order])) + 1
+            for group in np.split(order, boundaries):
+                if len(group) < 2:
+                    continue
+                bucket = (band, int(band_keys[group[0]]))
+                for row in rows[group].tolist():
+                    buckets.setdefault(row, []).append(bucket)
+        kept = {}
+        for row in sorted(buckets):
+            candidates = {rep for bucket in buckets[row] for rep in kept.get(bucket, ())}
+            if candidates and self._similar(sig[sorted(candidates)], sig[row]).any():
+                dup[row] = True
+                continue
+            for bucket in buckets[row]:
+                kept.setdefault(bucket, []).append(row)
+        return dup
+
+    def match(self, texts):
+        """Id index yang mirip untuk setiap teks (-1 jika tidak ada); index tidak diubah"""
+        sig, valid = self.signatures(texts)
+        return self._match_index(sig, self._band_keys(sig), np.flatnonzero(valid))
+
+    def filter(self, texts, labels=None, add=True):
+        """Mask baris yang dipertahankan: bukan near-duplicate isi index maupun baris sebelumnya.
+
+        Baris pertama dari setiap kelompok mirip dipertahankan; baris valid
+        yang dipertahankan ditambahkan ke index jika add=True.
+        """
+        sig, valid = self.signatures(texts)
+        keys = self._band_keys(sig)
+        rows = np.flatnonzero(valid)
+        dup = self._match_index(sig, keys, rows) >= 0
+        dup |= self._match_batch(sig, keys, rows)
+        if add:
+            keep_rows = rows[~dup[rows]]
+            self._append(sig[keep_rows], keys[keep_rows], _labels_for(labels, len(sig))[keep_rows])
+        return ~dup
+
+    def add(self, texts, labels=None):
+        """Tambahkan semua teks valid ke index tanpa memfilter"""
+        sig, valid = self.signatures(texts)
+        rows = np.flatnonzero(valid)
+        self._append(sig[rows], self._band_keys(sig[rows]), _labels_for(labels, len(sig))[rows])
+
+    def _append(self, sig, keys, labels):
+        if not len(sig):
+            return
+        ids = np.arange(len(self), len(self) + len(sig), dtype=np.int64)
+        self.signatures_ = np.concatenate([self.signatures_, sig])
+        self.labels = np.concatenate([self.labels, labels])
+        sorted_keys = np.empty((self.bands, len(self)), dtype=np.uint64)
+        sorted_ids = np.empty((self.bands, len(self)), dtype=np.int64)
+        for band in range(self.bands):
+            order = np.argsort(keys[:, band], kind="stable")
+            merged_keys = np.concatenate([self.sorted_keys[band], keys[order, band]])
+            merged_ids = np.concatenate([self.sorted_ids[band], ids[order]])
+            # Dua run terurut: timsort menggabungkannya dalam waktu linear
+            merge_order = np.argsort(merged_keys, kind="stable")
+            sorted_keys[band] = merged_keys[merge_order]
+            sorted_ids[band] = merged_ids[merge_order]
+        self.sorted_keys, self.sorted_ids = sorted_keys, sorted_ids
+
+    def save(self, path):
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = path + ".tmp.npz"
+        np.savez(
+            tmp,
+            signatures=self.signatures_,
+            labels=self.labels.astype(str),
+            params=np.array([self.num_perm, self.shingle_size, self.min_chars, self.seed]),
+        )
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path, threshold=DEFAULT_THRESHOLD):
+        """Muat index; band disusun ulang dari signature sehingga threshold boleh berbeda dari saat disimpan"""
+        with np.load(path) as data:
+            num_perm, shingle_size, min_chars, seed = (int(v) for v in data["params"])
+            index = cls(threshold=threshold, num_perm=num_perm, shingle_size=shingle_size,
+                        min_chars=min_chars, seed=seed)
+            sig = data["signatures"]
+            labels = data["labels"].astype(object)
+        index._append(sig, index._band_keys(sig), labels)
+        return index
+
+
+def _labels_for(labels, n):
+    if labels is None:
+        return np.full(n, "", dtype=object)
+    return np.asarray(pd.Series(labels, dtype=object).fillna("").astype(str), dtype=object)
+
+
+def load_or_create(path, threshold=DEFAULT_THRESHOLD):
+    if path and os.path.exists(path):
+        return NearDupIndex.load(path, threshold=threshold)
+    return NearDupIndex(threshold=threshold)
+
+
+def synthetic_reviews(rows=100_000, dup_rate=0.1, seed=42):
+    """Review sintetis + kolom dup_of (indeks asli, -1 jika unik) untuk benchmark"""
+    rng = random.Random(seed)
+    words = ("enak mantap murah mahal pelayanan ramah lambat bersih porsi besar kecil sambal pedas ayam "
+             "geprek bakso kuah parkir luas tempat nyaman antri lama recommended banget sekali kurang "
+             "rasa harga menu minuman es teh nasi goreng manis asin gurih kasir meja kotor wangi").split()
+    texts, dup_of = [], []
+    for i in range(rows):
+        if texts and rng.random() < dup_rate:
+            j = rng.randrange(len(texts))
+            while dup_of[j] >= 0:
+                j = dup_of[j]
+            source = texts[j]
+            kind = rng.random()
+            if kind < 0.4:
+                text = "  ".join(source.split(" ")).upper()
+            elif kind < 0.7:
+                cut = int(len(source) * 0.92)
+                text = source[:cut] + "…"
+            else:
+                tokens = source.split(" ")
+                tokens[rng.randrange(len(tokens))] = rng.choice(words)
+                text = " ".join(tokens) + "!!"
+            texts.append(text)
+            dup_of.append(j)
+        else:
+            texts.append(" ".join(rng.choice(words) for _ in range(rng.randint(12, 60))))
+            dup_of.append(-1)
+    return pd.DataFrame({"review": texts, "dup_of": dup_of})
+
+
+def benchmark(rows=100_000, threshold=DEFAULT_THRESHOLD, brute_sample=1_000):
+    """Throughput signature/filter dan recall near-duplicate, dibanding brute force O(n²)"""
+    df = synthetic_reviews(rows)
+    index = NearDupIndex(threshold=threshold)
+    print(f"⟳ {rows} review sintetis, {int((df['dup_of'] >= 0).sum())} near-duplicate disisipkan, "
+          f"threshold {threshold}, {index.bands} band x {index.rows} baris")
+
+    started = time.perf_counter()
+    index.signatures(df["review"])
+    seconds = time.perf_counter() - started
+    print(f"  signature          {seconds:>8.2f}s  {rows / seconds:>10.0f} review/s")
+
+    started = time.perf_counter()
+    keep = np.zeros(rows, dtype=bool)
+    batch = 10_000
+    for start in range(0, rows, batch):
+        keep[start:start + batch] = index.filter(df["review"].iloc[start:start + batch])
+    seconds = time.perf_counter() - started
+    injected = (df["dup_of"] >= 0).to_numpy()
+    recall = (~keep[injected]).mean() if injected.any() else 1.0
+    false_positive = (~keep[~injected]).mean()
+    print(f"  filter (batch {batch}) {seconds:>6.2f}s  {rows / seconds:>10.0f} review/s  "
+          f"recall {recall:.3f}  false positive {false_positive:.4f}")
+
+    unseen = synthetic_reviews(batch, dup_rate=0.0, seed=7)["review"]
+    started = time.perf_counter()
+    query = index.match(unseen)
+    seconds = time.perf_counter() - started
+    print(f"  query index ({len(index)}) {seconds:>6.2f}s  {batch / seconds:>10.0f} review/s  "
+          f"({int((query >= 0).sum())}/{batch} ketemu)")
+
+    # Brute force: Jaccard persis semua pasangan pada sampel kecil, diekstrapolasi ke n
+    sample = normalize_texts(df["review"].iloc[:brute_sample]).tolist()
+    sets = [{t[i:i + SHINGLE_SIZE] for i in range(len(t) - SHINGLE_SIZE + 1)} for t in sample]
+    started = time.perf_counter()
+    for i in range(len(sets)):
+        for j in range(i):
+            len(sets[i] & sets[j]) / max(1, len(sets[i] | sets[j]))
+    seconds = time.perf_counter() - started
+    pairs = brute_sample * (brute_sample - 1) / 2
+    estimate = seconds / pairs * rows * (rows - 1) / 2
+    print(f"  brute force        {seconds:>8.2f}s  untuk {brute_sample} review "
+          f"(perkiraan {estimate / 3600:.1f} jam untuk {rows})")
+
+
+def check_files(paths, index_path, threshold=DEFAULT_THRESHOLD, add=False):
+    """Cek CSV scrape baru terhadap index; add=True menambahkan review yang lolos lalu menyimpan index"""
+    from merge import pick_columns
+
+    index = load_or_create(index_path, threshold=threshold)
+    print(f"⟳ Index {index_path}: {len(index)} review")
+    for path in paths:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+        place_col, review_col = pick_columns(df.columns)
+        if review_col is None:
+            print(f"  {path}: kolom review tidak ditemukan")
+            continue
+        labels = df[place_col] if place_col else None
+        matched = index.match(df[review_col])
+        hits = np.flatnonzero(matched >= 0)
+        print(f"  {path}: {len(hits)}/{len(df)} near-duplicate")
+        for row in hits[:5]:
+            print(f"    - {df[review_col].iloc[row][:70]!r} ≈ review di {index.labels[matched[row]] or '?'}")
+        if add:
+            index.filter(df[review_col], labels=labels)
+    if add:
+        index.save(index_path)
+        print(f"✓ Index disimpan: {index_path} ({len(index)} review)")
+
+
+def main(argv=None):
+    from merge import OUTPUT_PATH, near_dup_path
+
+    parser = argparse.ArgumentParser(description="Deteksi review near-duplicate dengan MinHash + LSH")
+    parser.add_argument("--index", default=near_dup_path(OUTPUT_PATH),
+                        help="File index .npz (default: index milik merge.py --near-dup)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Batas estimasi Jaccard")
+    parser.add_argument("--check", nargs="+", metavar="CSV", help="CSV scrape baru yang dicek terhadap index")
+    parser.add_argument("--add", action="store_true", help="Tambahkan review yang lolos cek ke index")
+    parser.add_argument("--benchmark", type=int, metavar="ROWS", default=None,
+                        help="Ukur throughput dan recall pada ROWS review sintetis")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(rows=args.benchmark, threshold=args.threshold)
+    elif args.check:
+        check_files(args.check, args.index, threshold=args.threshold, add=args.add)
+    else:
+        parser.error("pilih --check atau --benchmark")
+
+
+if __name__ == "__main__":
+    main()
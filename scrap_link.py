@@ -1,50 +1,103 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.keys import Keys
 from selenium.common.exceptions import TimeoutException
-import time
 import re
+import csv
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import pandas as pd
 from datetime import datetime
 import os
 
+from browser import create_driver
+from metrics import PlaceMetrics, attach_metrics
+from storage import format_path, typed_places, write_frame
+
+
+# Snapshot semua field detail dalam satu execute_script. Urutan fallback
+# sama dengan open_item_and_extract_details (address: data-item-id lalu
+# aria-label 'Alamat'; phone: aria-label/data-item-id/tel: lalu class CSS).
+# hits mencatat indeks selector yang kena (-1 = tidak ada) untuk metrik.
+DETAIL_SNAPSHOT_JS = """
+var hits = {};
+function txt(el) { return el ? (el.innerText || '').trim() : ''; }
+function first(group, root, selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var t = txt(root.querySelector(selectors[i]));
+        if (t) { hits[group] = i; return t; }
+    }
+    hits[group] = -1;
+    return '';
+}
+// Panel detail = div.m6QErb terluar yang memuat h1 (sama seperti XPath detail_root)
+var h1 = document.querySelector('h1.DUwDvf');
+var root = document;
+for (var el = h1; el; el = el.parentElement) {
+    if (el.classList && el.classList.contains('m6QErb')) { root = el; }
+}
+return {
+    name: txt(root.querySelector('h1.DUwDvf.lfPIob')),
+    category: txt(root.querySelector('button.DkEaL')),
+    address: first('address', root, [
+        "button[data-item-id='address'] div.Io6YTe",
+        "[data-item-id='address'] div.Io6YTe",
+        "button[aria-label*='Alamat'] > div.Io6YTe"
+    ]),
+    phone: first('phone', root, [
+        "button[aria-label*='Telepon'] > div.Io6YTe",
+        "button[aria-label*='Nomor'] > div.Io6YTe",
+        "button[data-item-id*='phone'] > div.Io6YTe",
+        "a[href^='tel:'] > div.Io6YTe",
+        "button[data-item-id='phone'] div.Io6YTe.fontBodyMedium.kR99db.fdkmkc",
+        "a[href^='tel:'] div.Io6YTe.fontBodyMedium.kR99db.fdkmkc",
+        "button[aria-label*='Telepon'] div.Io6YTe.fontBodyMedium.kR99db.fdkmkc",
+        "div.Io6YTe.fontBodyMedium.kR99db.fdkmkc"
+    ]),
+    hits: hits
+};
+"""
+
 
 class GoogleMapsSearchScraper:
-    def __init__(self, query, max_places=50, scroll_pause=1.2, headless=False):
+    def __init__(self, query, max_places=50, scroll_pause=1.2, headless=False, lean=False, detail_workers=1,
+                 metrics_writer=None):
         self.query = query
         self.max_places = max_places
         self.scroll_pause = scroll_pause
         self.headless = headless
+        self.lean = lean
+        # >1: detail diambil paralel oleh beberapa browser dengan membuka link langsung
+        self.detail_workers = detail_workers
         self.driver = None
         self.results = []
         self.seen_links = set()
+        # Metrik fase pencarian + satu record per detail tempat (metrics.jsonl)
+        self.metrics = PlaceMetrics("search", query=query, detail_workers=detail_workers)
+        self.metrics_writer = metrics_writer
+        self.metrics_records = []
+        self.metrics_lock = threading.Lock()
 
     def setup_driver(self):
-        options = Options()
-        options.add_argument("--lang=id")
-        options.add_argument("--accept-language=id-ID,id")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option("useAutomationExtension", False)
-        if self.headless:
-            options.add_argument("--headless=new")
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.maximize_window()
-        try:
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-        except Exception:
-            pass
+        self.driver = create_driver(headless=self.headless, lean=self.lean)
+        attach_metrics(self.driver, self.metrics)
+
+    def record_metrics(self, metrics):
+        record = metrics.to_dict()
+        with self.metrics_lock:
+            self.metrics_records.append(record)
+        if self.metrics_writer:
+            self.metrics_writer.write(record)
 
     def open_and_search(self):
         print("⟳ Membuka Google Maps dan melakukan pencarian...")
-        self.driver.get("https://www.google.com/maps")
         wait = WebDriverWait(self.driver, 20)
-        search_input = wait.until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, "input.searchboxinput"))
-        )
+        with self.metrics.phase("page_load"):
+            self.driver.get("https://www.google.com/maps")
+            search_input = wait.until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "input.searchboxinput"))
+            )
         search_input.clear()
         search_input.send_keys(self.query)
         search_input.send_keys(Keys.ENTER)
@@ -53,7 +106,7 @@ class GoogleMapsSearchScraper:
             wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, "div.m6QErb")))
         except TimeoutException:
             pass
-        time.sleep(2)
+        self.metrics.sleep(2)
         print("✓ Halaman hasil pencarian dimuat (awal)")
 
     def get_results_container(self):
@@ -68,9 +121,11 @@ class GoogleMapsSearchScraper:
                 el = self.driver.find_element(By.CSS_SELECTOR, sel)
                 if el:
                     print(f"✓ Menemukan container hasil: {sel}")
+                    self.metrics.hit("results_container", sel)
                     return el
             except Exception:
                 continue
+        self.metrics.hit("results_container", None)
         return None
 
     def scroll_results(self, container, target_count=None, max_attempts=300, max_stagnant=8):
@@ -110,21 +165,23 @@ class GoogleMapsSearchScraper:
                 current = self.driver.execute_script("return arguments[0].scrollTop", container)
                 height = self.driver.execute_script("return arguments[0].scrollHeight", container)
                 self.driver.execute_script("arguments[0].scrollBy(0, 1200)", container)
-                time.sleep(self.scroll_pause)
+                self.metrics.incr("scroll_iterations")
+                self.metrics.sleep(self.scroll_pause)
                 new_current = self.driver.execute_script("return arguments[0].scrollTop", container)
                 if new_current == current and height == last_height:
                     # fallback: PAGE_DOWN
+                    self.metrics.incr("scroll_page_down")
                     try:
                         container.send_keys(Keys.PAGE_DOWN)
                     except Exception:
                         pass
-                    time.sleep(self.scroll_pause)
+                    self.metrics.sleep(self.scroll_pause)
                 last_height = height
                 attempts += 1
                 if attempts % 10 == 0:
                     print(f"  📊 Progress scroll: anchors={current_unique} | attempts={attempts}")
             except Exception:
-                time.sleep(self.scroll_pause)
+                self.metrics.sleep(self.scroll_pause)
 
     def parse_lat_lng(self, url):
         m = re.search(r"!3d(-?\d+\.\d+)!4d(-?\d+\.\d+)", url)
@@ -164,22 +221,39 @@ class GoogleMapsSearchScraper:
         except Exception:
             return ""
 
-    def get_detail_field(self, xpath_variants, timeout=6):
-        for xp in xpath_variants:
+    def get_detail_field(self, xpath_variants, timeout=6, metrics=None, group=None):
+        """Teks dari XPath pertama yang berisi; metrics.hit(group, indeks) jika diberikan"""
+        for i, xp in enumerate(xpath_variants):
             try:
                 el = WebDriverWait(self.driver, timeout).until(EC.presence_of_element_located((By.XPATH, xp)))
                 txt = el.text.strip()
                 if txt:
+                    if metrics:
+                        metrics.hit(group, f"global_xpath_{i}")
                     return txt
             except Exception:
                 continue
+        if metrics:
+            metrics.hit(group, None)
         return ""
 
     def open_item_and_extract_details(self, item):
+        """Klik item di daftar lalu ekstrak detail; metriknya dicatat per tempat"""
+        metrics = PlaceMetrics("place_detail", link=item.get("link", ""), mode="click")
+        attach_metrics(self.driver, metrics)
+        try:
+            details = self.click_item_and_extract_details(item, metrics)
+        finally:
+            attach_metrics(self.driver, self.metrics)
+        metrics.set(ok=details is not None)
+        self.record_metrics(metrics)
+        return details
+
+    def click_item_and_extract_details(self, item, metrics):
         try:
             print(f"⟳ Membuka detail: {item.get('name','')}...")
             self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", item["element"])
-            time.sleep(0.2)
+            metrics.sleep(0.2)
             self.driver.execute_script("arguments[0].click();", item["element"])
         except Exception:
             try:
@@ -189,9 +263,10 @@ class GoogleMapsSearchScraper:
         wait = WebDriverWait(self.driver, 15)
         try:
             # Tunggu judul terlihat (lebih ketat dari sekadar presence)
-            wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "h1.DUwDvf.lfPIob")))
+            with metrics.phase("page_load"):
+                wait.until(EC.visibility_of_element_located((By.CSS_SELECTOR, "h1.DUwDvf.lfPIob")))
         except TimeoutException:
-            time.sleep(1)
+            metrics.sleep(1)
 
         # Scope semua pencarian field ke panel detail yang memiliki h1
         detail_root = None
@@ -202,6 +277,7 @@ class GoogleMapsSearchScraper:
             )
         except Exception:
             detail_root = None
+        metrics.hit("detail_root", "panel" if detail_root else None)
 
         # Ambil name dari panel detail
         name_detail = item.get("name", "")
@@ -219,22 +295,24 @@ class GoogleMapsSearchScraper:
             if detail_root:
                 category = detail_root.find_element(By.CSS_SELECTOR, "button.DkEaL").text.strip()
             else:
-                category = self.get_detail_field(["//button[contains(@class,'DkEaL')]"] , timeout=4)
+                category = self.get_detail_field(["//button[contains(@class,'DkEaL')]"], timeout=4,
+                                                 metrics=metrics, group="category")
         except Exception:
             category = ""
 
         # Ambil address dari panel detail (beberapa selector)
         address = ""
         if detail_root:
-            for sel in [
+            for i, sel in enumerate([
                 "button[data-item-id='address'] div.Io6YTe",
                 "[data-item-id='address'] div.Io6YTe",
-            ]:
+            ]):
                 try:
                     address_el = detail_root.find_element(By.CSS_SELECTOR, sel)
                     txt = address_el.text.strip()
                     if txt:
                         address = txt
+                        metrics.hit("address", i)
                         break
                 except Exception:
                     continue
@@ -246,12 +324,13 @@ class GoogleMapsSearchScraper:
                     ).text.strip()
                 except Exception:
                     address = ""
+                metrics.hit("address", 2 if address else None)
         else:
             address = self.get_detail_field([
                 "//button[contains(@aria-label,'Alamat')]/div[contains(@class,'Io6YTe')]",
                 "//button[contains(@data-item-id,'address')]/div[contains(@class,'Io6YTe')]",
                 "//div[contains(@class,'Io6YTe') and ancestor::button[contains(@aria-label,'Alamat')]]",
-            ], timeout=4)
+            ], timeout=4, metrics=metrics, group="address")
 
         # Ambil phone dari panel detail
         phone = ""
@@ -262,11 +341,12 @@ class GoogleMapsSearchScraper:
                 ".//button[contains(@data-item-id,'phone')]/div[contains(@class,'Io6YTe')]",
                 ".//a[starts-with(@href,'tel:')]/div[contains(@class,'Io6YTe')]",
             ]
-            for xp in phone_xpaths:
+            for i, xp in enumerate(phone_xpaths):
                 try:
                     txt = detail_root.find_element(By.XPATH, xp).text.strip()
                     if txt:
                         phone = txt
+                        metrics.hit("phone", i)
                         break
                 except Exception:
                     continue
@@ -278,22 +358,25 @@ class GoogleMapsSearchScraper:
                     "button[aria-label*='Telepon'] div.Io6YTe.fontBodyMedium.kR99db.fdkmkc",
                     "div.Io6YTe.fontBodyMedium.kR99db.fdkmkc",
                 ]
-                for sel in phone_css_selectors:
+                for i, sel in enumerate(phone_css_selectors, start=len(phone_xpaths)):
                     try:
                         el = detail_root.find_element(By.CSS_SELECTOR, sel)
                         txt = el.text.strip()
                         if txt:
                             phone = txt
+                            metrics.hit("phone", i)
                             break
                     except Exception:
                         continue
+                if not phone:
+                    metrics.hit("phone", None)
         else:
             phone = self.get_detail_field([
                 "//button[contains(@aria-label,'Telepon')]/div[contains(@class,'Io6YTe')]",
                 "//button[contains(@aria-label,'Nomor')]/div[contains(@class,'Io6YTe')]",
                 "//button[contains(@data-item-id,'phone')]/div[contains(@class,'Io6YTe')]",
                 "//a[starts-with(@href,'tel:')]/div[contains(@class,'Io6YTe')]",
-            ], timeout=4)
+            ], timeout=4, metrics=metrics, group="phone")
 
         data = {
             "name": name_detail or item.get("name", ""),
@@ -307,7 +390,97 @@ class GoogleMapsSearchScraper:
         print(f"✓ Extracted: name='{data['name'][:40]}', category='{data['category'][:30]}', phone='{data['phone'][:20]}'")
         return data
 
-    def scrape(self):
+    def fetch_details_direct(self, driver, item, timeout=15):
+        """Buka link tempat langsung lalu baca semua field dengan satu snapshot JS"""
+        metrics = PlaceMetrics("place_detail", link=item.get("link", ""), mode="direct")
+        attach_metrics(driver, metrics)
+        try:
+            details = self.snapshot_details(driver, item, metrics, timeout=timeout)
+        finally:
+            driver.metrics = None
+        metrics.set(ok=details is not None)
+        self.record_metrics(metrics)
+        return details
+
+    def snapshot_details(self, driver, item, metrics, timeout=15):
+        try:
+            with metrics.phase("page_load"):
+                driver.get(item["link"])
+                WebDriverWait(driver, timeout, poll_frequency=0.2).until(
+                    EC.visibility_of_element_located((By.CSS_SELECTOR, "h1.DUwDvf"))
+                )
+        except TimeoutException:
+            print(f"⚠ Judul tidak muncul untuk: {item.get('name','')}")
+        except Exception:
+            return None
+        try:
+            # Baris alamat/telepon dirender bersamaan; satu tunggu singkat, bukan per field
+            WebDriverWait(driver, 3, poll_frequency=0.2).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-item-id]"))
+            )
+        except TimeoutException:
+            pass
+        try:
+            snap = driver.execute_script(DETAIL_SNAPSHOT_JS) or {}
+        except Exception:
+            return None
+        for group, index in (snap.get("hits") or {}).items():
+            metrics.hit(group, index if index >= 0 else None)
+        data = {
+            "name": snap.get("name") or item.get("name", ""),
+            "link": item.get("link", ""),
+            "latitude": item.get("latitude"),
+            "longitude": item.get("longitude"),
+            "address": snap.get("address", ""),
+            "phone": snap.get("phone", ""),
+            "category": snap.get("category", ""),
+        }
+        print(f"✓ Extracted: name='{data['name'][:40]}', category='{data['category'][:30]}', phone='{data['phone'][:20]}'")
+        return data
+
+    def extract_details_parallel(self, items, on_place=None):
+        """Ambil detail banyak tempat paralel; tiap thread memakai satu browser sendiri.
+
+        on_place dipanggil begitu satu tempat selesai; hasil akhir tetap
+        mengikuti urutan daftar.
+        """
+        local = threading.local()
+        drivers = []
+        lock = threading.Lock()
+
+        def worker(item):
+            if getattr(local, "driver", None) is None:
+                local.driver = create_driver(headless=self.headless, lean=self.lean)
+                with lock:
+                    drivers.append(local.driver)
+            return self.fetch_details_direct(local.driver, item)
+
+        print(f"⟳ Ekstraksi detail paralel: {len(items)} tempat, {self.detail_workers} browser")
+        results = [None] * len(items)
+        try:
+            with ThreadPoolExecutor(max_workers=self.detail_workers) as pool:
+                futures = {pool.submit(worker, item): idx for idx, item in enumerate(items)}
+                for future in as_completed(futures):
+                    details = future.result()
+                    results[futures[future]] = details
+                    if details and on_place:
+                        on_place(details)
+            return results
+        finally:
+            for d in drivers:
+                try:
+                    d.quit()
+                except Exception:
+                    pass
+
+    def scrape(self, on_place=None, on_link=None):
+        """Cari tempat lalu ambil detailnya.
+
+        on_link(item) dipanggil untuk setiap link begitu daftar hasil
+        terkumpul, on_place(details) begitu detail satu tempat selesai;
+        keduanya dipakai main.py --pipeline agar scraping review bisa
+        langsung mulai.
+        """
         try:
             self.setup_driver()
             self.open_and_search()
@@ -316,7 +489,7 @@ class GoogleMapsSearchScraper:
                 container = self.get_results_container()
                 if container is not None:
                     break
-                time.sleep(0.5)
+                self.metrics.sleep(0.5)
             if container is None:
                 return []
             # Infinite scroll until enough places are visible
@@ -326,6 +499,25 @@ class GoogleMapsSearchScraper:
             # Batasi ke max_places
             if self.max_places:
                 all_items = all_items[: self.max_places]
+            if on_link:
+                for item in all_items:
+                    on_link(item)
+            if self.detail_workers and self.detail_workers > 1:
+                # Browser pencarian tidak dibutuhkan lagi; cukup href dari daftar
+                pending = []
+                for item in all_items:
+                    if item["link"] in self.seen_links:
+                        continue
+                    self.seen_links.add(item["link"])
+                    item.pop("element", None)
+                    pending.append(item)
+                self.driver.quit()
+                self.driver = None
+                for details in self.extract_details_parallel(pending, on_place=on_place):
+                    if details:
+                        self.results.append(details)
+                print(f"✓ Selesai ekstraksi. Total hasil: {len(self.results)}")
+                return self.results
             print(f"⟳ Mulai klik dan ekstraksi detail dari {len(all_items)} tempat...")
             for idx, item in enumerate(all_items, start=1):
                 if self.max_places and len(self.results) >= self.max_places:
@@ -336,6 +528,8 @@ class GoogleMapsSearchScraper:
                 if details:
                     self.results.append(details)
                     self.seen_links.add(item["link"]) 
+                    if on_place:
+                        on_place(details)
                     if idx % 5 == 0:
                         print(f"  📊 Progress detail: {len(self.results)} / {len(all_items)} selesai")
             print(f"✓ Selesai ekstraksi. Total hasil: {len(self.results)}")
@@ -346,6 +540,8 @@ class GoogleMapsSearchScraper:
                     self.driver.quit()
                 except Exception:
                     pass
+            self.metrics.set(places=len(self.results))
+            self.record_metrics(self.metrics)
 
     def save_to_csv(self, filename=None):
         if not self.results:
@@ -362,6 +558,40 @@ class GoogleMapsSearchScraper:
         df.to_csv(filename, index=False, encoding="utf-8-sig")
         return filename
 
+    def save_columnar(self, csv_filename, fmt="parquet"):
+        """Salinan places.csv dalam format kolumnar bertipe (lat/lng float, place_id)"""
+        if fmt == "csv" or not self.results:
+            return None
+        df = pd.DataFrame(self.results).drop(columns=["element"], errors="ignore")
+        if "link" in df.columns:
+            df = df.drop_duplicates(subset=["link"]).reset_index(drop=True)
+        return write_frame(typed_places(df), format_path(csv_filename, fmt))
+
+
+class PlacesCsvWriter:
+    """Tulis places.csv baris per baris begitu detail tempat didapat (dedup per link)"""
+
+    FIELDS = ["name", "link", "latitude", "longitude", "address", "phone", "category"]
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.seen_links = set()
+        self.lock = threading.Lock()
+        folder = os.path.dirname(filename)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(filename, "w", newline="", encoding="utf-8-sig") as f:
+            csv.DictWriter(f, fieldnames=self.FIELDS, lineterminator="\n").writeheader()
+
+    def write(self, details):
+        with self.lock:
+            if details.get("link") in self.seen_links:
+                return
+            self.seen_links.add(details.get("link"))
+            with open(self.filename, "a", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=self.FIELDS, lineterminator="\n")
+                writer.writerow({k: ("" if details.get(k) is None else details.get(k)) for k in self.FIELDS})
+
 
 if __name__ == "__main__":
     q = "geprek kak rose"
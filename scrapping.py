@@ -1,34 +1,200 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.keys import Keys
+import csv
+import glob
+import os
+import re
+import queue
+import threading
 import time
 import pandas as pd
 from datetime import datetime
 
+from browser import create_driver, transfer_bytes
+from ledger import JobLedger
+from metrics import MetricsWriter, PlaceMetrics, attach_metrics
+from storage import export_reviews
+
+
+# MutationObserver: selesai begitu jumlah div.jftiEf atau scrollHeight panel
+# berbeda dari snapshot sebelumnya, atau saat timeout habis.
+WAIT_FOR_PANEL_CHANGE_JS = """
+var panel = arguments[0], before = arguments[1], timeoutMs = arguments[2];
+var done = arguments[arguments.length - 1];
+function snap() {
+    return [document.querySelectorAll('div.jftiEf').length, panel ? panel.scrollHeight : 0];
+}
+function changed(s) { return s[0] !== before[0] || s[1] !== before[1]; }
+var first = snap();
+if (changed(first)) { done(first); return; }
+var finished = false, timer = null;
+var observer = new MutationObserver(function() {
+    var s = snap();
+    if (changed(s)) { finish(s); }
+});
+function finish(s) {
+    if (finished) { return; }
+    finished = true;
+    observer.disconnect();
+    clearTimeout(timer);
+    done(s);
+}
+observer.observe(panel || document.body, {childList: true, subtree: true});
+timer = setTimeout(function() { finish(snap()); }, timeoutMs);
+"""
+
+
+# Hapus container yang sudah dipanen kecuali keepTail terakhir (arguments[1]);
+# keepTail < 0 berarti tidak ada yang dihapus.
+PRUNE_HARVESTED_JS = """
+var keepTail = arguments[1], pruned = 0;
+if (keepTail >= 0) {
+    var old = document.querySelectorAll('div.jftiEf[data-harvested]');
+    for (var i = 0; i < old.length - keepTail; i++) { old[i].remove(); pruned++; }
+}
+return pruned;
+"""
+
+# Ekstraksi massal dalam satu round-trip: klik semua tombol 'Lainnya' yang
+# terlihat, tunggu sebentar, lalu kembalikan {username, rating, review}
+# per container dengan aturan yang sama seperti extract_review_data.
+# freshOnly membatasi ke container tanpa data-harvested (mode streaming).
+BULK_EXTRACT_JS = """
+var settleMs = arguments[0], freshOnly = arguments[1], keepTail = arguments[2];
+var done = arguments[arguments.length - 1];
+function text(el) {
+    return el ? (el.innerText || '').replace(/\\u00a0/g, ' ').trim() : null;
+}
+var containers = Array.prototype.filter.call(
+    document.querySelectorAll('div.jftiEf'),
+    function(c) { return !freshOnly || !c.hasAttribute('data-harvested'); }
+);
+function collect() {
+    var records = containers.map(function(c) {
+        var user = c.querySelector('div.d4r55');
+        var ratingEl = c.querySelector('span.kvMYJc');
+        var reviewEl = c.querySelector('span.wiI7pd');
+        c.setAttribute('data-harvested', '1');
+        return {
+            username: user ? text(user) : 'Unknown',
+            rating: ratingEl ? ratingEl.getAttribute('aria-label') : null,
+            review: reviewEl ? text(reviewEl) : ''
+        };
+    });
+    var pruned = 0;
+    if (keepTail >= 0) {
+        var old = document.querySelectorAll('div.jftiEf[data-harvested]');
+        for (var i = 0; i < old.length - keepTail; i++) { old[i].remove(); pruned++; }
+    }
+    return {records: records, pruned: pruned};
+}
+var clicked = 0;
+containers.forEach(function(c) {
+    c.querySelectorAll('button.w8nwRe.kyuRq').forEach(function(btn) {
+        if (btn.offsetParent !== null) { btn.click(); clicked++; }
+    });
+});
+if (!clicked) { done(collect()); return; }
+setTimeout(function() { done(collect()); }, settleMs);
+"""
+
+
 class GoogleMapsReviewScraper:
-    def __init__(self, url, max_reviews=None):
+    # Backoff mode adaptive saat panel tidak berubah: 0.25s, 0.5s, ... maks 4s
+    ADAPTIVE_MIN_WAIT = 0.25
+    ADAPTIVE_MAX_WAIT = 4.0
+
+    def __init__(self, url, max_reviews=None, driver=None, wait_mode="fixed", extract_mode="bulk",
+                 stream_keep_tail=10, incremental=False, history_dir=None, known_keys=None,
+                 known_stop_run=5, headless=False, lean=False, track_bytes=False):
         self.url = url
         self.max_reviews = max_reviews
-        self.driver = None
+        # Driver dari luar (mis. worker pool) dipakai ulang dan tidak ditutup di sini
+        self.driver = driver
+        self.owns_driver = driver is None
+        # Opsi browser jika driver dibuat sendiri (lihat browser.create_driver)
+        self.headless = headless
+        self.lean = lean
+        self.track_bytes = track_bytes
         self.reviews = []
         self.seen_reviews = set()
+        # Pesan error jika scraping berhenti karena exception (dipakai ledger untuk retry)
+        self.error = None
+        # "fixed" = time.sleep tetap (perilaku lama), "adaptive" = tunggu perubahan DOM
+        self.wait_mode = wait_mode
+        self.timing = {"fixed_seconds": 0.0, "waited_seconds": 0.0, "waits": 0,
+                       "place_seconds": None, "transfer_bytes": None}
+        self.place_started = None
+        # "bulk" = satu execute_script untuk semua container, "element" = jalur lama per elemen
+        self.extract_mode = extract_mode
+        # Mode streaming: jumlah container terakhir yang dibiarkan di DOM sebagai jangkar scroll
+        self.stream_keep_tail = stream_keep_tail
+        # Mode incremental: urutkan 'Terbaru' dan berhenti setelah known_stop_run
+        # review berturut-turut yang sudah ada di CSV sebelumnya (history_dir)
+        self.incremental = incremental
+        self.history_dir = history_dir
+        self.known_keys = known_keys
+        self.known_stop_run = known_stop_run
+        self.known_streak = 0
+        # Path CSV terakhir yang ditulis save_to_csv
+        self.saved_path = None
+        # Metrik per tempat (ditulis ke metrics.jsonl oleh scrape_place)
+        self.metrics = PlaceMetrics("review", link=url, wait_mode=wait_mode, extract_mode=extract_mode)
+
+    @property
+    def adaptive(self):
+        return self.wait_mode == "adaptive"
+
+    def record_wait(self, fixed_seconds, started):
+        """Catat satu titik tunggu: durasi sleep lama vs waktu tunggu sebenarnya"""
+        self.timing["fixed_seconds"] += fixed_seconds
+        self.timing["waited_seconds"] += time.time() - started
+        self.timing["waits"] += 1
+
+    def pause(self, seconds):
+        """time.sleep yang ikut tercatat di laporan timing"""
+        started = time.time()
+        time.sleep(seconds)
+        self.metrics.add_sleep(seconds)
+        self.record_wait(seconds, started)
+
+    def panel_snapshot(self, scroll_element=None):
+        """(jumlah container review, scrollHeight panel)"""
+        return self.driver.execute_script(
+            "return [document.querySelectorAll('div.jftiEf').length, arguments[0] ? arguments[0].scrollHeight : 0];",
+            scroll_element,
+        )
+
+    def wait_for_panel_change(self, before, scroll_element=None, timeout=ADAPTIVE_MAX_WAIT):
+        """Tunggu sampai jumlah container atau scrollHeight berubah, maksimal timeout detik"""
+        self.driver.set_script_timeout(timeout + 5)
+        try:
+            return self.driver.execute_async_script(
+                WAIT_FOR_PANEL_CHANGE_JS, scroll_element, list(before), int(timeout * 1000)
+            )
+        except Exception:
+            return list(before)
+
+    def wait_for_selector(self, selector, fixed_seconds, timeout=10):
+        """Mode adaptive: tunggu selector muncul; mode fixed: sleep seperti semula"""
+        if not self.adaptive:
+            self.pause(fixed_seconds)
+            return
+        started = time.time()
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=0.1).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+            )
+        except TimeoutException:
+            pass
+        self.record_wait(fixed_seconds, started)
         
     def setup_driver(self):
         """Inisialisasi Chrome driver dengan opsi anti-deteksi"""
-        options = Options()
-        options.add_argument("--lang=id")
-        options.add_argument("--accept-language=id-ID,id")
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        options.add_experimental_option('useAutomationExtension', False)
-        
-        self.driver = webdriver.Chrome(options=options)
-        self.driver.maximize_window()
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        self.driver = create_driver(headless=self.headless, lean=self.lean, track_bytes=self.track_bytes)
         print("Browser berhasil diinisialisasi")
         
     def get_place_name(self):
@@ -52,8 +218,13 @@ class GoogleMapsReviewScraper:
             review_section = wait.until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, "div.m6QErb.WNBkOb.XiKgde"))
             )
-            self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", review_section)
-            time.sleep(2)
+            if self.adaptive:
+                # Scroll instan: tombol 'Ulasan lainnya' ditunggu oleh WebDriverWait berikutnya
+                self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", review_section)
+                self.record_wait(2, time.time())
+            else:
+                self.driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", review_section)
+                self.pause(2)
             print("Berhasil scroll ke section reviews")
             return True
         except Exception as e:
@@ -68,15 +239,22 @@ class GoogleMapsReviewScraper:
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "button.M77dve[aria-label*='Ulasan lainnya']"))
             )
             more_button.click()
-            time.sleep(3)
+            self.wait_for_selector("div.jftiEf", fixed_seconds=3)
             print("Berhasil klik tombol 'Ulasan lainnya'")
             
             # Langsung scroll panel ulasan agar konten muncul
             try:
                 panel = self.get_scrollable_element()
                 if panel:
-                    self.driver.execute_script("arguments[0].scrollBy(0, 1000);", panel)
-                    time.sleep(1)
+                    if self.adaptive:
+                        before = self.panel_snapshot(panel)
+                        self.driver.execute_script("arguments[0].scrollBy(0, 1000);", panel)
+                        started = time.time()
+                        self.wait_for_panel_change(before, panel, timeout=1)
+                        self.record_wait(1, started)
+                    else:
+                        self.driver.execute_script("arguments[0].scrollBy(0, 1000);", panel)
+                        self.pause(1)
             except Exception:
                 pass
             print("Panel review lengkap berhasil dimuat")
@@ -90,11 +268,23 @@ class GoogleMapsReviewScraper:
         try:
             more_button = review_container.find_element(By.CSS_SELECTOR, "button.w8nwRe.kyuRq")
             if more_button.is_displayed():
+                if self.adaptive:
+                    # Klik via JS tidak butuh scroll; cukup tunggu tombol hilang
+                    started = time.time()
+                    self.driver.execute_script("arguments[0].click();", more_button)
+                    try:
+                        WebDriverWait(self.driver, 1, poll_frequency=0.05).until(
+                            EC.invisibility_of_element(more_button)
+                        )
+                    except TimeoutException:
+                        pass
+                    self.record_wait(0.5, started)
+                    return True
                 # Scroll ke button dulu
                 self.driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", more_button)
-                time.sleep(0.2)
+                self.pause(0.2)
                 self.driver.execute_script("arguments[0].click();", more_button)
-                time.sleep(0.3)
+                self.pause(0.3)
                 return True
         except NoSuchElementException:
             return False
@@ -129,26 +319,69 @@ class GoogleMapsReviewScraper:
             except NoSuchElementException:
                 review_text = ""
             
-            # Validasi data
-            if not review_text or not username:
-                return None
-            
-            # Cek duplikasi
-            review_key = (username, review_text[:100])
-            if review_key in self.seen_reviews:
-                return None
-            
-            self.seen_reviews.add(review_key)
-            
-            return {
-                "nama_tempat": nama_tempat,
-                "username": username,
-                "rating": rating,
-                "review": review_text
-            }
+            return self.build_record(nama_tempat, username, rating, review_text)
             
         except Exception:
             return None
+
+    def build_record(self, nama_tempat, username, rating, review_text):
+        """Validasi + dedup via seen_reviews; dipakai jalur per-elemen maupun bulk"""
+        # Validasi data
+        if not review_text or not username:
+            return None
+        
+        # Cek duplikasi
+        review_key = (username, review_text[:100])
+        if self.known_keys and review_key in self.known_keys:
+            self.known_streak += 1
+            return None
+        if review_key in self.seen_reviews:
+            return None
+        
+        self.seen_reviews.add(review_key)
+        self.known_streak = 0
+        
+        return {
+            "nama_tempat": nama_tempat,
+            "username": username,
+            "rating": rating,
+            "review": review_text
+        }
+
+    def run_extract_script(self, fresh_only=False, keep_tail=-1, settle_seconds=0.3):
+        """Jalankan BULK_EXTRACT_JS; return {records, pruned} atau None jika gagal"""
+        self.driver.set_script_timeout(settle_seconds + 30)
+        try:
+            return self.driver.execute_async_script(
+                BULK_EXTRACT_JS, int(settle_seconds * 1000), fresh_only, keep_tail
+            )
+        except Exception as e:
+            print(f"⚠ Ekstraksi bulk gagal, kembali ke per-elemen: {e}")
+            return None
+
+    def extract_reviews_bulk(self, nama_tempat, settle_seconds=0.3):
+        """Expand + extract semua container dalam satu execute_script.
+
+        Return list record (sudah divalidasi dan di-dedup), atau None jika
+        script gagal sehingga pemanggil bisa kembali ke jalur per-elemen.
+        """
+        result = self.run_extract_script(settle_seconds=settle_seconds)
+        if result is None:
+            return None
+        return self.records_from_raw(result.get("records") or [], nama_tempat)
+
+    def records_from_raw(self, raw, nama_tempat):
+        """Ubah hasil JS menjadi record lewat build_record, hormati max_reviews"""
+        records = []
+        for item in raw:
+            if self.max_reviews and len(self.reviews) + len(records) >= self.max_reviews:
+                break
+            rating_text = item.get("rating")
+            rating = rating_text.split()[0] if rating_text else "Unknown"
+            data = self.build_record(nama_tempat, item.get("username") or "", rating, item.get("review") or "")
+            if data:
+                records.append(data)
+        return records
     
     def get_scrollable_element(self):
         """Dapatkan elemen yang bisa di-scroll"""
@@ -164,11 +397,37 @@ class GoogleMapsReviewScraper:
                 element = self.driver.find_element(By.CSS_SELECTOR, selector)
                 if element:
                     print(f"Menemukan scrollable element dengan selector: {selector}")
+                    self.metrics.hit("scrollable_panel", selector)
                     return element
             except NoSuchElementException:
                 continue
+        self.metrics.hit("scrollable_panel", None)
         return None
     
+    def scroll_review_panel_adaptive(self, scroll_element, scroll_amount=3000, timeout=ADAPTIVE_MAX_WAIT):
+        """Scroll panel lalu tunggu DOM berubah; return snapshot sebelum dan sesudah.
+
+        Jika snapshot atau scrollBy gagal (panel stale, script error), panel
+        digulir dengan PAGE_DOWN seperti scroll_review_panel dan (before,
+        before) dikembalikan, jadi pemanggil menganggapnya tanpa perubahan.
+        """
+        before = [0, 0]
+        try:
+            before = self.panel_snapshot(scroll_element)
+            self.driver.execute_script(f"arguments[0].scrollBy(0, {scroll_amount})", scroll_element)
+        except Exception:
+            print("Error saat scroll")
+            try:
+                scroll_element.send_keys(Keys.PAGE_DOWN)
+                self.pause(1)
+            except Exception:
+                pass
+            return before, before
+        started = time.time()
+        after = self.wait_for_panel_change(before, scroll_element, timeout=timeout)
+        self.record_wait(1.5, started)
+        return before, after
+
     def scroll_review_panel(self, scroll_element, scroll_amount=3000):
         """Scroll di dalam panel review dengan berbagai metode"""
         if not scroll_element:
@@ -180,7 +439,7 @@ class GoogleMapsReviewScraper:
             
             # Scroll dengan amount tertentu (bukan langsung ke bottom)
             self.driver.execute_script(f"arguments[0].scrollBy(0, {scroll_amount})", scroll_element)
-            time.sleep(1.5)
+            self.pause(1.5)
             
             # Cek apakah posisi scroll berubah
             scroll_top_after = self.driver.execute_script("return arguments[0].scrollTop", scroll_element)
@@ -193,7 +452,7 @@ class GoogleMapsReviewScraper:
             # Method 2: Fallback dengan send keys
             try:
                 scroll_element.send_keys(Keys.PAGE_DOWN)
-                time.sleep(1)
+                self.pause(1)
                 return True
             except Exception:
                 return False
@@ -237,7 +496,7 @@ class GoogleMapsReviewScraper:
     def wait_for_reviews_to_load(self):
         """Tunggu sampai review containers muncul"""
         max_wait = 15
-        wait_interval = 0.5
+        wait_interval = 0.1 if self.adaptive else 0.5
         elapsed = 0
         
         while elapsed < max_wait:
@@ -249,48 +508,140 @@ class GoogleMapsReviewScraper:
             except Exception:
                 pass
             
-            time.sleep(wait_interval)
+            self.metrics.sleep(wait_interval)
             elapsed += wait_interval
         
         return []
     
-    def scrape_reviews(self):
-        """Main function untuk scraping reviews"""
-        try:
-            # Setup driver
-            self.setup_driver()
-            
-            # Buka URL
-            print("\n⟳ Membuka URL...")
+    def open_review_panel(self):
+        """Buka URL sampai panel review lengkap siap; return (nama_tempat, scroll_element)"""
+        # Mulai pengukuran per tempat; kosongkan log byte dari tempat sebelumnya
+        self.place_started = time.time()
+        transfer_bytes(self.driver)
+        attach_metrics(self.driver, self.metrics)
+
+        # Buka URL
+        print("\n⟳ Membuka URL...")
+        with self.metrics.phase("page_load"):
             self.driver.get(self.url)
-            time.sleep(5)
-            
+            # Mode adaptive: get_place_name sudah menunggu h1 dengan WebDriverWait
+            self.wait_for_selector("h1.DUwDvf", fixed_seconds=5)
+
             # Ambil nama tempat
             nama_tempat = self.get_place_name()
+        
+        # Scroll ke section reviews
+        if not self.scroll_to_reviews_section():
+            print("✗ Gagal menemukan section reviews")
+            return nama_tempat, None
+        
+        # Klik tombol "Ulasan lainnya"
+        if not self.click_more_reviews_button():
+            print("✗ Gagal membuka panel reviews lengkap")
+            return nama_tempat, None
+        
+        print(f"\n⟳ Mulai scraping reviews (Target: {self.max_reviews if self.max_reviews else 'Semua'})")
+        
+        # Dapatkan elemen yang bisa di-scroll
+        scroll_element = self.get_scrollable_element()
+        if not scroll_element:
+            print("✗ Tidak dapat menemukan elemen scrollable")
+            return nama_tempat, None
+        
+        print("✓ Elemen scrollable ditemukan")
+        
+        # Sembunyikan element yang menghalangi
+        self.hide_image_elements()
+        self.hide_gakpenting_elements()
+        return nama_tempat, scroll_element
+
+    def sort_by_newest(self):
+        """Urutkan panel review ke 'Terbaru' lewat menu 'Urutkan'"""
+        sort_selectors = [
+            "button[aria-label*='Urutkan']",
+            "button[data-value='Urutkan']",
+            "button[aria-label*='Sort']",
+        ]
+        try:
+            sort_button = None
+            for selector in sort_selectors:
+                buttons = self.driver.find_elements(By.CSS_SELECTOR, selector)
+                if buttons:
+                    sort_button = buttons[0]
+                    break
+            if sort_button is None:
+                print("⚠ Tombol 'Urutkan' tidak ditemukan, urutan default dipakai")
+                return False
+            self.driver.execute_script("arguments[0].click();", sort_button)
+            items = WebDriverWait(self.driver, 5, poll_frequency=0.1).until(
+                EC.presence_of_all_elements_located((By.CSS_SELECTOR, "div[role='menuitemradio']"))
+            )
+            target = next((el for el in items if el.text.strip().lower() in ("terbaru", "newest")), None)
+            if target is None and len(items) > 1:
+                # Urutan menu: Paling relevan, Terbaru, Rating tertinggi, Rating terendah
+                target = items[1]
+            if target is None:
+                return False
+            before = self.panel_snapshot()
+            self.driver.execute_script("arguments[0].click();", target)
+            # Panel dimuat ulang; tunggu daftar berganti sebelum mulai panen
+            if self.adaptive:
+                self.wait_for_panel_change(before, timeout=3)
+                self.wait_for_selector("div.jftiEf", fixed_seconds=2)
+            else:
+                self.pause(2)
+            print("✓ Review diurutkan: Terbaru")
+            return True
+        except Exception as e:
+            print(f"⚠ Gagal mengurutkan review: {e}")
+            return False
+
+    def scroll_step(self, scroll_element, backoff):
+        """Satu langkah scroll sesuai wait_mode; return (backoff baru, hanya spinner?)"""
+        self.metrics.incr("scroll_iterations")
+        if not self.adaptive:
+            self.scroll_review_panel(scroll_element, scroll_amount=1800)
+            return backoff, False
+        before, after = self.scroll_review_panel_adaptive(
+            scroll_element, scroll_amount=1800, timeout=backoff
+        )
+        if after[0] > before[0]:
+            return self.ADAPTIVE_MIN_WAIT, False
+        if list(after) == list(before):
+            return min(backoff * 2, self.ADAPTIVE_MAX_WAIT), False
+        # scrollHeight berubah (mis. spinner) tapi belum ada review baru
+        return backoff, True
+
+    def scrape_reviews(self, stream=False, on_review=None):
+        """Main function untuk scraping reviews.
+
+        stream=True mengekstrak review baru setiap langkah scroll (lihat
+        stream_reviews); on_review dipanggil untuk setiap record baru begitu
+        diekstrak. Tanpa stream, ekstraksi baru dimulai setelah scroll
+        selesai, jadi on_review pertama kali terpanggil di akhir scroll.
+        Mode incremental selalu memakai jalur streaming.
+        """
+        if stream or self.incremental:
+            try:
+                for data in self.stream_reviews():
+                    if on_review:
+                        on_review(data)
+            except Exception as e:
+                # Review yang sudah dipanen tetap dikembalikan
+                self.error = str(e) or type(e).__name__
+                print(f"\n✗ Error fatal (streaming): {e}")
+                import traceback
+                traceback.print_exc()
+            return self.reviews
+
+        try:
+            # Setup driver (lewati jika driver sudah disediakan pool)
+            if self.driver is None:
+                self.setup_driver()
             
-            # Scroll ke section reviews
-            if not self.scroll_to_reviews_section():
-                print("✗ Gagal menemukan section reviews")
-                return []
-            
-            # Klik tombol "Ulasan lainnya"
-            if not self.click_more_reviews_button():
-                print("✗ Gagal membuka panel reviews lengkap")
-                return []
-            
-            print(f"\n⟳ Mulai scraping reviews (Target: {self.max_reviews if self.max_reviews else 'Semua'})")
-            
-            # Dapatkan elemen yang bisa di-scroll
-            scroll_element = self.get_scrollable_element()
+            nama_tempat, scroll_element = self.open_review_panel()
             if not scroll_element:
-                print("✗ Tidak dapat menemukan elemen scrollable")
                 return []
-            
-            print("✓ Elemen scrollable ditemukan")
-            
-            # Sembunyikan element yang menghalangi
-            self.hide_image_elements()
-            self.hide_gakpenting_elements()
 
             # INFINITE SCROLL: muat semua containers terlebih dahulu
             print("\n⟳ Infinite scroll hingga mencapai target containers...")
@@ -300,6 +651,11 @@ class GoogleMapsReviewScraper:
             stagnant_streak = 0
             max_stagnant = 8
             max_attempts = 300
+            # Mode adaptive: timeout tunggu naik eksponensial hanya saat DOM diam.
+            # Deret 0.25 → 4s berarti ~7.75s total diam sebelum berhenti.
+            backoff = self.ADAPTIVE_MIN_WAIT
+            if self.adaptive:
+                max_stagnant = 5
 
             while True:
                 containers = self.driver.find_elements(By.CSS_SELECTOR, "div.jftiEf")
@@ -324,7 +680,10 @@ class GoogleMapsReviewScraper:
                     break
 
                 # Scroll bertahap
-                self.scroll_review_panel(scroll_element, scroll_amount=1800)
+                backoff, spinner_only = self.scroll_step(scroll_element, backoff)
+                if spinner_only:
+                    # jangan dihitung stagnan
+                    stagnant_streak = max(0, stagnant_streak - 1)
                 scroll_attempts += 1
 
                 # Sembunyikan elemen periodik untuk kelancaran
@@ -337,34 +696,210 @@ class GoogleMapsReviewScraper:
                     print(f"  📊 Containers: {current_count} | Scroll: {scroll_attempts}")
 
             print(f"✓ Selesai scroll. Total containers termuat: {seen_count}")
+            self.metrics.set(containers=seen_count)
 
             # EXTRACT SEKALI DI AKHIR
             print("\n⟳ Mulai extract data sekali jalan...")
-            final_containers = self.driver.find_elements(By.CSS_SELECTOR, "div.jftiEf")
             extracted = 0
-            for container in final_containers:
-                if self.max_reviews and len(self.reviews) >= self.max_reviews:
-                    break
-                data = self.extract_review_data(container, nama_tempat)
-                if data:
+            bulk = self.extract_reviews_bulk(nama_tempat) if self.extract_mode == "bulk" else None
+            self.metrics.hit("extract_path", "element" if bulk is None else "bulk")
+            if bulk is not None:
+                for data in bulk:
                     self.reviews.append(data)
-                    extracted += 1
+                    if on_review:
+                        on_review(data)
+                extracted = len(bulk)
+            else:
+                final_containers = self.driver.find_elements(By.CSS_SELECTOR, "div.jftiEf")
+                for container in final_containers:
+                    if self.max_reviews and len(self.reviews) >= self.max_reviews:
+                        break
+                    data = self.extract_review_data(container, nama_tempat)
+                    if data:
+                        self.reviews.append(data)
+                        if on_review:
+                            on_review(data)
+                        extracted += 1
             print(f"✓ Extract selesai. Didapat: {extracted} records")
             print(f"\n✓ Scraping selesai! Total: {len(self.reviews)} reviews")
             print(f"  Total scroll attempts: {scroll_attempts}")
+            self.print_timing()
             return self.reviews
             
         except Exception as e:
+            self.error = str(e) or type(e).__name__
             print(f"\n✗ Error fatal: {e}")
             import traceback
             traceback.print_exc()
             return []
         
         finally:
-            if self.driver:
+            if self.driver and self.owns_driver:
+                self.driver.quit()
+                print("✓ Browser ditutup")
+
+    def harvest_new_containers(self, nama_tempat):
+        """Ekstrak container yang belum dipanen lalu buang node lama dari DOM.
+
+        Return (records, jumlah container baru). Jika script bulk gagal atau
+        extract_mode="element", container baru diproses per elemen.
+        """
+        if self.extract_mode == "bulk":
+            result = self.run_extract_script(fresh_only=True, keep_tail=self.stream_keep_tail)
+            if result is not None:
+                raw = result.get("records") or []
+                self.metrics.hit("extract_path", "bulk")
+                return self.records_from_raw(raw, nama_tempat), len(raw)
+        self.metrics.hit("extract_path", "element")
+
+        containers = self.driver.find_elements(By.CSS_SELECTOR, "div.jftiEf:not([data-harvested])")
+        records = []
+        for container in containers:
+            if self.max_reviews and len(self.reviews) + len(records) >= self.max_reviews:
+                break
+            data = self.extract_review_data(container, nama_tempat)
+            if data:
+                records.append(data)
+        try:
+            self.driver.execute_script(
+                "arguments[0].forEach(function(c) { c.setAttribute('data-harvested', '1'); });"
+                + PRUNE_HARVESTED_JS,
+                containers, self.stream_keep_tail,
+            )
+        except Exception:
+            pass
+        return records, len(containers)
+
+    def stream_reviews(self):
+        """Generator review: ekstrak setiap langkah scroll, DOM dijaga tetap kecil.
+
+        Container yang sudah dipanen ditandai data-harvested dan dihapus dari
+        panel (kecuali stream_keep_tail terakhir agar infinite scroll tetap
+        jalan). Dedup tetap lewat seen_reviews. Setiap record juga masuk ke
+        self.reviews sehingga hasil parsial tidak hilang saat browser crash.
+        """
+        try:
+            if self.driver is None:
+                self.setup_driver()
+
+            nama_tempat, scroll_element = self.open_review_panel()
+            if not scroll_element:
+                return
+
+            if self.incremental:
+                if self.known_keys is None:
+                    self.known_keys = load_known_review_keys(self.history_dir, nama_tempat)
+                print(f"⟳ Incremental: {len(self.known_keys)} review sudah dikenal untuk '{nama_tempat}'")
+                self.sort_by_newest()
+
+            print("\n⟳ Streaming: ekstrak per langkah scroll...")
+            harvested = 0
+            scroll_attempts = 0
+            stagnant_streak = 0
+            max_stagnant = 5 if self.adaptive else 8
+            max_attempts = 300
+            backoff = self.ADAPTIVE_MIN_WAIT
+
+            while True:
+                records, fresh = self.harvest_new_containers(nama_tempat)
+                harvested += fresh
+                self.metrics.set(containers=harvested)
+                for data in records:
+                    self.reviews.append(data)
+                    yield data
+
+                if self.max_reviews and len(self.reviews) >= self.max_reviews:
+                    print(f"✓ Target review tercapai: {len(self.reviews)}/{self.max_reviews}")
+                    break
+
+                if self.incremental and self.known_keys and self.known_streak >= self.known_stop_run:
+                    print(f"✓ Mencapai {self.known_streak} review lama berturut-turut, berhenti. "
+                          f"Review baru: {len(self.reviews)}")
+                    break
+
+                if fresh:
+                    stagnant_streak = 0
+                else:
+                    stagnant_streak += 1
+
+                if stagnant_streak >= max_stagnant:
+                    print(f"⚠ Stagnan {stagnant_streak} langkah, berhenti scroll. Total dipanen: {harvested}")
+                    break
+
+                if scroll_attempts >= max_attempts:
+                    print(f"⚠ Mencapai batas scroll: {max_attempts}")
+                    break
+
+                backoff, spinner_only = self.scroll_step(scroll_element, backoff)
+                if spinner_only:
+                    stagnant_streak = max(0, stagnant_streak - 1)
+                scroll_attempts += 1
+
+                if scroll_attempts % 4 == 0:
+                    self.hide_image_elements()
+                    self.hide_gakpenting_elements()
+
+                if scroll_attempts % 10 == 0:
+                    print(f"  📊 Dipanen: {harvested} | Review: {len(self.reviews)} | Scroll: {scroll_attempts}")
+
+            print(f"\n✓ Scraping selesai! Total: {len(self.reviews)} reviews")
+            print(f"  Total scroll attempts: {scroll_attempts}")
+            self.print_timing()
+
+        finally:
+            if self.driver and self.owns_driver:
                 self.driver.quit()
                 print("✓ Browser ditutup")
     
+    def finish_place(self):
+        """Tutup pengukuran per tempat: durasi dan byte terunduh (jika dilacak)"""
+        if self.place_started is not None:
+            self.timing["place_seconds"] = time.time() - self.place_started
+        if self.driver is not None:
+            self.timing["transfer_bytes"] = transfer_bytes(self.driver)
+            if getattr(self.driver, "metrics", None) is self.metrics:
+                self.driver.metrics = None
+
+    def metrics_record(self):
+        """Record metrik tempat ini untuk metrics.jsonl (dict siap JSON)"""
+        if self.timing["place_seconds"] is None:
+            self.finish_place()
+        place = self.timing["place_seconds"]
+        # Throughput container dihitung setelah halaman terbuka (tanpa page load)
+        busy = (place or 0.0) - self.metrics.phases.get("page_load", 0.0)
+        containers = self.metrics.fields.get("containers", 0)
+        self.metrics.set(
+            reviews=len(self.reviews),
+            error=self.error,
+            containers_per_second=round(containers / busy, 2) if containers and busy > 0 else None,
+            **self.timing_summary(),
+        )
+        return self.metrics.to_dict()
+
+    def timing_summary(self):
+        """Ringkasan waktu tunggu: sleep mode fixed vs waktu tunggu sebenarnya"""
+        fixed = self.timing["fixed_seconds"]
+        waited = self.timing["waited_seconds"]
+        place = self.timing["place_seconds"]
+        sent = self.timing["transfer_bytes"]
+        return {
+            "wait_mode": self.wait_mode,
+            "waits": self.timing["waits"],
+            "fixed_seconds": round(fixed, 2),
+            "waited_seconds": round(waited, 2),
+            "saved_seconds": round(fixed - waited, 2),
+            "place_seconds": round(place, 2) if place is not None else None,
+            "transfer_kb": round(sent / 1024, 1) if sent is not None else None,
+        }
+
+    def print_timing(self):
+        self.finish_place()
+        t = self.timing_summary()
+        print(f"  ⏱ Waktu tunggu ({t['wait_mode']}): {t['waited_seconds']:.1f}s "
+              f"| setara sleep fixed: {t['fixed_seconds']:.1f}s | hemat: {t['saved_seconds']:.1f}s")
+        if t["transfer_kb"] is not None:
+            print(f"  📦 Transfer: {t['transfer_kb']:.0f} KB dalam {t['place_seconds']:.1f}s")
+
     def save_to_csv(self, filename=None):
         """Simpan hasil scraping ke CSV"""
         if not self.reviews:
@@ -381,11 +916,11 @@ class GoogleMapsReviewScraper:
                 filename = f"dataset/reviews_{nama_tempat}_{timestamp}.csv"
             
             # Pastikan folder dataset ada
-            import os
             os.makedirs("dataset", exist_ok=True)
             
             # Simpan ke CSV
             df.to_csv(filename, index=False, encoding='utf-8-sig')
+            self.saved_path = filename
             print(f"\n✓ Data berhasil disimpan ke: {filename}")
             
             # Tampilkan statistik
@@ -408,47 +943,494 @@ class GoogleMapsReviewScraper:
             return False
 
 
-def scrape_batch_from_links(csv_file, max_reviews=None, delay_between=2, output_dir=None):
+def review_output_path(output_dir, place_name):
+    """Nama file review unik di output_dir untuk satu tempat"""
+    safe_place = re.sub(r"\W+", "_", str(place_name)).strip("_")[:50]
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = os.path.join(output_dir, f"reviews_{safe_place}_{ts}.csv")
+    # Beberapa worker bisa menyimpan cabang bernama sama pada detik yang sama;
+    # file kosong dibuat dengan mode 'x' agar nama langsung "dipesan"
+    suffix = 1
+    while True:
+        try:
+            open(filename, "x").close()
+            return filename
+        except FileExistsError:
+            suffix += 1
+            filename = os.path.join(output_dir, f"reviews_{safe_place}_{ts}_{suffix}.csv")
+
+
+def save_place_reviews(scraper, output_dir=None):
+    """Simpan review satu tempat ke output_dir dengan nama file unik"""
+    if not output_dir:
+        return scraper.save_to_csv()
+    try:
+        place_name = scraper.reviews[0]['nama_tempat'] if scraper.reviews else 'unknown'
+        return scraper.save_to_csv(filename=review_output_path(output_dir, place_name))
+    except Exception:
+        # fallback default
+        return scraper.save_to_csv()
+
+
+class ReviewAppender:
+    """Tulis review ke CSV baris per baris begitu dipanen.
+
+    Format sama dengan save_to_csv (utf-8-sig, kolom nama_tempat, username,
+    rating, review). Jika path sudah ada (run sebelumnya mati di tengah),
+    file dilanjutkan dan key review lamanya tersedia di existing_keys.
+    """
+
+    FIELDS = ["nama_tempat", "username", "rating", "review"]
+
+    def __init__(self, output_dir=None, path=None):
+        self.output_dir = output_dir or "dataset"
+        self.path = path
+        self.file = None
+        self.writer = None
+        self.count = 0
+        self.existing_keys = set()
+        if path and os.path.exists(path):
+            self.existing_keys = load_review_keys(path)
+            self.count = len(self.existing_keys)
+
+    def write(self, data):
+        if self.file is None:
+            if not self.path:
+                os.makedirs(self.output_dir, exist_ok=True)
+                self.path = review_output_path(self.output_dir, data["nama_tempat"])
+            fresh = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+            # BOM hanya di awal file baru, bukan setiap kali file dibuka ulang
+            self.file = open(self.path, "a", newline="", encoding="utf-8-sig" if fresh else "utf-8")
+            self.writer = csv.DictWriter(self.file, fieldnames=self.FIELDS, lineterminator="\n")
+            if fresh:
+                self.writer.writeheader()
+        self.writer.writerow({k: data.get(k, "") for k in self.FIELDS})
+        self.file.flush()
+        self.count += 1
+
+    def close(self):
+        if self.file:
+            self.file.close()
+            self.file = None
+
+
+def load_review_keys(path, nama_tempat=None):
+    """Key (username, review[:100]) dari CSV review; baris rusak di akhir file dilewati.
+
+    nama_tempat (opsional) membatasi ke baris milik tempat tersebut.
+    """
+    keys = set()
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            try:
+                for row in reader:
+                    if nama_tempat is not None and (row.get("nama_tempat") or "").strip() != nama_tempat:
+                        continue
+                    username = (row.get("username") or "").strip()
+                    review = (row.get("review") or "").strip()
+                    if username and review:
+                        keys.add((username, review[:100]))
+            except csv.Error:
+                pass
+    except OSError:
+        pass
+    return keys
+
+
+def load_known_review_keys(history_dir, nama_tempat):
+    """Semua key review milik nama_tempat dari reviews_*.csv di bawah history_dir"""
+    keys = set()
+    if not history_dir:
+        return keys
+    pattern = os.path.join(history_dir, "**", "reviews_*.csv")
+    for path in glob.glob(pattern, recursive=True):
+        keys.update(load_review_keys(path, nama_tempat=nama_tempat))
+    return keys
+
+
+def driver_is_alive(driver):
+    """Cek apakah sesi browser masih bisa dipakai"""
+    try:
+        driver.current_url
+        return True
+    except Exception:
+        return False
+
+
+def export_place_reviews(scraper, csv_path, output_format):
+    """Salinan kolumnar (parquet/arrow) dari CSV review satu tempat; CSV tetap disimpan"""
+    if output_format == "csv" or not csv_path:
+        return None
+    scraped_at = datetime.fromtimestamp(scraper.place_started) if scraper.place_started else datetime.now()
+    try:
+        path = export_reviews(csv_path, output_format, link=scraper.url, scraped_at=scraped_at)
+    except Exception as e:
+        print(f"⚠ Gagal menulis {output_format}: {e}")
+        return None
+    if path:
+        print(f"✓ Salinan {output_format}: {path}")
+    return path
+
+
+def scrape_place(url, output_dir=None, driver_provider=None, ledger=None, stream=False,
+                 max_retries=0, retry_backoff=5.0, metrics_writer=None, output_format="csv",
+                 **scraper_kwargs):
+    """Scrape satu tempat lalu simpan hasilnya; return baris hasil batch.
+
+    driver_provider (opsional) mengembalikan driver hidup untuk dipakai ulang.
+    Dengan ledger, status link dicatat (running → done/failed), review
+    ditulis begitu diekstrak lewat ReviewAppender (tanpa stream: setelah
+    scroll selesai, per record), dan kegagalan dicoba ulang
+    hingga max_retries kali dengan backoff eksponensial. metrics_writer
+    (MetricsWriter) menerima satu record metrik per percobaan.
+    output_format="parquet"/"arrow" menambah salinan kolumnar bertipe di
+    samping CSV setelah tempat selesai.
+    """
+    attempt = 0
+    while True:
+        driver, driver_error = None, None
+        if driver_provider:
+            # Chrome/chromedriver gagal start: dicatat sebagai error percobaan ini, ikut jalur retry
+            try:
+                driver = driver_provider()
+            except Exception as e:
+                driver_error = f"Gagal membuka browser: {str(e) or type(e).__name__}"
+                print(f"✗ {driver_error}")
+        scraper = GoogleMapsReviewScraper(url=url, driver=driver, **scraper_kwargs)
+        scraper.error = driver_error
+        if ledger is None:
+            reviews = scraper.scrape_reviews(stream=stream) if driver_error is None else []
+            if reviews:
+                save_place_reviews(scraper, output_dir)
+                export_place_reviews(scraper, scraper.saved_path, output_format)
+            else:
+                print("✗ Tidak ada review untuk disimpan pada link ini")
+            if metrics_writer:
+                metrics_writer.write(scraper.metrics_record())
+            return batch_result(url, scraper)
+
+        state = ledger.get(url) or {}
+        appender = ReviewAppender(output_dir, state.get("output_file"))
+        # Lanjutkan file parsial dari run sebelumnya tanpa duplikasi
+        scraper.seen_reviews.update(appender.existing_keys)
+        ledger.mark_running(url)
+
+        def on_review(data):
+            appender.write(data)
+            if appender.count % 25 == 0:
+                ledger.update_progress(url, appender.count, (data["username"], data["review"][:100]), appender.path)
+
+        try:
+            if driver_error is None:
+                scraper.scrape_reviews(stream=stream, on_review=on_review)
+        finally:
+            appender.close()
+        if metrics_writer:
+            scraper.metrics.set(attempt=attempt + 1)
+            metrics_writer.write(scraper.metrics_record())
+        if scraper.reviews:
+            last = scraper.reviews[-1]
+            ledger.update_progress(url, appender.count, (last["username"], last["review"][:100]), appender.path)
+
+        if scraper.error is None:
+            ledger.mark_done(url, appender.count)
+            if not appender.count:
+                print("✗ Tidak ada review untuk disimpan pada link ini")
+            elif appender.path:
+                print(f"✓ {appender.count} review tersimpan di: {appender.path}")
+                export_place_reviews(scraper, appender.path, output_format)
+            return batch_result(url, scraper)
+
+        ledger.mark_failed(url, scraper.error)
+        if attempt >= max_retries:
+            print(f"✗ Gagal setelah {attempt + 1} percobaan: {scraper.error}")
+            return batch_result(url, scraper)
+        attempt += 1
+        delay = retry_backoff * (2 ** (attempt - 1))
+        print(f"⚠ Gagal ({scraper.error}), coba lagi dalam {delay:.0f}s [{attempt}/{max_retries}]")
+        time.sleep(delay)
+
+
+class ReviewWorkerPool:
+    """Pool N browser yang mengambil link dari antrean bersama.
+
+    Setiap worker memakai satu Chrome untuk banyak tempat, sehingga biaya
+    start browser hanya dibayar sekali per worker. rate_limit membatasi
+    jumlah tempat per menit untuk tiap worker (None = tanpa batas).
+    Argumen lain (max_reviews, wait_mode, ...) diteruskan ke scraper.
+    """
+
+    def __init__(self, workers=2, output_dir=None, rate_limit=None, headless=False, ledger=None,
+                 stream=False, max_retries=0, lean=False, track_bytes=False, metrics_writer=None,
+                 output_format="csv", **scraper_kwargs):
+        self.workers = max(1, int(workers))
+        self.output_dir = output_dir
+        self.min_interval = 60.0 / rate_limit if rate_limit else 0.0
+        self.headless = headless
+        self.lean = lean
+        self.track_bytes = track_bytes
+        self.ledger = ledger
+        self.stream = stream
+        self.max_retries = max_retries
+        self.metrics_writer = metrics_writer
+        self.output_format = output_format
+        self.scraper_kwargs = scraper_kwargs
+        self.queue = queue.Queue()
+        self.results = []
+        self.lock = threading.Lock()
+        self.threads = []
+
+    def start(self):
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        for worker_id in range(1, self.workers + 1):
+            t = threading.Thread(target=self._run_worker, args=(worker_id,), daemon=True)
+            t.start()
+            self.threads.append(t)
+        print(f"⟳ Worker pool aktif: {self.workers} browser")
+        return self
+
+    def submit(self, url):
+        self.queue.put(url)
+
+    def close(self):
+        """Tandai antrean selesai; tiap worker berhenti setelah antrean habis"""
+        for _ in self.threads:
+            self.queue.put(None)
+
+    def join(self):
+        for t in self.threads:
+            t.join()
+        return self.results
+
+    def _run_worker(self, worker_id):
+        state = {"driver": None}
+
+        def live_driver():
+            driver = state["driver"]
+            if driver is None or not driver_is_alive(driver):
+                if driver is not None:
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                print(f"[worker {worker_id}] ⟳ Membuka browser baru")
+                state["driver"] = create_driver(
+                    headless=self.headless, lean=self.lean, track_bytes=self.track_bytes
+                )
+            return state["driver"]
+
+        last_start = None
+        try:
+            while True:
+                url = self.queue.get()
+                if url is None:
+                    break
+
+                # Rate limit per worker: jarak minimum antar awal scraping tempat
+                if last_start is not None and self.min_interval:
+                    remaining = self.min_interval - (time.time() - last_start)
+                    if remaining > 0:
+                        time.sleep(remaining)
+                last_start = time.time()
+
+                print(f"\n[worker {worker_id}] Scraping: {url}")
+                try:
+                    result = scrape_place(
+                        url,
+                        output_dir=self.output_dir,
+                        driver_provider=live_driver,
+                        ledger=self.ledger,
+                        stream=self.stream,
+                        max_retries=self.max_retries,
+                        metrics_writer=self.metrics_writer,
+                        output_format=self.output_format,
+                        **self.scraper_kwargs,
+                    )
+                except Exception as e:
+                    # Error tak terduga satu tempat tidak boleh mematikan worker dan sisa antreannya
+                    error = str(e) or type(e).__name__
+                    print(f"[worker {worker_id}] ✗ Error tak terduga: {error}")
+                    if self.ledger:
+                        self.ledger.mark_failed(url, error)
+                    result = failed_result(url, error, self.scraper_kwargs.get("wait_mode", "fixed"))
+                with self.lock:
+                    self.results.append(result)
+        finally:
+            if state["driver"]:
+                try:
+                    state["driver"].quit()
+                except Exception:
+                    pass
+                print(f"[worker {worker_id}] ✓ Browser ditutup")
+
+
+def batch_result(url, scraper):
+    """Satu baris hasil batch: link, jumlah review, dan ringkasan timing"""
+    row = {"link": url, "nama_tempat": scraper.reviews[0]["nama_tempat"] if scraper.reviews else "",
+           "reviews": len(scraper.reviews), "error": scraper.error}
+    row.update(scraper.timing_summary())
+    return row
+
+
+def failed_result(url, error, wait_mode="fixed"):
+    """Baris hasil batch untuk tempat yang gagal sebelum scraper sempat berjalan"""
+    return {"link": url, "nama_tempat": "", "reviews": 0, "error": error, "wait_mode": wait_mode, "waits": 0,
+            "fixed_seconds": 0.0, "waited_seconds": 0.0, "saved_seconds": 0.0, "place_seconds": None,
+            "transfer_kb": None}
+
+
+def print_timing_report(results):
+    """Tabel waktu tunggu per tempat dan total detik yang dihemat"""
+    if not results:
+        return
+    print("\n⏱ Laporan waktu tunggu per tempat:")
+    print(f"  {'tempat':<40} {'review':>6} {'tunggu':>8} {'fixed':>8} {'hemat':>8}")
+    for r in results:
+        name = (r["nama_tempat"] or r["link"])[:40]
+        print(f"  {name:<40} {r['reviews']:>6} {r['waited_seconds']:>7.1f}s "
+              f"{r['fixed_seconds']:>7.1f}s {r['saved_seconds']:>7.1f}s")
+    saved = sum(r["saved_seconds"] for r in results)
+    print(f"  Total hemat: {saved:.1f}s untuk {len(results)} tempat")
+    measured = [r for r in results if r.get("transfer_kb") is not None]
+    if measured:
+        total_kb = sum(r["transfer_kb"] for r in measured)
+        print(f"  Transfer: {total_kb / 1024:.1f} MB total, rata-rata {total_kb / len(measured):.0f} KB per tempat")
+
+
+def review_scraper_options(max_reviews=None, wait_mode="fixed", extract_mode="bulk", incremental=False,
+                           history_dir=None, output_dir=None):
+    """kwargs GoogleMapsReviewScraper yang sama untuk mode batch maupun pipeline"""
+    options = {"max_reviews": max_reviews, "wait_mode": wait_mode, "extract_mode": extract_mode}
+    if incremental:
+        options.update(incremental=True, history_dir=history_dir or output_dir or "dataset")
+    return options
+
+
+def print_batch_summary(results, total, ledger=None):
+    """Ringkasan akhir batch/pipeline: link berhasil, status ledger, laporan timing"""
+    done = sum(1 for r in results if r["reviews"])
+    print(f"\n✓ Batch selesai: {done}/{total} link menghasilkan review")
+    if ledger:
+        print(f"  Status ledger: {ledger.summary()}")
+    print_timing_report(results)
+
+
+def read_links(csv_file):
+    """Baca kolom 'link' dari places.csv, kembalikan None jika gagal"""
     try:
         df = pd.read_csv(csv_file)
     except Exception as e:
         print(f"✗ Gagal membaca file: {e}")
-        return
+        return None
     if 'link' not in df.columns:
         print("✗ Kolom 'link' tidak ditemukan pada file input")
+        return None
+    links = []
+    for value in df['link']:
+        url = str(value).strip()
+        if url and url.lower() != 'nan':
+            links.append(url)
+    return links
+
+
+def scrape_batch_from_links(csv_file, max_reviews=None, delay_between=2, output_dir=None,
+                            workers=None, rate_limit=None, headless=False, wait_mode="fixed",
+                            extract_mode="bulk", stream=False, ledger_path=None, resume=False,
+                            max_retries=2, incremental=False, history_dir=None, lean=False,
+                            track_bytes=False, metrics_output=None, output_format="csv"):
+    """Scrape review untuk setiap link di csv_file.
+
+    workers=None menjalankan mode lama (satu browser baru per link, jeda
+    delay_between). workers >= 1 memakai ReviewWorkerPool dengan browser
+    yang dipakai ulang dan rate_limit (tempat/menit) per worker.
+    wait_mode="adaptive" mengganti sleep tetap dengan tunggu perubahan DOM.
+    extract_mode="element" memakai jalur ekstraksi lama per elemen.
+    stream=True mengekstrak per langkah scroll dengan DOM yang dipangkas.
+    ledger_path mengaktifkan JobLedger: review ditulis begitu dipanen dan
+    resume=True melewati link yang sudah done.
+    incremental=True mengurutkan review 'Terbaru' dan berhenti di review yang
+    sudah ada di CSV lama (history_dir, default output_dir).
+    lean=True memakai profil browser ringan (lihat browser.create_driver).
+    metrics_output (path .jsonl atau MetricsWriter) menulis metrik per tempat.
+    output_format="parquet"/"arrow" menambah salinan kolumnar per tempat.
+    """
+    links = read_links(csv_file)
+    if links is None:
         return
-    total = len(df)
-    print(f"⟳ Mulai batch scraping: {total} link")
     # Siapkan folder output jika diberikan
     if output_dir:
-        import os
         os.makedirs(output_dir, exist_ok=True)
-    import re
-    from datetime import datetime
-    for i, row in df.iterrows():
-        url = str(row['link']).strip()
-        if not url or url.lower() == 'nan':
-            continue
-        print(f"\n[{i+1}/{total}] Scraping: {url}")
-        scraper = GoogleMapsReviewScraper(url=url, max_reviews=max_reviews)
-        reviews = scraper.scrape_reviews()
-        if reviews:
-            # Simpan ke file pada output_dir jika disediakan
-            if output_dir:
-                try:
-                    place_name = scraper.reviews[0]['nama_tempat'] if scraper.reviews else 'unknown'
-                    safe_place = re.sub(r"\W+", "_", str(place_name)).strip("_")[:50]
-                    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-                    filename = os.path.join(output_dir, f"reviews_{safe_place}_{ts}.csv")
-                    scraper.save_to_csv(filename=filename)
-                except Exception:
-                    # fallback default
-                    scraper.save_to_csv()
-            else:
-                scraper.save_to_csv()
+
+    metrics_writer = metrics_output
+    if isinstance(metrics_output, str):
+        metrics_writer = MetricsWriter(metrics_output)
+
+    ledger = None
+    if ledger_path:
+        ledger = JobLedger(ledger_path)
+        ledger.add_links(links)
+        if resume:
+            total_links = len(links)
+            links = ledger.links_to_run(links)
+            print(f"⟳ Resume: {total_links - len(links)} link sudah selesai, {len(links)} tersisa")
         else:
-            print("✗ Tidak ada review untuk disimpan pada link ini")
-        time.sleep(delay_between)
+            ledger.reset(links)
+
+    scraper_kwargs = review_scraper_options(
+        max_reviews=max_reviews,
+        wait_mode=wait_mode,
+        extract_mode=extract_mode,
+        incremental=incremental,
+        history_dir=history_dir,
+        output_dir=output_dir,
+    )
+    if workers:
+        print(f"⟳ Mulai batch scraping (pool): {len(links)} link, {workers} worker")
+        pool = ReviewWorkerPool(
+            workers=workers,
+            output_dir=output_dir,
+            rate_limit=rate_limit,
+            headless=headless,
+            ledger=ledger,
+            stream=stream,
+            max_retries=max_retries,
+            lean=lean,
+            track_bytes=track_bytes,
+            metrics_writer=metrics_writer,
+            output_format=output_format,
+            **scraper_kwargs,
+        ).start()
+        for url in links:
+            pool.submit(url)
+        pool.close()
+        results = pool.join()
+    else:
+        total = len(links)
+        print(f"⟳ Mulai batch scraping: {total} link")
+        results = []
+        for i, url in enumerate(links):
+            print(f"\n[{i+1}/{total}] Scraping: {url}")
+            results.append(scrape_place(
+                url,
+                output_dir=output_dir,
+                ledger=ledger,
+                stream=stream,
+                max_retries=max_retries,
+                metrics_writer=metrics_writer,
+                output_format=output_format,
+                headless=headless,
+                lean=lean,
+                track_bytes=track_bytes,
+                **scraper_kwargs,
+            ))
+            time.sleep(delay_between)
+
+    print_batch_summary(results, len(links), ledger)
+    if ledger:
+        ledger.close()
+    return results
 
 # ===== CARA PENGGUNAAN =====
 if __name__ == "__main__":
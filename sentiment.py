@@ -0,0 +1,155 @@
+import argparse
+import os
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from inference import BACKENDS, load_backend, predict_logits, softmax
+
+BASE_DIR = os.path.dirname(__file__)
+INPUT_PATH = os.path.join(BASE_DIR, "data_clean", "all_reviews_en.csv")
+OUTPUT_DIR = os.path.join(BASE_DIR, "dataset")
+
+MODEL_NAME = "distilbert-base-uncased-finetuned-sst-2-english"
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_LENGTH = 512
+NEUTRAL = (0.0, "Neutral")
+
+
+class SentimentModel:
+    """Tokenizer + model klasifikasi sentimen untuk inferensi batch di CPU/GPU.
+
+    backend="torch": model HF fp32, threads mengatur torch.set_num_threads
+    (intra-op; None = default PyTorch). backend="onnx": model adalah folder
+    hasil `python inference.py --export`, dijalankan ONNX Runtime (int8
+    kecuali quantized=False).
+    """
+
+    def __init__(self, model=MODEL_NAME, threads=None, device=None, backend="torch", quantized=True):
+        from transformers import AutoTokenizer
+
+        self.name = model
+        self.tokenizer = AutoTokenizer.from_pretrained(model)
+        self.backend = load_backend(model, backend, threads=threads, quantized=quantized, device=device)
+        config = self.backend.config
+        self.labels = [config.id2label[i] for i in range(config.num_labels)]
+
+
+def _signed(label, prob):
+    """Skor bertanda seperti score_and_label di sentiment.ipynb: positif = +prob, negatif = -prob"""
+    signed = prob if label.upper().startswith("POS") else -prob
+    return signed, "Positive" if signed > 0 else "Negative"
+
+
+def score_texts(texts, model=None, batch_size=DEFAULT_BATCH_SIZE, max_length=DEFAULT_MAX_LENGTH):
+    """(sentiment_score, sentiment_label) per teks, urutan input dipertahankan.
+
+    Semua teks ditokenisasi sekali (batch, truncation ke max_length), lalu
+    diurutkan menurut jumlah token agar tiap batch berisi teks sepanjang
+    mirip dan padding-nya minimal (inference.predict_logits). Teks kosong
+    langsung Neutral tanpa model.
+    """
+    model = SentimentModel() if model is None else model
+    texts = [text.strip() if isinstance(text, str) else "" for text in texts]
+    results = [NEUTRAL] * len(texts)
+    index = [i for i, text in enumerate(texts) if text]
+    if not index:
+        return results
+    probs = softmax(predict_logits(model.tokenizer, model.backend, [texts[i] for i in index],
+                                   batch_size=batch_size, max_length=max_length))
+    top = probs.argmax(axis=1)
+    for row, i in enumerate(index):
+        results[i] = _signed(model.labels[top[row]], float(probs[row, top[row]]))
+    return results
+
+
+def add_sentiment(df, column="review_en", model=None, batch_size=DEFAULT_BATCH_SIZE, max_length=DEFAULT_MAX_LENGTH):
+    """Tambahkan kolom sentiment_score dan sentiment_label (sama dengan notebook) ke df"""
+    if column not in df.columns:
+        raise ValueError(f"Kolom '{column}' tidak ditemukan pada CSV input")
+    results = score_texts(df[column].tolist(), model=model, batch_size=batch_size, max_length=max_length)
+    df["sentiment_score"] = [score for score, _ in results]
+    df["sentiment_label"] = [label for _, label in results]
+    return df
+
+
+def notebook_score_texts(texts, model):
+    """Jalur notebook: pipeline sentiment-analysis satu panggilan per review; untuk --benchmark"""
+    from transformers import pipeline
+
+    clf = pipeline("sentiment-analysis", model=model.backend.model, tokenizer=model.tokenizer,
+                   device=model.backend.device)
+    results = []
+    for text in texts:
+        text = (text or "").strip()
+        if not text:
+            results.append(NEUTRAL)
+            continue
+        out = clf(text, truncation=True)[0]
+        results.append(_signed(out["label"], float(out["score"])))
+    return results
+
+
+def benchmark(texts, model, batch_sizes=(8, 32, 64), max_length=DEFAULT_MAX_LENGTH):
+    """Review/detik di CPU: pipeline per baris vs score_texts per ukuran batch, plus selisih skor maksimum"""
+    print(f"⟳ {len(texts)} review, model {model.name}, {__import__('torch').get_num_threads()} thread")
+    started = time.perf_counter()
+    expected = notebook_score_texts(texts, model)
+    base = time.perf_counter() - started
+    print(f"  {'per baris (pipeline)':<22} {base:>8.2f}s {len(texts) / base:>10.1f} review/s")
+    ok = True
+    for batch_size in batch_sizes:
+        started = time.perf_counter()
+        actual = score_texts(texts, model, batch_size=batch_size, max_length=max_length)
+        seconds = time.perf_counter() - started
+        diff = max((abs(a[0] - b[0]) for a, b in zip(expected, actual)), default=0.0)
+        same = sum(a[1] == b[1] for a, b in zip(expected, actual))
+        print(f"  {f'batch {batch_size}':<22} {seconds:>8.2f}s {len(texts) / seconds:>10.1f} review/s"
+              f"  ({base / seconds:.1f}x)  label sama {same}/{len(texts)}, selisih skor maks {diff:.1e}")
+        ok = ok and same == len(texts) and diff < 1e-4
+    print("✓ Sama dengan jalur pipeline" if ok else "✗ Hasil berbeda dari jalur pipeline")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Skor sentimen (SST-2) batch untuk kolom review berbahasa Inggris")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=None, help="Default dataset/sentiment_results_<timestamp>.csv")
+    parser.add_argument("--column", default="review_en")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-length", type=int, default=DEFAULT_MAX_LENGTH)
+    parser.add_argument("--threads", type=int, default=None, help="Thread intra-op torch/ONNX Runtime (default: bawaan)")
+    parser.add_argument("--backend", choices=BACKENDS, default="torch",
+                        help="onnx: --model adalah folder hasil `python inference.py --export`")
+    parser.add_argument("--limit", type=int, default=None, help="Hanya N baris pertama")
+    parser.add_argument("--benchmark", type=int, metavar="N", default=None,
+                        help="Bandingkan dengan pipeline per baris pada N review pertama")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.input)
+    limit = args.benchmark or args.limit
+    if limit is not None:
+        df = df.head(limit).copy()
+    if args.column not in df.columns:
+        raise ValueError(f"Kolom '{args.column}' tidak ditemukan pada CSV input")
+    if args.benchmark and args.backend != "torch":
+        parser.error("--benchmark membandingkan dengan pipeline PyTorch; untuk ONNX pakai inference.py --benchmark")
+    model = SentimentModel(args.model, threads=args.threads, backend=args.backend)
+
+    if args.benchmark:
+        texts = df[args.column].fillna("").astype(str).tolist()
+        raise SystemExit(0 if benchmark(texts, model, max_length=args.max_length) else 1)
+
+    started = time.perf_counter()
+    add_sentiment(df, args.column, model=model, batch_size=args.batch_size, max_length=args.max_length)
+    seconds = time.perf_counter() - started
+    output = args.output or os.path.join(OUTPUT_DIR, f"sentiment_results_{datetime.now():%Y%m%d_%H%M%S}.csv")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    df.to_csv(output, index=False, encoding="utf-8-sig")
+    print(f"✓ {len(df)} review diberi skor dalam {seconds:.2f}s ({len(df) / seconds:.1f} review/s) → {output}")
+
+
+if __name__ == "__main__":
+    main()
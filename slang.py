@@ -0,0 +1,180 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+import time
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data_clean")
+SLANG_PATH = os.path.join(DATA_DIR, "slangwords.json")
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+# Naikkan jika format pattern/cache berubah agar cache lama tidak dipakai
+CACHE_VERSION = 1
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _key(text):
+    """Bentuk kunci lookup: lowercase, spasi beruntun jadi satu"""
+    return _WHITESPACE_RE.sub(" ", text.strip().lower())
+
+
+def trie_pattern(keys):
+    r"""Regex alternasi dari kunci yang prefiksnya difaktorkan sebagai trie.
+
+    (?:a(?:ku|ja)?|b...) alih-alih aku|aja|a|b...: regex engine tidak mencoba
+    ribuan cabang di setiap posisi, dan karena bagian opsional bersifat
+    greedy, kunci terpanjang dicoba lebih dulu. Spasi di kunci cocok dengan
+    whitespace apa pun (\s+).
+    """
+    trie = {}
+    for key in keys:
+        node = trie
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node[""] = True
+
+    def build(node):
+        branches = []
+        for ch in sorted(c for c in node if c):
+            atom = r"\s+" if ch == " " else re.escape(ch)
+            branches.append(atom + build(node[ch]))
+        if not branches:
+            return ""
+        if len(branches) == 1 and "" not in node:
+            return branches[0]
+        group = "(?:" + "|".join(branches) + ")"
+        return group + "?" if "" in node else group
+
+    return build(trie)
+
+
+class SlangNormalizer:
+    """Ganti slang (termasuk kunci multi-kata dan kunci bertanda baca) dalam satu re.sub.
+
+    Cocok hanya pada batas kata, tidak peduli huruf besar/kecil, dan kunci
+    terpanjang menang ("worth it" sebelum "worth"). Pattern hasil kompilasi
+    disimpan di cache_dir dengan nama berisi sha1 file JSON, jadi startup
+    berikutnya tidak membangun trie lagi selama kamus tidak berubah.
+    """
+
+    def __init__(self, mapping, pattern=None):
+        self.lookup = {}
+        for key, value in mapping.items():
+            self.lookup.setdefault(_key(key), value)
+        if pattern is None:
+            pattern = r"(?<!\w)" + trie_pattern(self.lookup) + r"(?!\w)"
+        self.pattern_source = pattern
+        # Kunci sudah lowercase: pencocokan dilakukan pada text.lower() tanpa
+        # IGNORECASE (dua kali lebih cepat); versi IGNORECASE hanya untuk teks
+        # yang panjangnya berubah saat di-lowercase (mis. "İ")
+        self.pattern = re.compile(pattern)
+        self._pattern_ci = None
+
+    @classmethod
+    def from_json(cls, path=SLANG_PATH, cache_dir=CACHE_DIR):
+        """Muat kamus JSON; pakai cache pattern di cache_dir jika sha1 file sama (cache_dir=None: tanpa cache)"""
+        with open(path, "rb") as f:
+            raw = f.read()
+        digest = hashlib.sha1(raw).hexdigest()
+        cache_path = os.path.join(cache_dir, f"slang-v{CACHE_VERSION}-{digest}.pkl") if cache_dir else None
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, "rb") as f:
+                    cached = pickle.load(f)
+                return cls(cached["lookup"], pattern=cached["pattern"])
+            except (OSError, pickle.UnpicklingError, KeyError, EOFError):
+                pass
+        normalizer = cls(json.loads(raw.decode("utf-8")))
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            tmp = cache_path + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump({"lookup": normalizer.lookup, "pattern": normalizer.pattern_source}, f)
+            os.replace(tmp, cache_path)
+        return normalizer
+
+    def _replace(self, match):
+        return self.lookup.get(_key(match.group(0)), match.group(0))
+
+    def normalize(self, text):
+        """Ganti semua slang di text; sisa teks (spasi, tanda baca, huruf besar) tidak diubah"""
+        if not isinstance(text, str):
+            return ""
+        lowered = text.lower()
+        if len(lowered) != len(text):
+            if self._pattern_ci is None:
+                self._pattern_ci = re.compile(self.pattern_source, re.IGNORECASE)
+            return self._pattern_ci.sub(self._replace, text)
+        if lowered == text:
+            return self.pattern.sub(self._replace, text)
+        out, pos = [], 0
+        for match in self.pattern.finditer(lowered):
+            out.append(text[pos:match.start()])
+            out.append(self.lookup.get(_key(match.group(0)), text[match.start():match.end()]))
+            pos = match.end()
+        out.append(text[pos:])
+        return "".join(out)
+
+    def normalize_lower(self, text):
+        """normalize untuk teks yang sudah lowercase (mis. satu buffer batch di cleaning.py)"""
+        return self.pattern.sub(self._replace, text)
+
+    def normalize_many(self, texts):
+        return [self.normalize(text) for text in texts]
+
+
+def benchmark(path=SLANG_PATH, input_path=os.path.join(DATA_DIR, "all_reviews_merged.csv"), repeat=5):
+    """Waktu startup (tanpa/dengan cache) dan baris per detik vs lookup per kata ala notebook"""
+    import tempfile
+
+    import pandas as pd
+
+    cache_dir = tempfile.mkdtemp(prefix="slang_cache_")
+    for label in ("build", "cache"):
+        # Kosongkan cache pattern internal modul re: startup dari pickle harus tetap mengompilasi regex
+        re.purge()
+        started = time.perf_counter()
+        normalizer = SlangNormalizer.from_json(path, cache_dir=cache_dir)
+        print(f"  startup ({label}) {time.perf_counter() - started:>8.3f}s")
+
+    with open(path, encoding="utf-8") as f:
+        slangwords = json.load(f)
+    texts = pd.read_csv(input_path)["review"].fillna("").astype(str).tolist() * repeat
+
+    started = time.perf_counter()
+    for text in texts:
+        " ".join(slangwords.get(word.lower(), word) for word in text.split())
+    base = time.perf_counter() - started
+    print(f"  {'per kata (notebook)':<22} {len(texts) / base:>10.0f} baris/s")
+    started = time.perf_counter()
+    normalizer.normalize_many(texts)
+    seconds = time.perf_counter() - started
+    print(f"  {'SlangNormalizer':<22} {len(texts) / seconds:>10.0f} baris/s")
+    joined = "\n".join(text.lower() for text in texts)
+    started = time.perf_counter()
+    normalizer.normalize_lower(joined)
+    seconds = time.perf_counter() - started
+    print(f"  {'SlangNormalizer (batch)':<22} {len(texts) / seconds:>10.0f} baris/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Normalisasi slang satu-pass dengan regex trie")
+    parser.add_argument("--slang", default=SLANG_PATH)
+    parser.add_argument("--text", help="Normalisasi satu teks lalu cetak hasilnya")
+    parser.add_argument("--benchmark", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        benchmark(args.slang)
+        return
+    normalizer = SlangNormalizer.from_json(args.slang)
+    if args.text is not None:
+        print(normalizer.normalize(args.text))
+    else:
+        print(f"✓ {len(normalizer.lookup)} kunci slang, pattern {len(normalizer.pattern_source)} karakter")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import os
+import re
+
+import pandas as pd
+
+# Format penyimpanan yang didukung; csv tetap default dan selalu tersedia
+OUTPUT_FORMATS = ("csv", "parquet", "arrow")
+FORMAT_EXTENSIONS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+COLUMNAR_EXTENSIONS = (".parquet", ".arrow")
+
+# Link Google Maps memuat id tempat sebagai pasangan hex: ...!1s0x2dd62b...:0xb702cb...
+PLACE_ID_RE = re.compile(r"!1s(0x[0-9a-fA-F]+:0x[0-9a-fA-F]+)")
+
+
+def require_pyarrow():
+    """Import pyarrow atau beri pesan jelas (hanya dibutuhkan untuk parquet/arrow)"""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Format parquet/arrow membutuhkan pyarrow: pip install pyarrow") from e
+    return pyarrow
+
+
+def pyarrow_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def place_id_from_link(link):
+    m = PLACE_ID_RE.search(link or "")
+    return m.group(1) if m else None
+
+
+def format_path(path, fmt):
+    """Ganti ekstensi path sesuai format (reviews_x.csv → reviews_x.parquet)"""
+    return os.path.splitext(path)[0] + FORMAT_EXTENSIONS[fmt]
+
+
+def typed_reviews(df, link=None, scraped_at=None):
+    """Review dengan tipe tetap untuk penyimpanan kolumnar.
+
+    rating → Int8, scraped_at → timestamp, place_id diambil dari link,
+    teks → string, dan nama_tempat → category (dictionary-encoded di
+    Parquet/Arrow, jadi nama yang berulang hanya disimpan sekali).
+    """
+    out = df.copy()
+    if link is not None:
+        out["link"] = link
+    if "link" in out.columns and "place_id" not in out.columns:
+        out["place_id"] = out["link"].map(place_id_from_link)
+    if scraped_at is not None:
+        out["scraped_at"] = pd.Timestamp(scraped_at)
+    if "rating" in out.columns:
+        out["rating"] = pd.to_numeric(out["rating"], errors="coerce").round().astype("Int8")
+    for col in ("username", "review", "link", "place_id"):
+        if col in out.columns:
+            out[col] = out[col].astype("string")
+    if "nama_tempat" in out.columns:
+        out["nama_tempat"] = out["nama_tempat"].astype("string").astype("category")
+    return out
+
+
+def typed_places(df):
+    """Daftar tempat: latitude/longitude float, place_id dari link, kategori sebagai category"""
+    out = df.copy()
+    for col in ("latitude", "longitude"):
+        if col in out.columns:
+            out[col] = pd.to_numeric(out[col], errors="coerce")
+    if "link" in out.columns and "place_id" not in out.columns:
+        out["place_id"] = out["link"].map(place_id_from_link)
+    for col in ("name", "link", "address", "phone", "place_id"):
+        if col in out.columns:
+            out[col] = out[col].astype("string")
+    if "category" in out.columns:
+        out["category"] = out["category"].astype("string").astype("category")
+    return out
+
+
+def write_frame(df, path):
+    """Tulis DataFrame sesuai ekstensi path (.csv, .parquet, .arrow); return path"""
+    ext = os.path.splitext(path)[1].lower()
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    if ext == ".csv":
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+        return path
+    pa = require_pyarrow()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if ext == ".parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path, compression="zstd")
+    elif ext == ".arrow":
+        import pyarrow.feather as feather
+        # Tanpa kompresi agar bisa dibaca zero-copy lewat memory map
+        feather.write_feather(table, path, compression="uncompressed")
+    else:
+        raise ValueError(f"Format tidak dikenal: {path}")
+    return path
+
+
+def frame_columns(path):
+    """Nama kolom file tanpa membaca isinya"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet" or os.path.isdir(path):
+        require_pyarrow()
+        import pyarrow.dataset as ds
+        return list(ds.dataset(path, format="parquet").schema.names)
+    if ext == ".arrow":
+        require_pyarrow()
+        import pyarrow.feather as feather
+        return list(feather.read_table(path, memory_map=True).schema.names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def read_frame(path, columns=None, memory_map=True):
+    """Baca .csv/.parquet/.arrow (atau folder part .parquet) sebagai DataFrame.
+
+    Parquet dan Arrow dibaca lewat memory map dan hanya kolom yang diminta
+    yang di-decode, jadi tahap lanjutan tidak perlu memparse ulang teks.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".parquet" or os.path.isdir(path):
+        require_pyarrow()
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+    if ext == ".arrow":
+        require_pyarrow()
+        import pyarrow.feather as feather
+        return feather.read_table(path, columns=columns, memory_map=memory_map).to_pandas()
+    return pd.read_csv(path, usecols=columns)
+
+
+def export_reviews(csv_path, fmt, link=None, scraped_at=None):
+    """Salin CSV review ke format kolumnar bertipe di samping CSV; return path baru (None untuk csv)"""
+    if fmt == "csv" or not csv_path or not os.path.exists(csv_path):
+        return None
+    df = pd.read_csv(csv_path)
+    return write_frame(typed_reviews(df, link=link, scraped_at=scraped_at), format_path(csv_path, fmt))
+
+
+def iter_frame_batches(path, columns=None, batch_rows=100_000):
+    """Baca .parquet/.arrow per batch (DataFrame berisi <= batch_rows baris), lewat memory map"""
+    ext = os.path.splitext(path)[1].lower()
+    require_pyarrow()
+    if ext == ".parquet":
+        import pyarrow.parquet as pq
+        batches = pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=batch_rows, columns=columns)
+    elif ext == ".arrow":
+        import pyarrow.feather as feather
+        batches = feather.read_table(path, columns=columns, memory_map=True).to_batches(max_chunksize=batch_rows)
+    else:
+        raise ValueError(f"Bukan format kolumnar: {path}")
+    for batch in batches:
+        yield batch.to_pandas()
+
+
+def write_frames(frames, path):
+    """Tulis iterable DataFrame ke .parquet/.arrow chunk demi chunk; return path (None jika kosong).
+
+    Kolom category ditulis sebagai string agar skema sama di semua chunk;
+    Parquet tetap men-dictionary-encode kolom tersebut di disk.
+    """
+    pa = require_pyarrow()
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in COLUMNAR_EXTENSIONS:
+        raise ValueError(f"Format tidak dikenal: {path}")
+    folder = os.path.dirname(path)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    writer = schema = None
+    try:
+        for df in frames:
+            df = df.copy()
+            for col in df.columns:
+                if isinstance(df[col].dtype, pd.CategoricalDtype):
+                    df[col] = df[col].astype("string")
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                if ext == ".parquet":
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(path, schema, compression="zstd")
+                else:
+                    writer = pa.ipc.new_file(path, schema)
+            writer.write_table(table.cast(schema))
+    finally:
+        if writer is not None:
+            writer.close()
+    return path if writer is not None else None
@@ -0,0 +1,57 @@
+import os
+import sys
+import tracemalloc
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from merge import merge_reviews, review_input_paths, stream_peak_memory, write_synthetic_dataset  # noqa: E402
+
+# Dataset sintetis yang merge dalam memorinya melewati MAX_MEMORY_MB, jadi batasnya benar-benar diuji
+ROWS = 120_000
+MAX_MEMORY_MB = 4
+MB = 1024 * 1024
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("merge_dataset"))
+    write_synthetic_dataset(root, rows=ROWS, files=30)
+    return root
+
+
+@pytest.fixture(scope="module")
+def in_memory(dataset):
+    tracemalloc.start()
+    try:
+        merged = merge_reviews(dataset, workers=1)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return merged, peak
+
+
+@pytest.fixture(scope="module")
+def streamed(dataset, tmp_path_factory):
+    output_path = str(tmp_path_factory.mktemp("merge_output") / "all_reviews_merged.csv")
+    peak, key_set = stream_peak_memory(review_input_paths(dataset), output_path, max_memory_mb=MAX_MEMORY_MB)
+    return output_path, peak, key_set
+
+
+def test_in_memory_merge_exceeds_ceiling(in_memory):
+    assert in_memory[1] > MAX_MEMORY_MB * MB
+
+
+def test_stream_merge_stays_under_memory_ceiling(streamed):
+    _, peak, key_set = streamed
+    assert len(key_set) > 0
+    assert peak <= MAX_MEMORY_MB * MB
+
+
+def test_stream_merge_matches_in_memory_merge(streamed, in_memory):
+    output_path, _, key_set = streamed
+    result = pd.read_csv(output_path, dtype=str, keep_default_na=False)
+    assert len(result) == len(key_set)
+    assert result.equals(in_memory[0].astype(str).reset_index(drop=True))
@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from neardup import NearDupIndex, synthetic_reviews  # noqa: E402
+
+# Satu batch berisi ribuan salinan: dulu setiap bucket LSH dipecah jadi O(m²) pasangan
+COPIES = 3000
+MAX_SECONDS = 10
+REVIEW = "Baksonya enak banget, kuahnya gurih dan pelayanannya ramah, harga juga terjangkau untuk mahasiswa"
+
+
+def test_identical_texts_in_one_batch():
+    start = time.perf_counter()
+    keep = NearDupIndex().filter([REVIEW] * COPIES)
+    assert time.perf_counter() - start < MAX_SECONDS
+    assert np.flatnonzero(keep).tolist() == [0]
+
+
+def test_near_identical_texts_in_one_batch():
+    texts = [f"{REVIEW} cabang {i}" for i in range(COPIES)]
+    start = time.perf_counter()
+    keep = NearDupIndex().filter(texts)
+    assert time.perf_counter() - start < MAX_SECONDS
+    assert keep[0]
+    assert keep.sum() < COPIES * 0.01
+
+
+def test_batch_filter_keeps_first_of_each_group():
+    frame = synthetic_reviews(rows=3000, dup_rate=0.1, seed=7)
+    keep = NearDupIndex().filter(frame["review"].tolist())
+    dup_of = frame["dup_of"].to_numpy()
+    assert keep[dup_of < 0].mean() > 0.99
+    assert (~keep[dup_of >= 0]).mean() > 0.9
@@ -0,0 +1,258 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data_clean")
+INPUT_PATH = os.path.join(DATA_DIR, "all_reviews_translated.csv")
+OUTPUT_PATH = os.path.join(DATA_DIR, "all_reviews_tokenized.csv")
+CACHE_PATH = os.path.join(DATA_DIR, ".cache", "token_ids.sqlite")
+
+MODEL_NAME = "indobenchmark/indobert-large-p2"
+DEFAULT_BATCH_SIZE = 1_000
+# Tambahan stopword dari filteringText di cleaning.ipynb
+EXTRA_STOPWORDS = ("iya", "yaa", "gk", "gak", "g", "dr", "nya", "na", "sih", "ku", "di", "ga", "ya",
+                   "gaa", "loh", "kah", "woi", "woii", "woy", "pas", "c", "deh", "eh")
+# Jumlah parameter per query IN (...), di bawah batas SQLITE_MAX_VARIABLE_NUMBER lama (999)
+_SQL_CHUNK = 900
+_IDS_DTYPE = np.int32
+
+
+@lru_cache(maxsize=None)
+def load_stopwords():
+    """Stopword NLTK Indonesia + Inggris + EXTRA_STOPWORDS sebagai frozenset, dibangun sekali per proses"""
+    import nltk
+    from nltk.corpus import stopwords
+
+    try:
+        words = stopwords.words("indonesian") + stopwords.words("english")
+    except LookupError:
+        nltk.download("stopwords", quiet=True)
+        words = stopwords.words("indonesian") + stopwords.words("english")
+    return frozenset(words).union(EXTRA_STOPWORDS)
+
+
+def load_tokenizer(model=MODEL_NAME):
+    """Tokenizer fast (Rust, lib tokenizers) untuk IndoBERT; hasil tokenize sama dengan BertTokenizer"""
+    from transformers import AutoTokenizer
+
+    tokenizer = AutoTokenizer.from_pretrained(model, use_fast=True)
+    if not tokenizer.is_fast:
+        raise RuntimeError(f"Tokenizer fast untuk {model} tidak tersedia. Try: pip install -U tokenizers transformers")
+    return tokenizer
+
+
+def text_key(text):
+    """Kunci cache: blake2b 128-bit dari teks (sudah di-strip)"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class TokenCache:
+    """Cache token ID SQLite per (model, hash teks) yang bertahan antar run.
+
+    ID disimpan tanpa token spesial ([CLS]/[SEP]) sebagai int32 mentah,
+    jadi bisa dipakai tahap cleaning (ID → token) maupun training
+    (tokenizer.build_inputs_with_special_tokens) tanpa tokenisasi ulang.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = path
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS token_ids (
+                model TEXT NOT NULL,
+                text_hash BLOB NOT NULL,
+                ids BLOB NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+            """
+        )
+        self.conn.commit()
+
+    def get_many(self, model, keys):
+        """Return dict hash → array ID untuk hash yang ada di cache"""
+        keys = list(keys)
+        found = {}
+        with self.lock:
+            for start in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[start:start + _SQL_CHUNK]
+                rows = self.conn.execute(
+                    f"SELECT text_hash, ids FROM token_ids WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                ).fetchall()
+                found.update((key, np.frombuffer(ids, dtype=_IDS_DTYPE)) for key, ids in rows)
+        return found
+
+    def put_many(self, model, ids_by_key):
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO token_ids (model, text_hash, ids) VALUES (?, ?, ?)",
+                [(model, key, np.asarray(ids, dtype=_IDS_DTYPE).tobytes()) for key, ids in ids_by_key.items()],
+            )
+            self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM token_ids").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def _clean(text):
+    return text.strip() if isinstance(text, str) else ""
+
+
+def encode_texts(texts, tokenizer, cache=None, batch_size=DEFAULT_BATCH_SIZE):
+    """Token ID (tanpa token spesial) per teks sebagai array int32.
+
+    Teks unik yang belum ada di cache ditokenisasi per batch oleh tokenizer
+    fast (paralel di Rust); teks yang sama hanya ditokenisasi sekali.
+    """
+    texts = [_clean(text) for text in texts]
+    keys = [text_key(text) for text in texts]
+    unique = dict(zip(keys, texts))
+    model = tokenizer.name_or_path
+    found = cache.get_many(model, unique) if cache is not None else {}
+    missing = [key for key in unique if key not in found]
+    encoded = {}
+    for start in range(0, len(missing), batch_size):
+        batch = missing[start:start + batch_size]
+        result = tokenizer([unique[key] for key in batch], add_special_tokens=False,
+                           return_attention_mask=False, return_token_type_ids=False)
+        encoded.update((key, np.asarray(ids, dtype=_IDS_DTYPE)) for key, ids in zip(batch, result["input_ids"]))
+    if cache is not None and encoded:
+        cache.put_many(model, encoded)
+    found.update(encoded)
+    return [found[key] for key in keys]
+
+
+def vocab_tables(tokenizer, stopwords=None):
+    """Array ID → token (object) dan mask ID → bukan stopword, untuk lookup vektor seluruh korpus"""
+    stopwords = load_stopwords() if stopwords is None else stopwords
+    vocab = tokenizer.get_vocab()
+    id_to_token = np.empty(max(vocab.values()) + 1, dtype=object)
+    id_to_token[list(vocab.values())] = list(vocab)
+    keep = np.ones(len(id_to_token), dtype=bool)
+    keep[[vocab[word] for word in stopwords if word in vocab]] = False
+    return id_to_token, keep
+
+
+def tokenize_and_filter(texts, tokenizer=None, cache=None, stopwords=None, batch_size=DEFAULT_BATCH_SIZE):
+    """tokenizingText + filteringText untuk seluruh korpus. Return (list token, list token tanpa stopword).
+
+    Stopword difilter untuk semua review sekaligus: ID digabung menjadi satu
+    array, dipetakan ke token dan di-mask dengan vocab_tables, lalu dipotong
+    kembali per review.
+    Token WordPiece dicocokkan utuh seperti di notebook ("##nya" bukan "nya").
+    """
+    tokenizer = load_tokenizer() if tokenizer is None else tokenizer
+    ids = encode_texts(texts, tokenizer, cache=cache, batch_size=batch_size)
+    if not ids:
+        return [], []
+    lengths = np.fromiter((len(row) for row in ids), dtype=np.int64, count=len(ids))
+    flat = np.concatenate(ids) if lengths.sum() else np.zeros(0, dtype=_IDS_DTYPE)
+    id_to_token, keep = vocab_tables(tokenizer, stopwords)
+    tokens = id_to_token[flat].tolist()
+    keep = keep[flat]
+    kept = [token for token, flag in zip(tokens, keep.tolist()) if flag]
+    ends = np.r_[0, np.cumsum(lengths)].tolist()
+    kept_ends = np.r_[0, np.cumsum(keep)][ends].tolist()
+    token_lists = [tokens[a:b] for a, b in zip(ends, ends[1:])]
+    filtered = [kept[a:b] for a, b in zip(kept_ends, kept_ends[1:])]
+    return token_lists, filtered
+
+
+def filter_stopwords(token_lists, stopwords=None):
+    """filteringText untuk list token yang sudah ada (tanpa tokenizer); set stopword dibuat sekali"""
+    stopwords = load_stopwords() if stopwords is None else stopwords
+    return [[token for token in tokens if token not in stopwords] for tokens in token_lists]
+
+
+def notebook_tokenize_filter(texts, tokenizer, stopwords):
+    """Jalur notebook: tokenizer.tokenize per review, set stopword dibangun ulang per review; untuk --benchmark"""
+    tokens = [tokenizer.tokenize(_clean(text)) if _clean(text) else [] for text in texts]
+    filtered = []
+    for row in tokens:
+        stopword_set = set(stopwords)
+        filtered.append([token for token in row if token not in stopword_set])
+    return tokens, filtered
+
+
+def benchmark(input_path=INPUT_PATH, column="text_translated", model=MODEL_NAME, repeat=1):
+    """Review/detik: tokenize per review (notebook) vs batch fast tokenizer, dengan cache kosong dan penuh"""
+    import tempfile
+
+    from transformers import AutoTokenizer
+
+    texts = pd.read_csv(input_path, encoding="utf-8-sig")[column].fillna("").astype(str).tolist() * repeat
+    slow = AutoTokenizer.from_pretrained(model, use_fast=False)
+    fast = load_tokenizer(model)
+    stopwords = load_stopwords()
+    print(f"⟳ {len(texts)} review")
+
+    started = time.perf_counter()
+    expected = notebook_tokenize_filter(texts, slow, stopwords)
+    base = time.perf_counter() - started
+    print(f"  {'notebook (per review)':<22} {base:>8.2f}s {len(texts) / base:>10.0f} review/s")
+    cache = TokenCache(os.path.join(tempfile.mkdtemp(prefix="token_cache_"), "token_ids.sqlite"))
+    for label in ("batch, cache kosong", "batch, cache penuh"):
+        started = time.perf_counter()
+        actual = tokenize_and_filter(texts, fast, cache=cache, stopwords=stopwords)
+        seconds = time.perf_counter() - started
+        print(f"  {label:<22} {seconds:>8.2f}s {len(texts) / seconds:>10.0f} review/s  ({base / seconds:.1f}x)")
+    cache.close()
+    if expected != actual:
+        print(f"✗ {sum(a != b for a, b in zip(expected[0], actual[0]))} review dengan token berbeda")
+        return False
+    print("✓ Token dan hasil filter identik dengan jalur notebook")
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tokenisasi IndoBERT (fast, batch) + filter stopword")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--column", default="text_translated", help="Kolom input (default text_translated)")
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--cache", default=CACHE_PATH, help="File SQLite cache token ID")
+    parser.add_argument("--no-cache", action="store_true", help="Jangan baca/tulis cache")
+    parser.add_argument("--benchmark", type=int, metavar="REPEAT", default=None,
+                        help="Bandingkan dengan jalur notebook pada input yang diulang REPEAT kali")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        raise SystemExit(0 if benchmark(args.input, args.column, args.model, repeat=args.benchmark) else 1)
+
+    df = pd.read_csv(args.input, encoding="utf-8-sig")
+    cache = None if args.no_cache else TokenCache(args.cache)
+    started = time.perf_counter()
+    tokens, filtered = tokenize_and_filter(df[args.column].tolist(), load_tokenizer(args.model), cache=cache,
+                                           batch_size=args.batch_size)
+    seconds = time.perf_counter() - started
+    if cache is not None:
+        cache.close()
+    df["text_tokenizingText"] = tokens
+    df["text_stopword"] = filtered
+    df["text_akhir"] = [" ".join(row) for row in filtered]
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    df.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"✓ {len(df)} review ditokenisasi dalam {seconds:.2f}s → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+from english import default_detector
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data_clean")
+INPUT_PATH = os.path.join(DATA_DIR, "all_reviews_normalized.csv")
+OUTPUT_PATH = os.path.join(DATA_DIR, "all_reviews_translated.csv")
+CACHE_PATH = os.path.join(DATA_DIR, ".cache", "translations.sqlite")
+
+MODEL_EN_ID = "Helsinki-NLP/opus-mt-en-id"
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_LENGTH = 256
+# Batas jumlah entri cache; entri yang paling lama tidak dipakai dibuang lebih dulu
+DEFAULT_MAX_ENTRIES = 200_000
+# Jumlah parameter per query IN (...), di bawah batas SQLITE_MAX_VARIABLE_NUMBER lama (999)
+_SQL_CHUNK = 900
+
+_PARTS_RE = re.compile(r"[A-Za-z']+|\d+|\s+|[^\w\s]")
+_SPAN_JOIN_RE = re.compile(r"[-']")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def split_preserve_delimiters(text):
+    """Pecah teks menjadi token tanpa membuang spasi/tanda baca: ['Hello', ', ', 'apa', ...]"""
+    return _PARTS_RE.findall(text)
+
+
+def merge_english_spans(parts, flags):
+    """Gabungkan token Inggris berurutan menjadi span; flags[i] = parts[i] Inggris (EnglishDetector.detect).
+    Return list (type 'en'/'other', text)"""
+    out = []
+    i = 0
+    while i < len(parts):
+        if flags[i]:
+            start = i
+            i += 1
+            while i < len(parts) and (flags[i] or _SPAN_JOIN_RE.match(parts[i]) or parts[i].isdigit()):
+                i += 1
+            out.append(("en", "".join(parts[start:i])))
+        else:
+            out.append(("other", parts[i]))
+            i += 1
+    return out
+
+
+def span_key(text):
+    """Kunci cache span: whitespace di tepi dibuang dan spasi beruntun jadi satu"""
+    return _WHITESPACE_RE.sub(" ", text).strip()
+
+
+class TranslationCache:
+    """Cache terjemahan SQLite per (model, span) yang bertahan antar run.
+
+    Ukurannya dibatasi max_entries: setelah put_many, entri dengan last_used
+    paling lama dihapus. get_many memperbarui last_used untuk setiap hit,
+    jadi span yang sering muncul tidak ikut terbuang.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS translations (
+                model TEXT NOT NULL,
+                span TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, span)
+            )
+            """
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+        self.conn.commit()
+
+    def get_many(self, model, spans):
+        """Return dict span → terjemahan untuk span yang ada di cache"""
+        spans = list(spans)
+        found = {}
+        with self.lock:
+            for start in range(0, len(spans), _SQL_CHUNK):
+                chunk = spans[start:start + _SQL_CHUNK]
+                rows = self.conn.execute(
+                    f"SELECT span, translation FROM translations WHERE model = ? AND span IN ({','.join('?' * len(chunk))})",
+                    [model, *chunk],
+                ).fetchall()
+                found.update(rows)
+            if found:
+                now = time.time()
+                self.conn.executemany(
+                    "UPDATE translations SET last_used = ? WHERE model = ? AND span = ?",
+                    [(now, model, span) for span in found],
+                )
+                self.conn.commit()
+        return found
+
+    def put_many(self, model, translations):
+        """Simpan dict span → terjemahan, lalu buang entri terlama jika melebihi max_entries"""
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO translations (model, span, translation, last_used) VALUES (?, ?, ?, ?)",
+                [(model, span, text, now) for span, text in translations.items()],
+            )
+            excess = self.conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self.conn.execute(
+                    "DELETE FROM translations WHERE rowid IN "
+                    "(SELECT rowid FROM translations ORDER BY last_used LIMIT ?)",
+                    (excess,),
+                )
+            self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def load_translator(model=MODEL_EN_ID, device=None):
+    """Pipeline translation HF dengan backend PyTorch (tanpa TensorFlow/Keras)"""
+    try:
+        from transformers import pipeline as hf_pipeline
+
+        return hf_pipeline("translation", model=model, framework="pt", device=device)
+    except Exception as e:
+        raise RuntimeError(
+            "Failed to initialize translation pipeline with PyTorch. "
+            "Please ensure PyTorch and sentencepiece are installed.\n"
+            "Try: pip install -U torch sentencepiece transformers\n"
+            f"Original error: {e}"
+        ) from e
+
+
+def _run_batch(translator, batch, max_length):
+    # batch_size diteruskan ke pipeline: tanpa itu pipeline HF memproses list satu per satu.
+    # truncation=True: input di atas batas posisi model (512 untuk opus-mt) dipotong, bukan IndexError
+    results = translator(batch, max_length=max_length, batch_size=len(batch), truncation=True)
+    return dict(zip(batch, (result.get("translation_text", "") for result in results)))
+
+
+def translate_batches(translator, spans, batch_size=DEFAULT_BATCH_SIZE, max_length=DEFAULT_MAX_LENGTH):
+    """Terjemahkan span dalam batch yang diurutkan menurut panjang (padding minimal). Return (dict, jumlah batch)
+
+    Batch yang gagal diulang per teks; teks yang tetap gagal tidak masuk
+    dict (pemanggil memakai teks sumber dan tidak menyimpannya ke cache).
+    """
+    ordered = sorted(spans, key=len)
+    out = {}
+    batches = 0
+    for start in range(0, len(ordered), batch_size):
+        batch = ordered[start:start + batch_size]
+        batches += 1
+        try:
+            out.update(_run_batch(translator, batch, max_length))
+            continue
+        except Exception as e:
+            print(f"⚠ Batch terjemahan gagal ({type(e).__name__}: {e}), diulang per teks")
+        for text in batch:
+            try:
+                out.update(_run_batch(translator, [text], max_length))
+            except Exception as e:
+                print(f"✗ Gagal menerjemahkan teks {len(text)} karakter ({type(e).__name__}), teks sumber dipakai")
+    return out, batches
+
+
+def translate_texts(texts, translator=None, cache=None, model=MODEL_EN_ID, batch_size=DEFAULT_BATCH_SIZE,
+                    max_length=DEFAULT_MAX_LENGTH, detector=None):
+    """Terjemahkan span Inggris di seluruh korpus sekaligus (pengganti apply_translation per baris).
+
+    Span unik dari semua review dikumpulkan dulu, dicari di cache, dan hanya
+    yang belum ada diterjemahkan dalam batch besar; hasilnya ditulis balik ke
+    setiap review. translator=None hanya dimuat jika memang ada span yang
+    belum di-cache, jadi run ulang pada korpus yang sama tidak memuat model.
+    Deteksi bahasa dijalankan sekali untuk aliran token seluruh korpus
+    (detector=None: tabel dari data_clean/vocab.txt). Return (list teks,
+    dict statistik).
+    """
+    detector = default_detector() if detector is None else detector
+    parts = [split_preserve_delimiters(text if isinstance(text, str) else "") for text in texts]
+    flags = iter(detector.detect([part for row in parts for part in row]))
+    items = [merge_english_spans(row, [next(flags) for _ in row]) for row in parts]
+    keys = {}
+    for row in items:
+        for kind, text in row:
+            if kind == "en":
+                keys.setdefault(span_key(text), None)
+
+    found = cache.get_many(model, keys) if cache is not None else {}
+    missing = [key for key in keys if key not in found]
+    batches = 0
+    if missing:
+        translator = load_translator(model) if translator is None else translator
+        translated, batches = translate_batches(translator, missing, batch_size=batch_size, max_length=max_length)
+        if cache is not None:
+            cache.put_many(model, translated)
+        found.update(translated)
+
+    out = ["".join(found.get(span_key(text), text) if kind == "en" else text for kind, text in row) for row in items]
+    stats = {
+        "texts": len(items),
+        "spans": sum(kind == "en" for row in items for kind, _ in row),
+        "unique": len(keys),
+        "cached": len(keys) - len(missing),
+        "translated": len(missing),
+        "batches": batches,
+    }
+    return out, stats
+
+
+def translate_series(series, translator=None, cache=None, **kwargs):
+    """translate_texts untuk Series pandas; index dipertahankan. Return (Series, statistik)"""
+    values, stats = translate_texts(series.tolist(), translator=translator, cache=cache, **kwargs)
+    return pd.Series(values, index=series.index, name=series.name), stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Terjemahkan span bahasa Inggris di review ke bahasa Indonesia")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--column", default="text_normalized", help="Kolom input (default text_normalized)")
+    parser.add_argument("--model", default=MODEL_EN_ID)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--max-length", type=int, default=DEFAULT_MAX_LENGTH)
+    parser.add_argument("--cache", default=CACHE_PATH, help="File SQLite cache terjemahan")
+    parser.add_argument("--max-cache-entries", type=int, default=DEFAULT_MAX_ENTRIES)
+    parser.add_argument("--no-cache", action="store_true", help="Jangan baca/tulis cache")
+    args = parser.parse_args(argv)
+
+    df = pd.read_csv(args.input)
+    cache = None if args.no_cache else TranslationCache(args.cache, max_entries=args.max_cache_entries)
+    started = time.perf_counter()
+    df["text_translated"], stats = translate_series(df[args.column].fillna(""), cache=cache, model=args.model,
+                                                    batch_size=args.batch_size, max_length=args.max_length)
+    seconds = time.perf_counter() - started
+    if cache is not None:
+        cache.close()
+    print(f"⟳ {stats['texts']} review, {stats['spans']} span Inggris, {stats['unique']} unik")
+    print(f"  {stats['cached']} dari cache, {stats['translated']} diterjemahkan dalam {stats['batches']} batch")
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    df.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"✓ Selesai dalam {seconds:.2f}s → {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+import abc
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+from translate import DEFAULT_MAX_ENTRIES, TranslationCache, load_translator, span_key, translate_batches
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data_clean")
+INPUT_PATH = os.path.join(DATA_DIR, "all_reviews_merged.csv")
+OUTPUT_PATH = os.path.join(DATA_DIR, "all_reviews_en.csv")
+CACHE_PATH = os.path.join(DATA_DIR, ".cache", "translations.sqlite")
+
+BACKENDS = ("marian", "http")
+MODEL_ID_EN = "Helsinki-NLP/opus-mt-id-en"
+# Endpoint kompatibel LibreTranslate (self-host, bisa offline): POST {"q", "source", "target"} → {"translatedText"}
+DEFAULT_URL = "http://127.0.0.1:5000/translate"
+DEFAULT_CONCURRENCY = 8
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 1
+# Teks per panggilan backend; hasil tiap chunk langsung masuk cache
+DEFAULT_CHUNK_SIZE = 512
+
+
+def source_key(text):
+    """Kunci cache: sha1 teks sumber setelah spasi dinormalisasi (span_key)"""
+    return hashlib.sha1(span_key(text).encode("utf-8")).hexdigest()
+
+
+class TranslationBackend(abc.ABC):
+    """Antarmuka backend terjemahan.
+
+    translate(texts) menerima list teks unik yang belum ada di cache dan
+    mengembalikan terjemahan dengan urutan yang sama; None berarti gagal
+    (tidak di-cache, translate_cached memakai teks sumber). Semua backend
+    dengan pasangan bahasa yang sama berbagi namespace cache, jadi hasil
+    backend HTTP bisa dipakai ulang worker offline dan sebaliknya.
+    """
+
+    name = "base"
+
+    def __init__(self, source="id", target="en"):
+        self.source = source
+        self.target = target
+
+    @property
+    def cache_namespace(self):
+        return f"{self.source}-{self.target}"
+
+    @abc.abstractmethod
+    def translate(self, texts):
+        """List terjemahan (atau None jika gagal) dengan urutan yang sama seperti texts"""
+
+
+class MarianBackend(TranslationBackend):
+    """MarianMT lokal (opus-mt-id-en) lewat pipeline HF, batch diurutkan menurut panjang; tanpa jaringan"""
+
+    name = "marian"
+
+    def __init__(self, model=MODEL_ID_EN, batch_size=32, max_length=512, device=None, translator=None,
+                 source="id", target="en"):
+        super().__init__(source, target)
+        self.model = model
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.device = device
+        self.translator = translator
+
+    def translate(self, texts):
+        if self.translator is None:
+            self.translator = load_translator(self.model, device=self.device)
+        out, _ = translate_batches(self.translator, texts, batch_size=self.batch_size, max_length=self.max_length)
+        return [out.get(text) for text in texts]
+
+
+class HttpBackend(TranslationBackend):
+    """Klien HTTP asyncio (aiohttp) ke endpoint kompatibel LibreTranslate dengan konkurensi terbatas.
+
+    Paling banyak concurrency request berjalan bersamaan; request gagal
+    diulang retries kali dengan backoff. Bisa dipanggil dari notebook
+    (event loop yang sedang berjalan) karena loop baru dijalankan di thread
+    terpisah.
+    """
+
+    name = "http"
+
+    def __init__(self, url=DEFAULT_URL, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, api_key=None, source="id", target="en"):
+        super().__init__(source, target)
+        self.url = url
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.api_key = api_key
+
+    def translate(self, texts):
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.translate_async(texts))
+        with ThreadPoolExecutor(1) as pool:
+            return pool.submit(asyncio.run, self.translate_async(texts)).result()
+
+    async def translate_async(self, texts):
+        import aiohttp
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            return await asyncio.gather(*(self._translate_one(session, semaphore, text) for text in texts))
+
+    async def _translate_one(self, session, semaphore, text):
+        import aiohttp
+
+        payload = {"q": text, "source": self.source, "target": self.target, "format": "text"}
+        if self.api_key:
+            payload["api_key"] = self.api_key
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    async with session.post(self.url, json=payload) as response:
+                        response.raise_for_status()
+                        data = await response.json(content_type=None)
+                        return data["translatedText"]
+                except (aiohttp.ClientError, asyncio.TimeoutError, KeyError, TypeError, ValueError):
+                    if attempt < self.retries:
+                        await asyncio.sleep(0.5 * 2 ** attempt)
+        return None
+
+
+def load_backend(name, **kwargs):
+    if name == "marian":
+        return MarianBackend(**kwargs)
+    if name == "http":
+        return HttpBackend(**kwargs)
+    raise ValueError(f"backend harus salah satu dari {BACKENDS}, bukan {name!r}")
+
+
+def translate_cached(texts, backend, cache=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Terjemahkan semua teks lewat backend, hanya untuk teks unik yang belum ada di cache.
+
+    Cache dikunci sha1 teks sumber di namespace pasangan bahasa backend.
+    Teks yang belum ter-cache dikirim per chunk_size dan hasilnya langsung
+    disimpan, jadi run yang terhenti tidak mengulang chunk yang sudah
+    selesai. Teks yang gagal diterjemahkan dikembalikan apa adanya (seperti
+    translate_safe di notebook). Return (list terjemahan, dict statistik).
+    """
+    texts = [text.strip() if isinstance(text, str) else "" for text in texts]
+    keys = [source_key(text) if text else None for text in texts]
+    unique = {key: text for key, text in zip(keys, texts) if key}
+    found = cache.get_many(backend.cache_namespace, unique) if cache is not None else {}
+    missing = [key for key in unique if key not in found]
+    failed = 0
+    for start in range(0, len(missing), chunk_size):
+        chunk = missing[start:start + chunk_size]
+        results = backend.translate([unique[key] for key in chunk])
+        done = {key: result for key, result in zip(chunk, results) if result is not None}
+        failed += len(chunk) - len(done)
+        if cache is not None and done:
+            cache.put_many(backend.cache_namespace, done)
+        found.update(done)
+    out = [found.get(key, text) if key else "" for key, text in zip(keys, texts)]
+    stats = {
+        "texts": len(texts),
+        "unique": len(unique),
+        "cached": len(unique) - len(missing),
+        "translated": len(missing) - failed,
+        "failed": failed,
+    }
+    return out, stats
+
+
+class StubTranslateServer:
+    """Server HTTP lokal berprotokol LibreTranslate untuk menguji HttpBackend tanpa jaringan.
+
+    Menjawab "[en] <q>" setelah delay detik; fail_first request pertama
+    dijawab 503 untuk menguji retry. requests menghitung request yang masuk.
+    """
+
+    def __init__(self, port=0, delay=0.0, fail_first=0):
+        stub = self
+        self.delay = delay
+        self.fail_first = fail_first
+        self.requests = 0
+        self.lock = threading.Lock()
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                with stub.lock:
+                    stub.requests += 1
+                    fail = stub.requests <= stub.fail_first
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                time.sleep(stub.delay)
+                if fail or "q" not in body:
+                    self.send_response(503 if fail else 400)
+                    self.end_headers()
+                    return
+                data = json.dumps({"translatedText": f"[{body.get('target', 'en')}] {body['q']}"}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}/translate"
+        self.thread = None
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _translate_serial(url, texts):
+    """Jalur notebook: satu request blocking per review, berurutan, retry sekali; untuk --benchmark"""
+    out = []
+    for text in texts:
+        payload = json.dumps({"q": text, "source": "id", "target": "en", "format": "text"}).encode("utf-8")
+        for attempt in range(2):
+            try:
+                request = urllib.request.Request(url, data=payload, headers={"Content-Type": "application/json"})
+                with urllib.request.urlopen(request, timeout=DEFAULT_TIMEOUT) as response:
+                    out.append(json.loads(response.read())["translatedText"])
+                break
+            except (OSError, ValueError, KeyError):
+                if attempt:
+                    out.append(text)
+    return out
+
+
+def benchmark(n=500, delay=0.05, concurrency=DEFAULT_CONCURRENCY, input_path=INPUT_PATH):
+    """Stub lokal dengan latency delay: request serial per review vs HttpBackend konkuren, lalu run ulang dari cache"""
+    import tempfile
+
+    texts = pd.read_csv(input_path)["review"].fillna("").astype(str).head(n).tolist()
+    print(f"⟳ {len(texts)} review, latency stub {delay * 1000:.0f} ms/request")
+    with StubTranslateServer(delay=delay, fail_first=3) as stub:
+        started = time.perf_counter()
+        _translate_serial(stub.url, [text.strip() for text in texts if text.strip()])
+        base = time.perf_counter() - started
+        print(f"  {'serial (notebook)':<24} {base:>8.2f}s {len(texts) / base:>10.1f} review/s")
+
+        cache = TranslationCache(os.path.join(tempfile.mkdtemp(prefix="translate_cache_"), "translations.sqlite"))
+        backend = HttpBackend(stub.url, concurrency=concurrency)
+        for label in (f"http konkuren ({concurrency})", "http, cache penuh"):
+            before = stub.requests
+            started = time.perf_counter()
+            out, stats = translate_cached(texts, backend, cache)
+            seconds = time.perf_counter() - started
+            print(f"  {label:<24} {seconds:>8.2f}s {len(texts) / seconds:>10.1f} review/s  ({base / seconds:.1f}x)"
+                  f"  {stub.requests - before} request, {stats['cached']} dari cache, {stats['failed']} gagal")
+        cache.close()
+    ok = stats["translated"] == 0 and all(o.startswith("[en] ") for o, t in zip(out, texts) if t.strip())
+    print("✓ Semua review diterjemahkan, run ulang tanpa request" if ok else "✗ Ada review yang tidak diterjemahkan")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Terjemahkan review id → en (MarianMT lokal atau HTTP) dengan cache")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=OUTPUT_PATH)
+    parser.add_argument("--column", default="review")
+    parser.add_argument("--backend", choices=BACKENDS, default="marian")
+    parser.add_argument("--model", default=MODEL_ID_EN, help="Model MarianMT (backend marian)")
+    parser.add_argument("--batch-size", type=int, default=32, help="Batch MarianMT")
+    parser.add_argument("--url", default=DEFAULT_URL, help="Endpoint LibreTranslate (backend http)")
+    parser.add_argument("--api-key", default=os.environ.get("LIBRETRANSLATE_API_KEY"))
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Request HTTP bersamaan")
+    parser.add_argument("--cache", default=CACHE_PATH, help="File SQLite cache terjemahan (dipakai bersama)")
+    parser.add_argument("--max-cache-entries", type=int, default=DEFAULT_MAX_ENTRIES)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--limit", type=int, default=None, help="Hanya N baris pertama")
+    parser.add_argument("--stub-server", type=int, metavar="PORT", default=None,
+                        help="Jalankan server stub LibreTranslate di PORT (untuk uji backend http)")
+    parser.add_argument("--stub-delay", type=float, default=0.0)
+    parser.add_argument("--benchmark", type=int, metavar="N", default=None,
+                        help="Serial vs konkuren terhadap server stub pada N review")
+    args = parser.parse_args(argv)
+
+    if args.stub_server is not None:
+        with StubTranslateServer(args.stub_server, delay=args.stub_delay) as stub:
+            print(f"⟳ Stub LibreTranslate di {stub.url} (Ctrl+C untuk berhenti)")
+            try:
+                stub.thread.join()
+            except KeyboardInterrupt:
+                pass
+        return
+    if args.benchmark:
+        raise SystemExit(0 if benchmark(args.benchmark, concurrency=args.concurrency, input_path=args.input) else 1)
+
+    df = pd.read_csv(args.input)
+    if args.limit is not None:
+        df = df.head(args.limit).copy()
+    if args.backend == "marian":
+        backend = MarianBackend(args.model, batch_size=args.batch_size)
+    else:
+        backend = HttpBackend(args.url, concurrency=args.concurrency, api_key=args.api_key)
+    cache = None if args.no_cache else TranslationCache(args.cache, max_entries=args.max_cache_entries)
+    started = time.perf_counter()
+    df["review_en"], stats = translate_cached(df[args.column].tolist(), backend, cache)
+    seconds = time.perf_counter() - started
+    if cache is not None:
+        cache.close()
+    print(f"⟳ {stats['texts']} review, {stats['unique']} unik: {stats['cached']} dari cache, "
+          f"{stats['translated']} diterjemahkan ({backend.name}), {stats['failed']} gagal")
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    df.to_csv(args.output, index=False, encoding="utf-8-sig")
+    print(f"✓ Selesai dalam {seconds:.2f}s → {args.output}")
+
+
+if __name__ == "__main__":
+    main()